@@ -0,0 +1,97 @@
+import asyncio
+
+from loguru import logger
+
+from digest import MAX_MESSAGE_CHARS, pack_messages
+
+# Разделитель уведомлений внутри сводки
+SUMMARY_SEPARATOR = "\n\n"
+
+
+# Важность заявки по ключевым словам в тексте
+class TicketPriority:
+    """
+    Заявка срочная, если проблема или описание содержат одно из ключевых
+    слов (без учета регистра, по вхождению: 'оплат' совпадет с 'оплата' и
+    'оплатой'). Без ключевых слов срочных заявок нет.
+    """
+
+    __slots__ = ("urgent_keywords",)
+
+    def __init__(self, urgent_keywords):
+        self.urgent_keywords = tuple(keyword.strip().lower() for keyword in urgent_keywords if keyword.strip())
+
+    def is_urgent(self, *texts) -> bool:
+        text = "\n".join(texts).lower()
+        return any(keyword in text for keyword in self.urgent_keywords)
+
+
+# Сводные уведомления администратору
+class AdminNotifier:
+    """
+    Срочные уведомления отправляются сразу, остальные копятся и уходят
+    одной сводкой через interval секунд после первого уведомления в пачке
+    или сразу при max_batch уведомлениях. В отличие от дайджеста
+    публикаций, новые уведомления не откладывают отправку: администратор
+    узнает о заявке не позже чем через interval секунд. send(text) —
+    корутина отправки, summary(count) — заголовок сводки. Сводка длиннее
+    лимита Telegram делится на несколько сообщений. interval <= 0
+    отключает накопление.
+    """
+
+    def __init__(self, send, summary, interval: float = 30, max_batch: int = 10):
+        self.interval = interval
+        self.max_batch = max_batch
+        self._send = send
+        self._summary = summary
+        self._pending = []
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    # Отправляет уведомление сразу или добавляет в сводку. Возвращает False,
+    # если немедленная отправка не удалась: ошибка, как и в flush, только
+    # пишется в лог, потому что заявка к этому моменту уже принята.
+    async def notify(self, text: str, urgent: bool = False) -> bool:
+        if urgent or self.interval <= 0:
+            try:
+                await self._send(text)
+            except Exception:
+                logger.opt(exception=True).error("Ошибка при отправке уведомления администратору")
+                return False
+            return True
+        self._pending.append(text)
+        if len(self._pending) >= self.max_batch:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return True
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        await self.flush()
+
+    # Отправляет накопленные уведомления одной сводкой
+    async def flush(self):
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        header = self._summary(len(pending))
+        messages = pack_messages(pending, MAX_MESSAGE_CHARS - len(header) - len(SUMMARY_SEPARATOR), SUMMARY_SEPARATOR)
+        try:
+            for message in messages:
+                await self._send(header + SUMMARY_SEPARATOR + message)
+        except Exception:
+            logger.opt(exception=True).error(f"Ошибка при отправке сводки из {len(pending)} уведомлений администратору")
+
+    # Останавливает таймер и отправляет то, что успело накопиться
+    async def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import time
+import zlib
+
+from loguru import logger
+
+from db import get_db_connection, ticket_thread_page
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived_tickets (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    parent_id INTEGER,
+    resolved_at REAL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_archived_tickets_user ON archived_tickets(user_id, id);
+CREATE TABLE IF NOT EXISTS archived_threads (
+    ticket_id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
+# Столбцы заявки, которые возвращают get_ticket и user_tickets
+TICKET_COLUMNS = (
+    "id", "user_id", "username", "problem", "description", "status", "response", "locale", "parent_id", "resolved_at",
+    "created_at", "updated_at",
+)
+
+# Столбцы, которые хранятся в архиве одним сжатым значением data
+PACKED_COLUMNS = ("username", "problem", "description", "status", "response", "locale", "created_at", "updated_at")
+
+SELECT_TICKET = f"SELECT {', '.join(TICKET_COLUMNS)} FROM tickets"
+
+
+# Сжимает текстовые поля заявки (в порядке PACKED_COLUMNS)
+def pack_ticket(values) -> bytes:
+    return zlib.compress(json.dumps(list(values), ensure_ascii=False).encode(), 9)
+
+
+def unpack_ticket(data: bytes) -> list:
+    return json.loads(zlib.decompress(data))
+
+
+# Строка архива в порядке TICKET_COLUMNS
+def _archived_row(ticket_id, user_id, parent_id, resolved_at, data) -> tuple:
+    values = unpack_ticket(data)
+    # Заявки, архивированные до появления created_at и updated_at
+    values += [None] * (len(PACKED_COLUMNS) - len(values))
+    username, problem, description, status, response, locale, created_at, updated_at = values
+    return (
+        ticket_id, user_id, username, problem, description, status, response, locale, parent_id, resolved_at,
+        created_at, updated_at,
+    )
+
+
+# Архив решенных заявок в отдельной сжатой базе
+class TicketArchive:
+    """
+    Заявки, решенные раньше чем min_age_days дней назад, переносятся из
+    tickets.db в архивную базу пачками по batch_size: рабочая таблица и ее
+    полнотекстовый индекс остаются небольшими, а запросы по статусу и
+    подсчеты в статистике не замедляются с ростом истории. В архиве у заявки
+    остаются только ID, автор, родитель и время решения, остальные поля
+    сжаты zlib. Пачка сначала фиксируется в архиве, затем удаляется из
+    tickets.db: при сбое между шагами заявка окажется в обеих базах и
+    будет перезаписана следующей пачкой, но не потеряется. Переписка
+    заявки переносится вместе с ней одним сжатым значением. ID не
+    переиспользуются (AUTOINCREMENT), поэтому поиск по ID однозначен.
+    get_ticket и user_tickets читают рабочую таблицу и при необходимости
+    архив, так что вызывающему коду не важно, где лежит заявка.
+    """
+
+    def __init__(self, path: str = "tickets_archive.db", min_age_days: float = 90, batch_size: int = 500):
+        self.path = path
+        self.min_age = min_age_days * 86400
+        self.batch_size = batch_size
+
+    # Создает таблицу архива (соединение берется из общего пула db.py)
+    async def open(self):
+        db = await get_db_connection(self.path)
+        await db.executescript(ARCHIVE_SCHEMA)
+        await db.commit()
+
+    # Переносит в архив одну пачку старых решенных заявок, возвращает их число
+    async def archive_batch(self, now: float = None) -> int:
+        tickets = await get_db_connection("tickets.db")
+        archive = await get_db_connection(self.path)
+        cutoff = (now if now is not None else time.time()) - self.min_age
+        async with tickets.execute(
+            f"SELECT id, user_id, parent_id, resolved_at, {', '.join(PACKED_COLUMNS)} FROM tickets "
+            f"WHERE status = 'Resolved' AND resolved_at < ? ORDER BY resolved_at LIMIT ?",
+            (cutoff, self.batch_size),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        if not rows:
+            return 0
+        ticket_ids = [row[0] for row in rows]
+        placeholders = ", ".join("?" * len(ticket_ids))
+        async with tickets.execute(
+            f"SELECT ticket_id, seq, author, text, created_at FROM ticket_messages "
+            f"WHERE ticket_id IN ({placeholders}) ORDER BY ticket_id, seq",
+            ticket_ids,
+        ) as cursor:
+            threads = {}
+            for ticket_id, *message in await cursor.fetchall():
+                threads.setdefault(ticket_id, []).append(message)
+        await archive.executemany(
+            "INSERT OR REPLACE INTO archived_tickets (id, user_id, parent_id, resolved_at, data) VALUES (?, ?, ?, ?, ?)",
+            [(*row[:4], pack_ticket(row[4:])) for row in rows],
+        )
+        await archive.executemany(
+            "INSERT OR REPLACE INTO archived_threads (ticket_id, data) VALUES (?, ?)",
+            [(ticket_id, pack_ticket(messages)) for ticket_id, messages in threads.items()],
+        )
+        await archive.commit()
+        await tickets.execute(f"DELETE FROM ticket_messages WHERE ticket_id IN ({placeholders})", ticket_ids)
+        await tickets.execute(f"DELETE FROM tickets WHERE id IN ({placeholders})", ticket_ids)
+        await tickets.commit()
+        return len(rows)
+
+    # Переносит все подходящие заявки, уступая циклу событий между пачками
+    async def archive_old(self, pause: float = 0.1) -> int:
+        total = 0
+        while moved := await self.archive_batch():
+            total += moved
+            await asyncio.sleep(pause)
+        if total:
+            # Удаления копятся в индексе FTS5 отдельными записями; слияние
+            # сегментов освобождает место и ускоряет поиск по рабочей таблице
+            tickets = await get_db_connection("tickets.db")
+            await tickets.execute("INSERT INTO tickets_fts(tickets_fts) VALUES ('optimize')")
+            await tickets.commit()
+            logger.info(f"В архив перенесено решенных заявок: {total}")
+        return total
+
+    # Фоновая архивация: при запуске и затем каждые interval секунд
+    async def run(self, interval: float = 3600):
+        while True:
+            try:
+                await self.archive_old()
+            except Exception:
+                logger.opt(exception=True).error("Ошибка при переносе заявок в архив")
+            await asyncio.sleep(interval)
+
+    # Заявка по ID из рабочей таблицы или архива (строка в порядке TICKET_COLUMNS) или None
+    async def get_ticket(self, ticket_id: int):
+        tickets = await get_db_connection("tickets.db")
+        async with tickets.execute(f"{SELECT_TICKET} WHERE id = ?", (ticket_id,)) as cursor:
+            row = await cursor.fetchone()
+        if row is not None:
+            return row
+        archive = await get_db_connection(self.path)
+        async with archive.execute(
+            "SELECT id, user_id, parent_id, resolved_at, data FROM archived_tickets WHERE id = ?", (ticket_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return _archived_row(*row) if row is not None else None
+
+    # Страница переписки из рабочей таблицы или архива (как ticket_thread_page)
+    async def thread_page(self, ticket_id: int, page: int, page_size: int):
+        messages, total = await ticket_thread_page(ticket_id, page, page_size)
+        if total:
+            return messages, total
+        archive = await get_db_connection(self.path)
+        async with archive.execute("SELECT data FROM archived_threads WHERE ticket_id = ?", (ticket_id,)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return [], 0
+        # Архивная переписка читается целиком: такие заявки открывают редко
+        thread = [tuple(message) for message in unpack_ticket(row[0])]
+        total = len(thread)
+        if page < 0:
+            page = max(0, (total - 1) // page_size)
+        return thread[page * page_size:(page + 1) * page_size], total
+
+    # Все заявки пользователя из рабочей таблицы и архива по возрастанию ID
+    async def user_tickets(self, user_id: int) -> list:
+        tickets = await get_db_connection("tickets.db")
+        archive = await get_db_connection(self.path)
+        async with tickets.execute(f"{SELECT_TICKET} WHERE user_id = ?", (user_id,)) as cursor:
+            hot = await cursor.fetchall()
+        async with archive.execute(
+            "SELECT id, user_id, parent_id, resolved_at, data FROM archived_tickets WHERE user_id = ?", (user_id,)
+        ) as cursor:
+            archived = [_archived_row(*row) for row in await cursor.fetchall()]
+        # Заявка, архивированная при сбое не до конца, есть в обеих базах
+        hot_ids = {row[0] for row in hot}
+        return sorted(hot + [row for row in archived if row[0] not in hot_ids])
+
+    async def count(self) -> int:
+        archive = await get_db_connection(self.path)
+        async with archive.execute("SELECT COUNT(*) FROM archived_tickets") as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def reset(self):
+        archive = await get_db_connection(self.path)
+        await archive.execute("DELETE FROM archived_tickets")
+        await archive.execute("DELETE FROM archived_threads")
+        await archive.commit()
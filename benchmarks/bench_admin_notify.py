@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admin_notify import AdminNotifier  # noqa: E402
+
+
+# Чат администратора с ограничением Telegram около одного сообщения в секунду
+class AdminChat:
+    def __init__(self, per_message: float):
+        self.per_message = per_message
+        self.messages = 0
+        self.latencies = []
+        self._lock = asyncio.Lock()
+
+    async def send(self, text: str):
+        async with self._lock:
+            await asyncio.sleep(self.per_message)
+            self.messages += 1
+            now = time.perf_counter()
+            # В тексте уведомления хранится момент подачи заявки
+            for line in text.split("\n\n"):
+                if line.startswith("@"):
+                    self.latencies.append(now - float(line[1:]))
+
+
+# Поток заявок во время сбоя: count заявок с интервалом gap секунд
+async def run(count: int, gap: float, per_message: float, interval: float, max_batch: int):
+    chat = AdminChat(per_message)
+    notifier = AdminNotifier(chat.send, lambda pending: f"Сводка: {pending}", interval, max_batch)
+    handlers = []
+    started = time.perf_counter()
+    for _ in range(count):
+        # Обработчик заявки ждет отправки уведомления, как enter_description в боте
+        handlers.append(asyncio.create_task(notifier.notify(f"@{time.perf_counter()}")))
+        await asyncio.sleep(gap)
+    await asyncio.gather(*handlers)
+    await notifier.close()
+    return chat.messages, max(chat.latencies), time.perf_counter() - started
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сводных уведомлений администратору")
+    parser.add_argument("--tickets", type=int, default=300)
+    parser.add_argument("--per-second", type=float, default=10)
+    parser.add_argument("--scale", type=float, default=100, help="ускорение времени симуляции")
+    args = parser.parse_args()
+
+    gap = 1 / args.per_second / args.scale
+    per_message = 1 / args.scale
+    cases = [("каждое сразу", 0, 1), ("сводка 30 с / 10 заявок", 30 / args.scale, 10), ("сводка 30 с / 50 заявок", 30 / args.scale, 50)]
+    print(f"Заявок: {args.tickets}, {args.per_second:g} в секунду; чат администратора: 1 сообщение в секунду")
+    for title, interval, max_batch in cases:
+        messages, latency, total = await run(args.tickets, gap, per_message, interval, max_batch)
+        print(
+            f"{title}: сообщений {messages}, наибольшая задержка уведомления {latency * args.scale:.0f} с, "
+            f"все доставлены через {total * args.scale:.0f} с"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archive import TicketArchive  # noqa: E402
+from db import close_all_db_connections, get_db_connection, init_ticket_db  # noqa: E402
+
+WORDS = (
+    "после", "обновления", "бот", "перестал", "отвечать", "телефон", "сообщение", "кнопка", "меню",
+    "ошибка", "оплата", "подписка", "уведомление", "задержка", "язык", "настройки", "версия",
+)
+
+# Запросы, которые замедляются с ростом истории: статистика и список открытых заявок
+HOT_QUERIES = {
+    "статистика (3 COUNT)": (
+        "SELECT COUNT(*) FROM tickets",
+        "SELECT COUNT(*) FROM tickets WHERE status = 'Resolved'",
+        "SELECT COUNT(*) FROM tickets WHERE status IN ('Unresolved', 'In Progress')",
+    ),
+    "открытые заявки": (
+        "SELECT id, problem FROM tickets WHERE status IN ('Unresolved', 'In Progress') AND parent_id IS NULL",
+    ),
+}
+
+
+# Заполняет tickets.db историей: open_share заявок открыты, остальные давно решены
+async def fill_tickets(count: int, users: int, open_share: float):
+    db = await get_db_connection("tickets.db")
+    resolved_at = time.time() - 365 * 86400
+    rows = []
+    for number in range(count):
+        resolved = random.random() >= open_share
+        rows.append(
+            (
+                random.randrange(users),
+                f"user_{number % users}",
+                " ".join(random.choices(WORDS, k=4)),
+                " ".join(random.choices(WORDS, k=25)),
+                "Resolved" if resolved else "Unresolved",
+                " ".join(random.choices(WORDS, k=15)) if resolved else None,
+                "ru",
+                resolved_at if resolved else None,
+            )
+        )
+        if len(rows) == 10000 or number == count - 1:
+            await db.executemany(
+                "INSERT INTO tickets (user_id, username, problem, description, status, response, locale, resolved_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            rows = []
+    await db.commit()
+
+
+# Медианное время выполнения группы запросов, мс
+async def query_ms(queries, repeats: int) -> float:
+    db = await get_db_connection("tickets.db")
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for query in queries:
+            async with db.execute(query) as cursor:
+                await cursor.fetchall()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+# Медианное время вызова, мс
+async def call_ms(repeats: int, make_call) -> float:
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await make_call()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def size_mb(path: str) -> float:
+    return sum(os.path.getsize(file) for file in (path, f"{path}-wal") if os.path.exists(file)) / 2**20
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк архивации решенных заявок")
+    parser.add_argument("--tickets", type=int, default=300000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--open-share", type=float, default=0.02, help="доля открытых заявок")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    logger.remove()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            await init_ticket_db()
+            archive = TicketArchive("tickets_archive.db", min_age_days=90, batch_size=500)
+            await archive.open()
+            await fill_tickets(args.tickets, args.users, args.open_share)
+            db = await get_db_connection("tickets.db")
+            await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            before = {title: await query_ms(queries, args.repeats) for title, queries in HOT_QUERIES.items()}
+            hot_size = size_mb("tickets.db")
+
+            started = time.perf_counter()
+            moved = await archive.archive_old(pause=0)
+            elapsed = time.perf_counter() - started
+            await db.execute("VACUUM")
+            await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            archive_db = await get_db_connection(archive.path)
+            await archive_db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            print(f"Заявок: {args.tickets}, перенесено в архив: {moved} за {elapsed:.1f} с ({moved / elapsed:.0f} заявок/с)")
+            print(
+                f"Размер: tickets.db {hot_size:.1f} -> {size_mb('tickets.db'):.1f} МБ, "
+                f"архив {size_mb(archive.path):.1f} МБ"
+            )
+            for title, queries in HOT_QUERIES.items():
+                print(f"{title}: {before[title]:.2f} -> {await query_ms(queries, args.repeats):.2f} мс")
+
+            async with archive_db.execute("SELECT id FROM archived_tickets ORDER BY random() LIMIT 1") as cursor:
+                archived_id = (await cursor.fetchone())[0]
+            async with db.execute("SELECT id FROM tickets ORDER BY random() LIMIT 1") as cursor:
+                hot_id = (await cursor.fetchone())[0]
+            print(
+                f"Заявка по ID: из рабочей таблицы {await call_ms(args.repeats, lambda: archive.get_ticket(hot_id)):.3f} мс, "
+                f"из архива {await call_ms(args.repeats, lambda: archive.get_ticket(archived_id)):.3f} мс"
+            )
+            user_ms = await call_ms(args.repeats, lambda: archive.user_tickets(random.randrange(args.users)))
+            print(f"Заявки пользователя (рабочая таблица и архив): {user_ms:.3f} мс")
+            await close_all_db_connections()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import close_all_db_connections, get_db_connection, init_ticket_db, update_tickets_status  # noqa: E402
+from delivery import RateLimiter, deliver_messages  # noqa: E402
+
+
+# Имитация bot.send_message: задержка ответа API Telegram
+def make_send(latency: float):
+    async def send(chat_id, text):
+        await asyncio.sleep(latency)
+
+    return send
+
+
+# Создает открытые заявки; каждая duplicates_every-я получает дубликат
+async def fill_tickets(count: int, duplicates_every: int) -> list:
+    db = await get_db_connection("tickets.db")
+    await db.executemany(
+        "INSERT INTO tickets (user_id, username, problem, description, status, locale) VALUES (?, ?, ?, ?, ?, ?)",
+        [(number, f"user_{number}", "Не приходят уведомления", "После обновления", "Unresolved", "ru")
+         for number in range(count)],
+    )
+    async with db.execute("SELECT id FROM tickets WHERE parent_id IS NULL ORDER BY id") as cursor:
+        ticket_ids = [row[0] for row in await cursor.fetchall()]
+    await db.executemany(
+        "INSERT INTO tickets (user_id, username, problem, description, status, locale, parent_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(count + ticket_id, "dup", "Не приходят уведомления", "Тоже", "Unresolved", "ru", ticket_id)
+         for ticket_id in ticket_ids[::duplicates_every]],
+    )
+    await db.commit()
+    return ticket_ids
+
+
+# Прежний путь: UPDATE, commit, SELECT и отправка по одной заявке.
+# Возвращает время работы с базой (с) и число уведомлений.
+async def close_one_by_one(ticket_ids, send):
+    db = await get_db_connection("tickets.db")
+    notified, sending = 0, 0.0
+    started = time.perf_counter()
+    for ticket_id in ticket_ids:
+        async with db.execute("SELECT id FROM tickets WHERE id = ? OR parent_id = ?", (ticket_id, ticket_id)) as cursor:
+            changed_ids = [row[0] for row in await cursor.fetchall()]
+        await db.execute(
+            "UPDATE tickets SET status = ?, response = ? WHERE id = ? OR parent_id = ?",
+            ("Resolved", "Исправлено", ticket_id, ticket_id),
+        )
+        await db.commit()
+        for changed_id in changed_ids:
+            async with db.execute("SELECT user_id, problem, locale FROM tickets WHERE id = ?", (changed_id,)) as cursor:
+                user_id, problem, _ = await cursor.fetchone()
+            send_started = time.perf_counter()
+            await send(user_id, problem)
+            sending += time.perf_counter() - send_started
+            notified += 1
+    return time.perf_counter() - started - sending, notified
+
+
+# Массовый путь: одна транзакция и параллельная отправка с общим ограничением частоты
+async def close_in_bulk(ticket_ids, send, concurrency: int, rate: float):
+    started = time.perf_counter()
+    tickets = await update_tickets_status(ticket_ids, "Resolved", "Исправлено")
+    database = time.perf_counter() - started
+    report = await deliver_messages(
+        [(user_id, problem) for _, user_id, problem, _ in tickets], send, concurrency, RateLimiter(rate)
+    )
+    return database, report.sent
+
+
+async def measure(title: str, tickets: int, duplicates_every: int, close):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        await init_ticket_db()
+        ticket_ids = await fill_tickets(tickets, duplicates_every)
+        started = time.perf_counter()
+        database, notified = await close(ticket_ids)
+        elapsed = time.perf_counter() - started
+        await close_all_db_connections()
+    print(f"{title}: всего {elapsed:.2f} с, из них база {database * 1000:.0f} мс, уведомлено {notified}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк массового закрытия заявок")
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--duplicates-every", type=int, default=5, help="у каждой N-й заявки есть дубликат")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка отправки сообщения, с")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=25, help="лимит сообщений в секунду")
+    args = parser.parse_args()
+
+    logger.remove()
+    cwd = os.getcwd()
+    send = make_send(args.latency)
+    print(f"Заявок: {args.tickets}, задержка отправки {args.latency * 1000:.0f} мс, лимит {args.rate:.0f} сообщений/с")
+    try:
+        await measure("По одной заявке", args.tickets, args.duplicates_every, lambda ids: close_one_by_one(ids, send))
+        await measure(
+            "Одной транзакцией",
+            args.tickets,
+            args.duplicates_every,
+            lambda ids: close_in_bulk(ids, send, args.concurrency, args.rate),
+        )
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
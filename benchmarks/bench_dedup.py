@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ticket_dedup import DuplicateIndex, popcount, simhash  # noqa: E402
+
+WORDS = (
+    "бот", "оплата", "карта", "ошибка", "меню", "уведомление", "подписка", "сайт", "не", "работает",
+    "после", "обновления", "телефон", "приложение", "сообщение", "кнопка", "вход", "пароль", "канал",
+    "задержка", "язык", "настройки", "версия", "сервер", "вчера", "сегодня", "снова", "пропало",
+)
+INCIDENT = "Не работает оплата\nПри оплате картой сайт выдает ошибку {code}, {tail}"
+TAILS = ("помогите", "срочно", "что делать", "уже час", "", "пожалуйста")
+
+
+# Обычная заявка: случайный набор слов
+def random_ticket() -> str:
+    return " ".join(random.choices(WORDS, k=random.randint(6, 20)))
+
+
+# Заявка во время сбоя: почти одинаковый текст с мелкими отличиями
+def incident_ticket() -> str:
+    return INCIDENT.format(code=random.choice((500, 502, 503)), tail=random.choice(TAILS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска дубликатов заявок")
+    parser.add_argument("--open-tickets", type=int, default=20000)
+    parser.add_argument("--incident", type=int, default=500)
+    parser.add_argument("--distance", type=int, default=6)
+    args = parser.parse_args()
+
+    index = DuplicateIndex(args.distance)
+    signatures = {}
+    for ticket_id in range(args.open_tickets):
+        signature = simhash(random_ticket())
+        # Обычные заявки с похожим текстом тоже связываются, как в боте
+        if index.find(signature) is None:
+            index.add(ticket_id, signature)
+            signatures[ticket_id] = signature
+    print(f"Открытых заявок в индексе: {len(index)} из {args.open_tickets}")
+
+    started = time.perf_counter()
+    incident = [simhash(incident_ticket()) for _ in range(args.incident)]
+    simhash_us = (time.perf_counter() - started) / args.incident * 1e6
+
+    lsh_us, scan_us, parents = [], [], 0
+    next_id = args.open_tickets
+    for signature in incident:
+        started = time.perf_counter()
+        found = index.find(signature)
+        lsh_us.append((time.perf_counter() - started) * 1e6)
+
+        started = time.perf_counter()
+        min((popcount(signature ^ other), ticket_id) for ticket_id, other in signatures.items())
+        scan_us.append((time.perf_counter() - started) * 1e6)
+
+        if found is None:
+            parents += 1
+            index.add(next_id, signature)
+            signatures[next_id] = signature
+        next_id += 1
+
+    print(f"Сигнатура SimHash: {simhash_us:.0f} мкс на заявку")
+    print(
+        f"Поиск похожей: LSH {statistics.median(lsh_us):.1f} мкс, "
+        f"перебор всех открытых {statistics.median(scan_us):.0f} мкс"
+    )
+    print(
+        f"Сбой из {args.incident} заявок: новых заявок {parents}, "
+        f"связано как дубликаты {args.incident - parents} "
+        f"(уведомлений администратору вместо {args.incident}: {parents} + по одному на 1, 10, 100... дубликатов)"
+    )
+
+
+if __name__ == "__main__":
+    main()
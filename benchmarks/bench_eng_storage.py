@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import close_all_db_connections, get_db_connection, init_ticket_db  # noqa: E402
+from subscriber_store import SubscriberStore  # noqa: E402
+from topics import SUBSCRIPTION_PRESETS  # noqa: E402
+
+
+# Прежнее поведение eng_bot.py: sqlite3.connect в каждом обработчике, прямо в цикле событий
+async def legacy_subscribe(chat_id: int):
+    conn = sqlite3.connect("subscribers.db")
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT OR REPLACE INTO subscribers (chat_id, subscription_type) VALUES (?, ?)",
+        (chat_id, "all"),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def legacy_view_tickets(user_id: int):
+    conn = sqlite3.connect("tickets.db")
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM tickets WHERE user_id = ?", (user_id,))
+    cursor.fetchall()
+    conn.close()
+
+
+# Новое поведение: общий слой хранения с долгоживущими соединениями aiosqlite
+def pooled_handlers(store: SubscriberStore):
+    async def subscribe(chat_id: int):
+        await store.subscribe(chat_id, SUBSCRIPTION_PRESETS["all"])
+
+    async def view_tickets(user_id: int):
+        db = await get_db_connection("tickets.db")
+        async with db.execute(
+            "SELECT problem, description, status, response FROM tickets WHERE user_id = ?",
+            (user_id,),
+        ) as cursor:
+            await cursor.fetchall()
+
+    return subscribe, view_tickets
+
+
+# Измеряет максимальную задержку цикла событий, пока идет нагрузка
+async def watch_loop_lag(stop: asyncio.Event, interval: float = 0.001) -> list:
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - started - interval) * 1000)
+    return lags
+
+
+async def run_load(subscribe, view_tickets, callbacks: int, rate: int):
+    """
+    Нажатия приходят с постоянной частотой rate в секунду; задержка считается
+    от момента прихода нажатия до завершения обработчика, поэтому включает
+    и время, пока цикл событий был занят другими обработчиками.
+    """
+    latencies = []
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+
+    async def callback(index: int):
+        arrival = started_at + index / rate
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        if index % 2:
+            await subscribe(random.randint(1, 10**6))
+        else:
+            await view_tickets(random.randint(1, 1000))
+        latencies.append((loop.time() - arrival) * 1000)
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop_lag(stop))
+    await asyncio.gather(*(callback(index) for index in range(callbacks)))
+    stop.set()
+    lags = await watcher
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "max_lag": max(lags) if lags else 0.0,
+    }
+
+
+def prepare_databases():
+    conn = sqlite3.connect("tickets.db")
+    conn.execute(
+        "CREATE TABLE tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, username TEXT, "
+        "problem TEXT, description TEXT, status TEXT, response TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO tickets (user_id, problem, description, status) VALUES (?, ?, ?, ?)",
+        [(random.randint(1, 1000), "Проблема", "Описание" * 20, "Unresolved") for _ in range(20000)],
+    )
+    conn.execute("CREATE INDEX idx_tickets_user ON tickets (user_id)")
+    conn.commit()
+    conn.close()
+    conn = sqlite3.connect("subscribers.db")
+    conn.execute(
+        "CREATE TABLE subscribers (chat_id INTEGER PRIMARY KEY, username TEXT, subscription_type TEXT)"
+    )
+    conn.commit()
+    conn.close()
+
+
+def print_result(title: str, result: dict):
+    print(
+        f"{title}: p50 {result['p50']:.2f} мс, p99 {result['p99']:.2f} мс, "
+        f"макс. задержка цикла событий {result['max_lag']:.1f} мс"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк хранилища eng_bot.py под конкурентной нагрузкой")
+    parser.add_argument("--callbacks", type=int, default=3000)
+    parser.add_argument("--rate", type=int, default=3000, help="нажатий в секунду")
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        prepare_databases()
+
+        legacy = await run_load(legacy_subscribe, legacy_view_tickets, args.callbacks, args.rate)
+
+        await init_ticket_db()
+        store = SubscriberStore("subscribers.db")
+        await store.open()
+        subscribe, view_tickets = pooled_handlers(store)
+        pooled = await run_load(subscribe, view_tickets, args.callbacks, args.rate)
+        await store.close()
+        await close_all_db_connections()
+
+    print(f"Обработчиков: {args.callbacks}, частота: {args.rate}/с")
+    print_result("sqlite3.connect в обработчике", legacy)
+    print_result("Общий пул aiosqlite", pooled)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import close_all_db_connections  # noqa: E402
+from log_index import LogIndex, LogQuery  # noqa: E402
+
+ACTIONS = (
+    "запросил меню подписки.",
+    "подписался на обновления.",
+    "просмотрел свои заявки.",
+    "вернулся в главное меню.",
+)
+
+
+# Запись, похожая на то, что передает loguru: нужны только поля record
+class FakeMessage:
+    def __init__(self, record):
+        self.record = record
+
+
+class FakeLevel:
+    def __init__(self, name, no):
+        self.name = name
+        self.no = no
+
+
+class FakeTime:
+    def __init__(self, ts):
+        self.ts = ts
+
+    def timestamp(self):
+        return self.ts
+
+
+# Генерирует записи логов за последние сутки: навигация, заявки и редкие ошибки
+def generate_records(count: int, users: int):
+    started = time.time() - 86400
+    for number in range(count):
+        user_id = random.randrange(users)
+        if number % 500 == 0:
+            level, text = FakeLevel("ERROR", 40), f"Ошибка при отправке сообщения пользователю {user_id}: Forbidden"
+        elif number % 50 == 0:
+            level, text = FakeLevel("INFO", 20), f"Пользователь {user_id} (user_{user_id}) отправил заявку. ID заявки: {number}"
+        else:
+            level, text = FakeLevel("INFO", 20), f"Пользователь {user_id} (user_{user_id}) {random.choice(ACTIONS)}"
+        yield FakeMessage(
+            {
+                "message": text,
+                "extra": {},
+                "time": FakeTime(started + number * 86400 / count),
+                "level": level,
+                "module": "bot",
+                "function": "handler",
+                "line": 1,
+            }
+        )
+
+
+# Поиск перебором текстового лога (как grep по файлам на сервере), мс
+def scan_file_ms(path: str, needle: str, limit: int) -> float:
+    started = time.perf_counter()
+    found = []
+    with open(path, encoding="utf-8") as log_file:
+        for line in log_file:
+            if needle in line:
+                found.append(line)
+    found = found[-limit:]
+    return (time.perf_counter() - started) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска по индексу логов")
+    parser.add_argument("--records", type=int, default=300000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LogIndex(os.path.join(tmp, "index.db"), retention_days=30, purge_every=10**9)
+        index.open()
+        text_path = os.path.join(tmp, "debug.log")
+        started = time.perf_counter()
+        with open(text_path, "w", encoding="utf-8") as text_log:
+            for message in generate_records(args.records, args.users):
+                index.write(message)
+                text_log.write(f"{message.record['level'].name} | {message.record['message']}\n")
+        write_us = (time.perf_counter() - started) / args.records * 1e6
+
+        queries = {
+            "по пользователю": lambda: (f"user:{random.randrange(args.users)}", f"Пользователь {random.randrange(args.users)} "),
+            "по заявке": lambda: (f"ticket:{random.randrange(0, args.records, 50)}", "ID заявки: "),
+            "ошибки за 2 часа": lambda: ("level:error since:2h", "ERROR"),
+            "по тексту": lambda: ("подписался обновлен", "подписался на обновления"),
+        }
+        print(f"Записей: {args.records}, индексация {write_us:.0f} мкс на запись (в фоновом потоке логов)")
+        for title, make_query in queries.items():
+            index_ms, scan_ms = [], []
+            for _ in range(args.queries):
+                query, needle = make_query()
+                search_started = time.perf_counter()
+                await index.search(LogQuery.parse(query))
+                index_ms.append((time.perf_counter() - search_started) * 1000)
+            for _ in range(min(args.queries, 5)):
+                scan_ms.append(scan_file_ms(text_path, make_query()[1], 20))
+            print(
+                f"{title}: индекс {statistics.median(index_ms):.2f} мс, "
+                f"перебор файла {statistics.median(scan_ms):.0f} мс"
+            )
+        await close_all_db_connections()
+        index.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
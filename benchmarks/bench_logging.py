@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger  # noqa: E402
+
+from logs import LogPipeline, SampledLogger  # noqa: E402
+
+FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {module}:{function}:{line} | {message}"
+
+
+# Файловые приемники как в bot.py: debug, error, startup_shutdown, backup_operations.
+# mode: "sync" — запись в цикле событий (как раньше), "enqueue" — очередь
+# loguru с pickle, "pipeline" — фоновый поток LogPipeline (как сейчас).
+# Возвращает функцию, которая дожидается записи всех сообщений.
+def add_sinks(log_dir: str, mode: str, serialize: bool = False):
+    logger.remove()
+    pipeline = LogPipeline() if mode == "pipeline" else None
+    add = pipeline.add if pipeline else logger.add
+    options = {"enqueue": True} if mode == "enqueue" else {}
+    add(os.path.join(log_dir, "debug.log"), format=FORMAT, level="DEBUG", **options)
+    add(os.path.join(log_dir, "error.log"), format=FORMAT, level="WARNING", **options)
+    for tag in ("startup_shutdown", "backup_operations"):
+        add(
+            os.path.join(log_dir, f"{tag}.log"),
+            format=FORMAT,
+            level="INFO",
+            filter=lambda record, tag=tag: tag in record["extra"].get("tags", ""),
+            **options,
+        )
+    if serialize:
+        add(os.path.join(log_dir, "events.jsonl"), level="DEBUG", serialize=True, **options)
+    if pipeline:
+        pipeline.start()
+        return pipeline.stop
+    return logger.complete
+
+
+# Имитация обработчиков: сообщение в лог с данными пользователя.
+# Возвращает время каждого обработчика в микросекундах.
+async def run_handlers(count: int, log) -> list:
+    timings = []
+    for user_id in range(count):
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        if log is not None:
+            log.info(f"Пользователь {user_id} (user_{user_id}) запросил меню подписки.")
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк накладных расходов логирования в обработчиках")
+    parser.add_argument("--handlers", type=int, default=20000)
+    parser.add_argument("--sample-every", type=int, default=10)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        logger.remove()
+        results.append(("без логов", await run_handlers(args.handlers, None)))
+
+        sampled = SampledLogger(args.sample_every)
+        cases = [
+            ("синхронная запись (как раньше)", "sync", False, logger),
+            ("синхронная запись + JSON", "sync", True, logger),
+            ("enqueue loguru", "enqueue", False, logger),
+            ("фоновый поток", "pipeline", False, logger),
+            ("фоновый поток + JSON", "pipeline", True, logger),
+            (f"фоновый поток + выборка 1/{args.sample_every}", "pipeline", False, sampled),
+        ]
+        for title, mode, serialize, log in cases:
+            case_dir = os.path.join(tmp, str(len(results)))
+            os.makedirs(case_dir)
+            flush = add_sinks(case_dir, mode, serialize)
+            results.append((title, await run_handlers(args.handlers, log)))
+            # Очередь дописывается вне замера: важна задержка обработчика, а не фонового потока
+            if asyncio.iscoroutine(result := flush()):
+                await result
+            logger.remove()
+
+    print(f"Обработчиков: {args.handlers}")
+    for title, timings in results:
+        timings.sort()
+        print(
+            f"{title}: среднее {statistics.fmean(timings):.1f} мкс, "
+            f"p99 {timings[int(len(timings) * 0.99)]:.1f} мкс, максимум {timings[-1]:.0f} мкс"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram.types import (  # noqa: E402
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    KeyboardButton,
+    ReplyKeyboardMarkup,
+)
+
+from locales import LOCALES  # noqa: E402
+from menus import get_main_menu, get_menu  # noqa: E402
+
+tr = LOCALES["ru"]
+
+
+# Прежнее поведение: клавиатура собирается заново в каждом обработчике
+def build_admin_menu():
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text=tr.btn_admin_broadcast, callback_data="admin_broadcast")],
+            [InlineKeyboardButton(text=tr.btn_admin_tickets, callback_data="admin_tickets")],
+            [InlineKeyboardButton(text=tr.btn_admin_additional, callback_data="admin_additional")],
+            [InlineKeyboardButton(text=tr.btn_back, callback_data="back_main")],
+        ]
+    )
+
+
+def build_main_menu():
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text=tr.btn_subscribe)],
+            [KeyboardButton(text=tr.btn_support)],
+            [KeyboardButton(text=tr.btn_about)],
+            [KeyboardButton(text=tr.btn_admin)],
+        ],
+        resize_keyboard=True,
+    )
+
+
+# Время одного вызова в микросекундах
+def measure_us(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+# Память, выделяемая одним вызовом (объекты удерживаются до конца замера)
+def measure_bytes(func, repeat: int) -> float:
+    kept = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(repeat):
+        kept.append(func())
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сборки клавиатур на одно обновление")
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    cases = [
+        ("Панель администратора", build_admin_menu, lambda: get_menu(tr, "admin")),
+        ("Главное меню", build_main_menu, lambda: get_main_menu(tr, True)),
+    ]
+    for title, build, cached in cases:
+        print(
+            f"{title}: сборка {measure_us(build, args.repeat):.2f} мкс, {measure_bytes(build, 2000):.0f} байт; "
+            f"из реестра {measure_us(cached, args.repeat):.3f} мкс, {measure_bytes(cached, 2000):.0f} байт"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import close_all_db_connections, get_db_connection, init_ticket_db  # noqa: E402
+from profiles import UserProfileCache  # noqa: E402
+
+
+# Пользователь из обновления, как его заполняет aiogram
+class FakeUser:
+    __slots__ = ("id", "username")
+
+    def __init__(self, user_id: int, username: str):
+        self.id = user_id
+        self.username = username
+
+
+async def handler(event, data):
+    return None
+
+
+# Для сравнения: ник записывается в базу с commit в каждом обновлении
+async def legacy_track(handler, event, data):
+    user = data["event_from_user"]
+    db = await get_db_connection("tickets.db")
+    await db.execute(
+        "INSERT INTO user_profiles (user_id, username, updated_at) VALUES (?, ?, ?) "
+        "ON CONFLICT (user_id) DO UPDATE SET username = excluded.username, updated_at = excluded.updated_at",
+        (user.id, user.username, time.time()),
+    )
+    await db.commit()
+    return await handler(event, data)
+
+
+# Поток обновлений: активные пользователи пишут много раз, ник меняет малая доля
+def make_updates(users: int, updates: int, rename_share: float, seed: int):
+    rng = random.Random(seed)
+    usernames = {user_id: f"user{user_id}" for user_id in range(users)}
+    result = []
+    for _ in range(updates):
+        user_id = int(rng.paretovariate(1.2)) % users
+        if rng.random() < rename_share:
+            usernames[user_id] = f"user{user_id}_{rng.randrange(10**6)}"
+        result.append(FakeUser(user_id, usernames[user_id]))
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк записи ников пользователей")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--rename-share", type=float, default=0.001, help="доля обновлений со сменой ника")
+    parser.add_argument("--flush-every", type=int, default=2000, help="обновлений между записями кэша")
+    args = parser.parse_args()
+    logger.remove()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            await init_ticket_db()
+            profiles = UserProfileCache("tickets.db")
+            await profiles.open()
+            updates = make_updates(args.users, args.updates, args.rename_share, seed=1)
+            print(f"Обновлений: {args.updates}, пользователей: {args.users}")
+
+            started = time.perf_counter()
+            for user in updates:
+                await legacy_track(handler, None, {"event_from_user": user})
+            elapsed = time.perf_counter() - started
+            print(
+                f"Запись в каждом обновлении: записей с commit {args.updates}, "
+                f"{elapsed / args.updates * 1e6:.1f} мкс на обновление"
+            )
+
+            writes = commits = 0
+            started = time.perf_counter()
+            for number, user in enumerate(updates, 1):
+                await profiles.track(handler, None, {"event_from_user": user})
+                if number % args.flush_every == 0 or number == args.updates:
+                    flushed = await profiles.flush()
+                    writes += flushed
+                    commits += flushed > 0
+            elapsed = time.perf_counter() - started
+            print(
+                f"Кэш профилей: записей {writes}, commit {commits}, "
+                f"{elapsed / args.updates * 1e6:.1f} мкс на обновление"
+            )
+            await close_all_db_connections()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import close_all_db_connections, get_db_connection, init_ticket_db, insert_ticket, update_tickets_status  # noqa: E402
+from subscriber_store import SubscriberStore  # noqa: E402
+from topics import SUBSCRIPTION_PRESETS  # noqa: E402
+
+
+# Прежняя подача заявки: INSERT, commit, SELECT last_insert_rowid() и для дубликата SELECT родителя
+async def legacy_insert_ticket(user_id, parent_id):
+    db = await get_db_connection("tickets.db")
+    await db.execute(
+        "INSERT INTO tickets (user_id, username, problem, description, status, locale, parent_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (user_id, "user", "Не приходят уведомления", "После обновления", "Unresolved", "ru", parent_id),
+    )
+    await db.commit()
+    async with db.execute("SELECT last_insert_rowid()") as cursor:
+        ticket_id = (await cursor.fetchone())[0]
+    if parent_id is not None:
+        async with db.execute(
+            "SELECT (SELECT COUNT(*) FROM tickets WHERE parent_id = ?), problem FROM tickets WHERE id = ?",
+            (parent_id, parent_id),
+        ) as cursor:
+            await cursor.fetchone()
+    return ticket_id
+
+
+# Прежняя смена статуса: SELECT ID заявок, UPDATE, commit и SELECT автора для каждого уведомления
+async def legacy_set_status(ticket_id, status):
+    db = await get_db_connection("tickets.db")
+    async with db.execute("SELECT id FROM tickets WHERE id = ? OR parent_id = ?", (ticket_id, ticket_id)) as cursor:
+        ticket_ids = [row[0] for row in await cursor.fetchall()]
+    await db.execute("UPDATE tickets SET status = ? WHERE id = ? OR parent_id = ?", (status, ticket_id, ticket_id))
+    await db.commit()
+    for changed_id in ticket_ids:
+        async with db.execute("SELECT user_id, problem, locale FROM tickets WHERE id = ?", (changed_id,)) as cursor:
+            await cursor.fetchone()
+
+
+# Прежняя отписка: SELECT ника, DELETE, commit
+async def legacy_unsubscribe(store, chat_id):
+    db = store._db(chat_id)
+    async with db.execute("SELECT username FROM subscribers WHERE chat_id = ?", (chat_id,)) as cursor:
+        await cursor.fetchone()
+    await db.execute("DELETE FROM subscribers WHERE chat_id = ?", (chat_id,))
+    await db.commit()
+
+
+# Считает SQL-инструкции, выполненные на соединениях (включая BEGIN и COMMIT).
+# Инструкции триггеров FTS5 SQLite передает с префиксом '--' и не считаются,
+# а саму инструкцию с триггерами повторяет в трассировке несколько раз.
+class StatementCounter:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._last = None
+
+    def __call__(self, statement):
+        if statement.startswith("--") or statement == self._last:
+            return
+        self.count += 1
+        self._last = statement
+
+    async def attach(self, connections):
+        for db in connections:
+            await db.set_trace_callback(self)
+
+
+# Запускает обработчик runs раз: среднее число инструкций и медианное время, мс
+async def measure(counter, runs: int, handler):
+    counts, times = [], []
+    for run in range(runs):
+        counter.reset()
+        started = time.perf_counter()
+        await handler(run)
+        times.append((time.perf_counter() - started) * 1000)
+        counts.append(counter.count)
+    return statistics.mean(counts), statistics.median(times)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк числа запросов к базе на вызов обработчика")
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--duplicates", type=int, default=2, help="дубликатов у заявки, статус которой меняется")
+    args = parser.parse_args()
+    logger.remove()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            await init_ticket_db()
+            store = SubscriberStore("subscribers.db")
+            await store.open()
+            db = await get_db_connection("tickets.db")
+            counter = StatementCounter()
+            await counter.attach([db, *store._connections])
+
+            # Родительские заявки с дубликатами для смены статуса и подачи дубликатов
+            parents = []
+            for number in range(args.runs):
+                parent_id = (await insert_ticket(number, "Проблема", "Описание", "ru"))[0]
+                for _ in range(args.duplicates):
+                    await insert_ticket(number, "Проблема", "Описание", "ru", parent_id)
+                parents.append(parent_id)
+            await store.subscribe_many(
+                [(chat_id, "user", SUBSCRIPTION_PRESETS["all"]) for chat_id in range(args.runs * 2)]
+            )
+
+            scenarios = {
+                "подача заявки": (
+                    lambda run: legacy_insert_ticket(run, None),
+                    lambda run: insert_ticket(run, "Проблема", "Описание", "ru"),
+                ),
+                "подача дубликата": (
+                    lambda run: legacy_insert_ticket(run, parents[run]),
+                    lambda run: insert_ticket(run, "Проблема", "Описание", "ru", parents[run]),
+                ),
+                f"смена статуса (дубликатов: {args.duplicates})": (
+                    lambda run: legacy_set_status(parents[run], "In Progress"),
+                    lambda run: update_tickets_status([parents[run]], "In Progress"),
+                ),
+                "отписка": (
+                    lambda run: legacy_unsubscribe(store, run),
+                    lambda run: store.unsubscribe(args.runs + run),
+                ),
+            }
+            print(f"Вызовов каждого обработчика: {args.runs}")
+            for title, (legacy, current) in scenarios.items():
+                legacy_count, legacy_ms = await measure(counter, args.runs, legacy)
+                current_count, current_ms = await measure(counter, args.runs, current)
+                print(
+                    f"{title}: запросов {legacy_count:.0f} -> {current_count:.0f}, "
+                    f"время {legacy_ms:.2f} -> {current_ms:.2f} мс"
+                )
+            await store.close()
+            await close_all_db_connections()
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    asyncio.run(main())
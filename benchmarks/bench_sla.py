@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import (  # noqa: E402
+    close_all_db_connections,
+    get_db_connection,
+    init_ticket_db,
+    oldest_open_tickets,
+    resolution_percentiles,
+)
+from sla import RESOLUTION, record_durations  # noqa: E402
+
+PERCENTILES = (50, 90, 99)
+
+
+# Заполняет tickets.db заявками за год; время решения — логнормальное (медиана ~6 часов)
+async def fill_tickets(count: int, open_share: float):
+    db = await get_db_connection("tickets.db")
+    now = time.time()
+    rows = []
+    for number in range(count):
+        created_at = now - random.uniform(0, 365 * 86400)
+        if random.random() < open_share:
+            rows.append((number, "Проблема", "Описание", "Unresolved", created_at, None))
+        else:
+            duration = random.lognormvariate(10, 1.2)
+            rows.append((number, "Проблема", "Описание", "Resolved", created_at, created_at + duration))
+        if len(rows) == 10000 or number == count - 1:
+            await db.executemany(
+                "INSERT INTO tickets (user_id, problem, description, status, created_at, resolved_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # Так же гистограмма пополняется при каждом решении заявки
+            await record_durations(
+                db, RESOLUTION, [resolved_at - created_at for *_, created_at, resolved_at in rows if resolved_at]
+            )
+            rows = []
+    await db.commit()
+
+
+# Прежний способ: все открытые заявки читаются и сортируются по возрасту
+async def scan_oldest(limit: int):
+    db = await get_db_connection("tickets.db")
+    async with db.execute(
+        "SELECT id, problem, description, status, username, created_at FROM tickets "
+        "WHERE status IN ('Unresolved', 'In Progress') AND parent_id IS NULL"
+    ) as cursor:
+        tickets = await cursor.fetchall()
+    return sorted(tickets, key=lambda ticket: ticket[5])[:limit]
+
+
+# Перцентили пересчетом по всем решенным заявкам
+async def scan_percentiles():
+    db = await get_db_connection("tickets.db")
+    async with db.execute(
+        "SELECT resolved_at - created_at FROM tickets WHERE status = 'Resolved' ORDER BY 1"
+    ) as cursor:
+        durations = [row[0] for row in await cursor.fetchall()]
+    return {p: durations[min(len(durations) - 1, len(durations) * p // 100)] for p in PERCENTILES}
+
+
+async def median_ms(repeats: int, make_call):
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await make_call()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк очереди по возрасту и перцентилей SLA")
+    parser.add_argument("--tickets", type=int, default=500000)
+    parser.add_argument("--open-share", type=float, default=0.05, help="доля открытых заявок")
+    parser.add_argument("--oldest", type=int, default=10, help="сколько самых старых заявок показывать")
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+    logger.remove()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            await init_ticket_db()
+            await fill_tickets(args.tickets, args.open_share)
+            print(f"Заявок: {args.tickets}, открытых: {args.open_share:.0%}")
+
+            scan_ms, _ = await median_ms(args.repeats, lambda: scan_oldest(args.oldest))
+            index_ms, _ = await median_ms(args.repeats, lambda: oldest_open_tickets(args.oldest))
+            print(f"{args.oldest} самых старых открытых: перебор {scan_ms:.2f} мс, индекс {index_ms:.2f} мс")
+
+            scan_ms, exact = await median_ms(args.repeats, scan_percentiles)
+            histogram_ms, (_, approximate) = await median_ms(args.repeats, resolution_percentiles)
+            print(f"Перцентили времени решения: пересчет {scan_ms:.1f} мс, гистограмма {histogram_ms:.2f} мс")
+            for p in PERCENTILES:
+                print(
+                    f"  p{p}: точно {exact[p] / 3600:.2f} ч, по гистограмме {approximate[p] / 3600:.2f} ч "
+                    f"({(approximate[p] / exact[p] - 1) * 100:+.1f}%)"
+                )
+            await close_all_db_connections()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db import close_all_db_connections, init_ticket_db  # noqa: E402
+from subscriber_store import SubscriberStore  # noqa: E402
+
+# Фиктивные настройки: бот импортируется, но к Telegram не подключается
+BOT_ENV = {"BOT_TOKEN": "123456:ABCdefGHIjklMNOpqrSTUvwxYZ012345678", "ADMIN_ID": "1"}
+
+
+# Время импорта aiogram и собственного кода bot.py в отдельном процессе, мс
+def measure_import_ms(cwd: str) -> tuple:
+    code = (
+        "import sys, time; sys.path.insert(0, sys.argv[1]); started = time.perf_counter(); "
+        "import aiogram.types; middle = time.perf_counter(); import bot; finished = time.perf_counter(); "
+        "print((middle - started) * 1000, (finished - middle) * 1000)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, ROOT],
+        cwd=cwd,
+        env={**os.environ, **BOT_ENV},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    aiogram_ms, own_ms = result.stdout.strip().splitlines()[-1].split()
+    return float(aiogram_ms), float(own_ms)
+
+
+# Время открытия баз заявок и подписчиков, мс
+async def measure_init_ms(shards: int, concurrent: bool) -> float:
+    store = SubscriberStore("subscribers.db", shards)
+    started = time.perf_counter()
+    if concurrent:
+        await asyncio.gather(init_ticket_db(), store.open())
+    else:
+        await init_ticket_db()
+        await store.open()
+    elapsed = (time.perf_counter() - started) * 1000
+    await store.close()
+    await close_all_db_connections()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк этапов запуска бота")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        imports = [measure_import_ms(tmp) for _ in range(args.runs)]
+
+        sequential, concurrent = [], []
+        for _ in range(args.runs):
+            sequential.append(await measure_init_ms(args.shards, concurrent=False))
+            concurrent.append(await measure_init_ms(args.shards, concurrent=True))
+
+    print(
+        f"Импорт: aiogram {statistics.median(ms for ms, _ in imports):.0f} мс, "
+        f"собственный код bot.py {statistics.median(ms for _, ms in imports):.0f} мс"
+    )
+    print(
+        f"Открытие баз ({args.shards} шардов подписчиков): последовательно {statistics.median(sequential):.1f} мс, "
+        f"одновременно {statistics.median(concurrent):.1f} мс"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
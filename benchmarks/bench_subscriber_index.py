@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subscriber_index import SubscriberIndex  # noqa: E402
+from subscriber_store import SubscriberStore  # noqa: E402
+from topics import SUBSCRIPTION_PRESETS, Segment  # noqa: E402
+
+# Сегмент рассылки обновлений: все подписчики с темой "updates"
+SEGMENT = Segment.parse("updates")
+
+
+# Генерирует случайных подписчиков: 70% "all", 30% "updates"
+def make_rows(count: int):
+    chat_ids = random.sample(range(10**6, 7 * 10**9), count)
+    return [
+        (chat_id, None, SUBSCRIPTION_PRESETS["all" if random.random() < 0.7 else "updates"])
+        for chat_id in chat_ids
+    ]
+
+
+# Замеряет время выполнения функции в микросекундах (среднее за repeat запусков)
+def measure_us(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def bench_sqlite(rows, lookups):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SubscriberStore(os.path.join(tmp, "subscribers.db"))
+        await store.open()
+        await store.subscribe_many(rows)
+
+        started = time.perf_counter()
+        for chat_id in lookups:
+            await store.get_topics(chat_id)
+        lookup_us = (time.perf_counter() - started) / len(lookups) * 1e6
+
+        started = time.perf_counter()
+        first_batch_ms = None
+        targeted = 0
+        async for batch in store.iter_batches(SEGMENT):
+            if first_batch_ms is None:
+                first_batch_ms = (time.perf_counter() - started) * 1000
+            targeted += len(batch)
+        full_ms = (time.perf_counter() - started) * 1000
+        await store.close()
+    return lookup_us, first_batch_ms, full_ms, targeted
+
+
+def bench_index(rows, lookups):
+    tracemalloc.start()
+    index = SubscriberIndex()
+    index.extend((chat_id, topics) for chat_id, _, topics in rows)
+    index.sort()
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+
+    lookup_us = measure_us(lambda: index.get(random.choice(lookups)), 10000)
+    first_batch_us = measure_us(lambda: next(index.iter_batches(SEGMENT.masks(), 500)), 10000)
+
+    started = time.perf_counter()
+    targeted = sum(len(batch) for batch in index.iter_batches(SEGMENT.masks(), 500))
+    full_ms = (time.perf_counter() - started) * 1000
+
+    new_chat_id = 10**10
+    add_us = measure_us(lambda: index.add(new_chat_id, SUBSCRIPTION_PRESETS["updates"]), 1000)
+    return memory_mb, lookup_us, first_batch_us, full_ms, targeted, add_us
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк индекса подписчиков в памяти")
+    parser.add_argument("--subscribers", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    rows = make_rows(args.subscribers)
+    lookups = [row[0] for row in random.sample(rows, 1000)]
+
+    sql_lookup_us, sql_first_ms, sql_full_ms, sql_targeted = await bench_sqlite(rows, lookups)
+    memory_mb, idx_lookup_us, idx_first_us, idx_full_ms, idx_targeted, idx_add_us = bench_index(
+        rows, lookups
+    )
+    assert sql_targeted == idx_targeted == args.subscribers
+
+    print(f"Подписчиков: {args.subscribers}")
+    print(f"Индекс в памяти: {memory_mb:.1f} МБ")
+    print(f"Тип подписки пользователя: SQLite {sql_lookup_us:.1f} мкс, индекс {idx_lookup_us:.2f} мкс")
+    print(f"Первая пачка получателей: SQLite {sql_first_ms:.2f} мс, индекс {idx_first_us:.2f} мкс")
+    print(f"Все получатели: SQLite {sql_full_ms:.1f} мс, индекс {idx_full_ms:.1f} мс")
+    print(f"Запись в индекс (write-through): {idx_add_us:.1f} мкс")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
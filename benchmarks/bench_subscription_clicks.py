@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subscriber_store import SubscriberStore  # noqa: E402
+from topics import SUBSCRIPTION_PRESETS  # noqa: E402
+
+MENU_TEXT = "Настройте свою подписку:\n\nТекущая подписка: {current}"
+
+
+# Сообщение с меню подписки: правка занимает api_ms, правка без изменений
+# считается ошибкой 'message is not modified', как в Telegram
+class FakeMessage:
+    def __init__(self, api_ms: float):
+        self.text = MENU_TEXT.format(current="Нет подписки")
+        self.api_ms = api_ms
+        self.edits = 0
+        self.not_modified = 0
+
+    async def edit_text(self, text: str):
+        await asyncio.sleep(self.api_ms / 1000)
+        self.edits += 1
+        if text == self.text:
+            self.not_modified += 1
+        self.text = text
+
+
+# Прежний обработчик: запись, commit и правка сообщения на каждое нажатие
+async def legacy_click(store: SubscriberStore, message: FakeMessage, chat_id: int, preset: str):
+    db = store._db(chat_id)
+    await db.execute(
+        "INSERT OR REPLACE INTO subscribers (chat_id, username, topics) VALUES (?, ?, ?)",
+        (chat_id, "user", SUBSCRIPTION_PRESETS[preset]),
+    )
+    await db.commit()
+    await message.edit_text(MENU_TEXT.format(current=preset))
+    return True
+
+
+# Текущий обработчик: запись только при смене подписки, правка только при смене текста
+async def current_click(store: SubscriberStore, message: FakeMessage, chat_id: int, preset: str):
+    changed = await store.subscribe(chat_id, SUBSCRIPTION_PRESETS[preset])
+    text = MENU_TEXT.format(current=preset)
+    if message.text != text:
+        await message.edit_text(text)
+    return changed
+
+
+async def run_storm(store, click, users: int, clicks: int, switch_share: float, api_ms: float, seed: int):
+    rng = random.Random(seed)
+    messages = [FakeMessage(api_ms) for _ in range(users)]
+
+    # Пользователь жмет кнопку раз за разом; иногда переключается на другую подписку
+    async def user_clicks(chat_id: int):
+        preset = "all"
+        writes = 0
+        for _ in range(clicks):
+            if rng.random() < switch_share:
+                preset = "updates" if preset == "all" else "all"
+            writes += await click(store, messages[chat_id], chat_id, preset)
+        return writes
+
+    started = time.perf_counter()
+    writes = sum(await asyncio.gather(*(user_clicks(chat_id) for chat_id in range(users))))
+    elapsed = time.perf_counter() - started
+    return writes, sum(m.edits for m in messages), sum(m.not_modified for m in messages), elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк повторных нажатий кнопок подписки")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--clicks", type=int, default=10, help="нажатий каждого пользователя")
+    parser.add_argument("--switch-share", type=float, default=0.1, help="доля нажатий, меняющих подписку")
+    parser.add_argument("--api-ms", type=float, default=50, help="время ответа Telegram на правку сообщения")
+    args = parser.parse_args()
+    logger.remove()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            print(
+                f"Пользователей: {args.users}, нажатий каждого: {args.clicks}, "
+                f"меняют подписку: {args.switch_share:.0%} нажатий"
+            )
+            for title, click in (("Прежние обработчики", legacy_click), ("С кэшем подписок", current_click)):
+                store = SubscriberStore(f"{click.__name__}.db")
+                await store.open()
+                writes, edits, not_modified, elapsed = await run_storm(
+                    store, click, args.users, args.clicks, args.switch_share, args.api_ms, seed=1
+                )
+                await store.close()
+                print(
+                    f"{title}: записей с commit {writes}, правок сообщений {edits} "
+                    f"(из них 'message is not modified': {not_modified}), время {elapsed:.2f} с"
+                )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import (  # noqa: E402
+    AUTHOR_ADMIN,
+    AUTHOR_USER,
+    append_ticket_message,
+    close_all_db_connections,
+    get_db_connection,
+    init_ticket_db,
+    ticket_thread_page,
+)
+
+PAGE_SIZE = 8
+
+# Для сравнения: обычная таблица с rowid и индексом по заявке, страница через OFFSET
+NAIVE_SCHEMA = """
+CREATE TABLE naive_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id INTEGER NOT NULL,
+    author TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX idx_naive_messages_ticket ON naive_messages(ticket_id);
+"""
+
+
+# Заполняет обе таблицы: сообщения разных заявок приходят вперемешку, как в жизни
+async def fill_messages(tickets: int, messages: int):
+    db = await get_db_connection("tickets.db")
+    await db.executescript(NAIVE_SCHEMA)
+    now = time.time()
+    seqs = [0] * tickets
+    threaded, naive = [], []
+    for number in range(tickets * messages):
+        ticket_id = random.randrange(tickets)
+        while seqs[ticket_id] == messages:
+            ticket_id = (ticket_id + 1) % tickets
+        seqs[ticket_id] += 1
+        author = AUTHOR_ADMIN if seqs[ticket_id] % 2 == 0 else AUTHOR_USER
+        text = "Сообщение " * random.randint(5, 30)
+        threaded.append((ticket_id, seqs[ticket_id], author, text, now))
+        naive.append((ticket_id, author, text, now))
+        if len(threaded) == 10000 or number == tickets * messages - 1:
+            await db.executemany(
+                "INSERT INTO ticket_messages (ticket_id, seq, author, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                threaded,
+            )
+            await db.executemany(
+                "INSERT INTO naive_messages (ticket_id, author, text, created_at) VALUES (?, ?, ?, ?)", naive
+            )
+            threaded, naive = [], []
+    await db.commit()
+
+
+async def naive_page(ticket_id: int, page: int):
+    db = await get_db_connection("tickets.db")
+    async with db.execute(
+        "SELECT COUNT(*) FROM naive_messages WHERE ticket_id = ?", (ticket_id,)
+    ) as cursor:
+        total = (await cursor.fetchone())[0]
+    async with db.execute(
+        "SELECT id, author, text, created_at FROM naive_messages WHERE ticket_id = ? ORDER BY id LIMIT ? OFFSET ?",
+        (ticket_id, PAGE_SIZE, page * PAGE_SIZE),
+    ) as cursor:
+        return await cursor.fetchall(), total
+
+
+async def naive_append(ticket_id: int, author: str, text: str):
+    db = await get_db_connection("tickets.db")
+    await db.execute(
+        "INSERT INTO naive_messages (ticket_id, author, text, created_at) VALUES (?, ?, ?, ?)",
+        (ticket_id, author, text, time.time()),
+    )
+    await db.commit()
+
+
+async def median_ms(calls):
+    times = []
+    for make_call in calls:
+        started = time.perf_counter()
+        await make_call()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк переписки по заявкам")
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=300, help="сообщений в каждой заявке")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    logger.remove()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            await init_ticket_db()
+            await fill_messages(args.tickets, args.messages)
+            print(f"Заявок: {args.tickets}, сообщений в каждой: {args.messages}")
+
+            last_page = (args.messages - 1) // PAGE_SIZE
+            for title, page in (("первая", 0), ("средняя", last_page // 2), ("последняя", last_page)):
+                ticket_ids = [random.randrange(args.tickets) for _ in range(args.repeats)]
+                naive_ms = await median_ms([lambda t=t: naive_page(t, page) for t in ticket_ids])
+                thread_ms = await median_ms([lambda t=t: ticket_thread_page(t, page, PAGE_SIZE) for t in ticket_ids])
+                print(f"Страница ({title}): rowid + OFFSET {naive_ms:.3f} мс, (ticket_id, seq) {thread_ms:.3f} мс")
+
+            ticket_ids = [random.randrange(args.tickets) for _ in range(args.repeats)]
+            naive_ms = await median_ms([lambda t=t: naive_append(t, AUTHOR_USER, "Ответ") for t in ticket_ids])
+            thread_ms = await median_ms(
+                [lambda t=t: append_ticket_message(t, AUTHOR_USER, "Ответ") for t in ticket_ids]
+            )
+            print(f"Добавление сообщения: rowid {naive_ms:.3f} мс, (ticket_id, seq) {thread_ms:.3f} мс")
+            await close_all_db_connections()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
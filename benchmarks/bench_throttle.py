@@ -0,0 +1,100 @@
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from throttle import UserThrottle  # noqa: E402
+
+
+# Для сравнения: классическое ведро токенов, [токены, время пополнения] на пользователя
+class ListBuckets:
+    def __init__(self, count: int, period: float):
+        self.capacity = count
+        self.rate = count / period
+        self.buckets = {}
+
+    def hit(self, user_id: int, now: float) -> bool:
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            bucket = self.buckets[user_id] = [float(self.capacity), now]
+        bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+
+def measure_memory(make, hit, users: int):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    limiter = make()
+    for user_id in range(users):
+        hit(limiter, user_id)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / users
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк ограничения частоты запросов пользователей")
+    parser.add_argument("--users", type=int, default=100000, help="активных пользователей")
+    parser.add_argument("--hits", type=int, default=1000000)
+    parser.add_argument("--count", type=int, default=5, help="запросов за период")
+    parser.add_argument("--period", type=float, default=10)
+    parser.add_argument("--flood", type=int, default=10000, help="запросов от одного клиента за период")
+    args = parser.parse_args()
+    logger.remove()
+    rules = {"default": (args.count, args.period)}
+
+    user_ids = [random.randrange(args.users) for _ in range(args.hits)]
+    for title, limiter, hit in (
+        ("GCRA (одно число)", UserThrottle(rules), lambda limiter, user_id, now: limiter.hit("default", user_id, now)),
+        ("[токены, время]", ListBuckets(args.count, args.period), lambda limiter, user_id, now: limiter.hit(user_id, now)),
+    ):
+        started = time.perf_counter()
+        for number, user_id in enumerate(user_ids):
+            hit(limiter, user_id, number * args.period / args.hits)
+        elapsed = time.perf_counter() - started
+        print(f"{title}: {elapsed / args.hits * 1e9:.0f} нс на запрос")
+
+    gcra_bytes = measure_memory(
+        lambda: UserThrottle(rules), lambda limiter, user_id: limiter.hit("default", user_id, 0.0), args.users
+    )
+    list_bytes = measure_memory(
+        lambda: ListBuckets(args.count, args.period), lambda limiter, user_id: limiter.hit(user_id, 0.0), args.users
+    )
+    print(f"Память на пользователя: GCRA {gcra_bytes:.0f} байт, [токены, время] {list_bytes:.0f} байт")
+
+    throttle = UserThrottle(rules)
+    for user_id in range(args.users):
+        throttle.hit("default", user_id, now=1.0)
+    started = time.perf_counter()
+    throttle.sweep(now=1.0 + args.period)
+    print(
+        f"Очистка через {args.period:.0f} с: {args.users} записей удалено за "
+        f"{(time.perf_counter() - started) * 1000:.1f} мс, осталось {len(throttle)}"
+    )
+
+    # Один клиент шлет flood запросов за период, обычные пользователи — по два
+    throttle = UserThrottle(rules)
+    abusive_passed = sum(
+        not throttle.hit("default", -1, now=2.0 + number * args.period / args.flood) for number in range(args.flood)
+    )
+    normal_passed = sum(
+        not throttle.hit("default", user_id, now=2.0) for user_id in range(1000) for _ in range(2)
+    )
+    print(
+        f"Флуд: из {args.flood} запросов одного клиента до обработчиков дошло {abusive_passed}, "
+        f"у 1000 обычных пользователей — {normal_passed} из 2000"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import close_all_db_connections, get_db_connection, init_ticket_db, search_tickets  # noqa: E402
+
+PROBLEMS = (
+    "Не приходят уведомления",
+    "Ошибка оплаты подписки",
+    "Бот не отвечает на команды",
+    "Не открывается меню",
+    "Дублируются сообщения",
+    "Проблема с обновлением",
+)
+WORDS = (
+    "после", "обновления", "бот", "перестал", "отвечать", "телефон", "android", "iphone", "вчера",
+    "сегодня", "сообщение", "кнопка", "меню", "ошибка", "оплата", "карта", "подписка", "канал",
+    "уведомление", "задержка", "дважды", "пропало", "язык", "настройки", "версия", "сервер",
+)
+
+
+# Случайный текст заявки; редкие слова встречаются примерно в одной заявке из тысячи
+def random_description(number: int) -> str:
+    words = random.choices(WORDS, k=12)
+    if number % 1000 == 0:
+        words.append(f"редкийкод{number}")
+    return " ".join(words)
+
+
+# Заполняет tickets.db заявками; индекс FTS5 обновляется триггерами
+async def fill_tickets(count: int):
+    db = await get_db_connection("tickets.db")
+    batch = []
+    for number in range(count):
+        batch.append(
+            (number % 50000, f"user_{number}", random.choice(PROBLEMS), random_description(number), "Unresolved")
+        )
+        if len(batch) == 10000:
+            await db.executemany(
+                "INSERT INTO tickets (user_id, username, problem, description, status) VALUES (?, ?, ?, ?, ?)", batch
+            )
+            batch = []
+    if batch:
+        await db.executemany(
+            "INSERT INTO tickets (user_id, username, problem, description, status) VALUES (?, ?, ?, ?, ?)", batch
+        )
+    await db.commit()
+
+
+# Поиск перебором: LIKE по трем полям без индекса, мс
+async def like_search_ms(word: str, limit: int) -> float:
+    db = await get_db_connection("tickets.db")
+    pattern = f"%{word}%"
+    started = time.perf_counter()
+    async with db.execute(
+        "SELECT id, status, username, problem FROM tickets "
+        "WHERE problem LIKE ? OR description LIKE ? OR response LIKE ? LIMIT ?",
+        (pattern, pattern, pattern, limit),
+    ) as cursor:
+        await cursor.fetchall()
+    return (time.perf_counter() - started) * 1000
+
+
+async def search_ms(words, limit: int, offset: int = 0) -> float:
+    started = time.perf_counter()
+    await search_tickets(words, limit, offset)
+    return (time.perf_counter() - started) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк полнотекстового поиска заявок")
+    parser.add_argument("--tickets", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        await init_ticket_db()
+        started = time.perf_counter()
+        await fill_tickets(args.tickets)
+        print(f"Заявок: {args.tickets}, заполнение с индексом {time.perf_counter() - started:.1f} с")
+
+        cases = {
+            "редкое слово": lambda: [f"редкийкод{random.randrange(0, args.tickets, 1000)}"],
+            "два слова": lambda: ["оплата", "дважды"],
+            "частое слово": lambda: ["меню"],
+            "частый префикс": lambda: ["мен*"],
+        }
+        for title, make_words in cases.items():
+            fts = [await search_ms(make_words(), args.page_size + 1) for _ in range(args.queries)]
+            like = [
+                await like_search_ms(make_words()[0].rstrip("*"), args.page_size + 1)
+                for _ in range(min(args.queries, 3))
+            ]
+            print(
+                f"{title}: FTS5 {statistics.median(fts):.2f} мс, "
+                f"LIKE {statistics.median(like):.1f} мс"
+            )
+        page = [await search_ms(["оплата", "дважды"], args.page_size + 1, 10 * args.page_size) for _ in range(5)]
+        print(f"11-я страница по двум словам: FTS5 {statistics.median(page):.2f} мс")
+        await close_all_db_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
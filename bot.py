@@ -1,72 +1,286 @@
 import asyncio
+import html
+import math
 import os
+import sys
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 import io
 
+# Момент начала импорта — точка отсчета для отчета о времени запуска
+IMPORT_STARTED = time.perf_counter()
+
 import aiosqlite
 from aiogram import Bot, Dispatcher, types, F
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
-from aiogram.types import (
-    ReplyKeyboardMarkup,
-    KeyboardButton,
-    InlineKeyboardMarkup,
-    InlineKeyboardButton,
-)
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from dotenv import load_dotenv
 from loguru import logger
 
+from admin_notify import AdminNotifier, TicketPriority
+from archive import TicketArchive
+from broadcaster import Broadcaster
+from callbacks import SEPARATOR, CallbackRouter
+from db import (
+    AUTHOR_ADMIN,
+    AUTHOR_USER,
+    SNIPPET_END,
+    SNIPPET_START,
+    append_ticket_message,
+    close_db_connection,
+    get_db_connection,
+    init_ticket_db,
+    insert_ticket,
+    oldest_open_tickets,
+    resolution_percentiles,
+    search_tickets,
+    update_tickets_status,
+)
+from delivery import DeliveryReport, deliver_messages
+from digest import DigestBuffer, build_digests
+from locales import ADMIN_LOCALE, DEFAULT_LOCALE, Locale, button_texts, get_locale, get_locale_by_code
+from log_index import LogIndex, LogQuery
+from logs import LogPipeline, SampledLogger
+from menus import get_back_menu, get_main_menu, get_menu
+from profiles import UserProfileCache
+from startup import StartupTimer
+from subscriber_index import SubscriberIndex
+from subscriber_store import SubscriberStore
+from throttle import ThrottleMiddleware, UserThrottle, parse_throttle_rules
+from ticket_dedup import DuplicateIndex, from_signed, simhash, to_signed
+from topics import SUBSCRIPTION_PRESETS, TOPICS, Segment, preset_for_topics
+
 # Загрузка переменных окружения
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 ADMIN_ID = int(os.getenv("ADMIN_ID"))
+# Группа с публикациями 'Update'/'Fixes' для пересылки подписчикам (необязательно)
+GROUP_ID = int(os.getenv("GROUP_ID")) if os.getenv("GROUP_ID") else None
+SUBSCRIBER_SHARDS = int(os.getenv("SUBSCRIBER_SHARDS", "1"))
+SUBSCRIBER_BATCH_SIZE = int(os.getenv("SUBSCRIBER_BATCH_SIZE", "500"))
+SUBSCRIBER_INDEX = os.getenv("SUBSCRIBER_INDEX", "0") == "1"
+# Без индекса подписки последних SUBSCRIBER_CACHE_SIZE пользователей кэшируются
+# в памяти, чтобы повторные нажатия не записывали в базу то же самое
+SUBSCRIBER_CACHE_SIZE = int(os.getenv("SUBSCRIBER_CACHE_SIZE", "10000"))
+# Поиск дубликатов заявок: похожей считается открытая заявка, сигнатура
+# текста которой отличается не более чем в TICKET_DUPLICATE_DISTANCE битах из 64
+TICKET_DEDUP = os.getenv("TICKET_DEDUP", "1") == "1"
+TICKET_DUPLICATE_DISTANCE = int(os.getenv("TICKET_DUPLICATE_DISTANCE", "6"))
+# Уведомления администратору о заявках копятся и отправляются сводкой раз в
+# ADMIN_NOTIFY_INTERVAL секунд или при ADMIN_NOTIFY_MAX_BATCH уведомлениях
+# (0 — отправлять каждое сразу); заявки с ключевыми словами из
+# TICKET_URGENT_KEYWORDS (через запятую) отправляются сразу
+ADMIN_NOTIFY_INTERVAL = float(os.getenv("ADMIN_NOTIFY_INTERVAL", "30"))
+ADMIN_NOTIFY_MAX_BATCH = int(os.getenv("ADMIN_NOTIFY_MAX_BATCH", "10"))
+TICKET_URGENT_KEYWORDS = os.getenv("TICKET_URGENT_KEYWORDS", "").split(",")
+# Решенные заявки старше TICKET_ARCHIVE_DAYS дней переносятся в архив пачками
+# по TICKET_ARCHIVE_BATCH раз в TICKET_ARCHIVE_INTERVAL секунд (0 дней — не переносить)
+TICKET_ARCHIVE_DAYS = float(os.getenv("TICKET_ARCHIVE_DAYS", "90"))
+TICKET_ARCHIVE_BATCH = int(os.getenv("TICKET_ARCHIVE_BATCH", "500"))
+TICKET_ARCHIVE_INTERVAL = float(os.getenv("TICKET_ARCHIVE_INTERVAL", "3600"))
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "10"))
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "25"))
+# Сколько секунд при остановке бота ждать доставки рассылок из очереди
+BROADCAST_SHUTDOWN_TIMEOUT = float(os.getenv("BROADCAST_SHUTDOWN_TIMEOUT", "30"))
+# Дайджест публикаций из группы: пауза в секундах, после которой накопленные
+# публикации отправляются одним сообщением (0 — отправлять каждую сразу)
+DIGEST_WINDOW = float(os.getenv("DIGEST_WINDOW", "0"))
+DIGEST_MAX_DELAY = float(os.getenv("DIGEST_MAX_DELAY", str(DIGEST_WINDOW * 4)))
+DIGEST_MAX_POSTS = int(os.getenv("DIGEST_MAX_POSTS", "20"))
+# Резервная копия при запуске: пропускается, если последняя моложе указанного
+# числа часов, иначе создается с задержкой, чтобы не мешать первым обновлениям
+BACKUP_STARTUP_MAX_AGE_HOURS = float(os.getenv("BACKUP_STARTUP_MAX_AGE_HOURS", "24"))
+BACKUP_STARTUP_DELAY = float(os.getenv("BACKUP_STARTUP_DELAY", "60"))
+# Логи: минимальный уровень для консоли и debug.log, запись одного из
+# LOG_SAMPLE_EVERY сообщений о навигации пользователей, дополнительный JSON-лог
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1"))
+LOG_JSON = os.getenv("LOG_JSON", "0") == "1"
+# Значения переменных в трассировках error.log: полезно при отладке, но дорого
+# и может раскрыть токены и персональные данные
+LOG_DIAGNOSE = os.getenv("LOG_DIAGNOSE", "0") == "1"
+# Срок хранения записей в индексе логов для поиска (0 — индекс отключен)
+LOG_INDEX_RETENTION_DAYS = float(os.getenv("LOG_INDEX_RETENTION_DAYS", "30"))
+# Ники пользователей ведет кэш профилей: изменения записываются в базу раз
+# в PROFILE_FLUSH_INTERVAL секунд и при остановке бота
+PROFILE_FLUSH_INTERVAL = float(os.getenv("PROFILE_FLUSH_INTERVAL", "30"))
+# Целевое время от запуска процесса до готовности принимать обновления
+STARTUP_TARGET_MS = float(os.getenv("STARTUP_TARGET_MS", "2000"))
+# Антифлуд: не больше N запросов пользователя за S секунд в каждой группе
+# обработчиков, правила 'группа=N/S' через запятую (пусто — без ограничений).
+# Группы: start (/start), subscription (подписка и отписка), ticket (подача
+# заявки и сообщения в переписке), default (остальные запросы в личном чате)
+THROTTLE_RULES = parse_throttle_rules(
+    os.getenv("THROTTLE_RULES", "start=3/30,subscription=5/10,ticket=5/60,default=20/10")
+)
 
 # Определение версии бота
 BOT_VERSION = "3.00"
 
-# Создание папки log, если она не существует
+# Число заявок на странице результатов поиска
+TICKET_SEARCH_PAGE_SIZE = 5
+# Число самых старых открытых заявок в списке нерешенных
+TICKET_QUEUE_SIZE = 10
+# Число заявок на странице множественного выбора (Telegram ограничивает
+# клавиатуру сотней кнопок)
+BULK_TICKETS_PAGE_SIZE = 20
+# Число сообщений на странице переписки и длина сообщения в ней: страница
+# целиком помещается в одно сообщение Telegram
+THREAD_PAGE_SIZE = 8
+THREAD_MESSAGE_PREVIEW = 400
+# Число последних заявок пользователя с кнопкой открытия переписки
+USER_THREAD_TICKETS = 10
+
+# Папка логов
 log_dir = os.path.join(os.path.dirname(__file__), "log")
-os.makedirs(log_dir, exist_ok=True)
-
-# Настройка логгера loguru с добавлением цветов
-logger.add(
-    os.path.join(log_dir, "debug.log"),
-    rotation="10 MB",
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
-    level="DEBUG",
-)
-logger.add(
-    os.path.join(log_dir, "error.log"),
-    rotation="1 week",
-    format="<red>{time:YYYY-MM-DD HH:mm:ss}</red> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
-    level="WARNING",
-    backtrace=True,
-    diagnose=True,
-)
-logger.add(
-    os.path.join(log_dir, "startup_shutdown.log"),
-    rotation="100 MB",
-    format="<blue>{time:YYYY-MM-DD HH:mm:ss}</blue> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
-    level="INFO",
-    filter=lambda record: "tags" in record["extra"]
-    and "startup_shutdown" in record["extra"]["tags"],
-)
-logger.add(
-    os.path.join(log_dir, "backup_operations.log"),
-    rotation="1 week",
-    format="<yellow>{time:YYYY-MM-DD HH:mm:ss}</yellow> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
-    level="INFO",
-    filter=lambda record: "tags" in record["extra"]
-    and "backup_operations" in record["extra"]["tags"],
+# Индекс логов для поиска из панели администратора
+log_index = (
+    LogIndex(os.path.join(log_dir, "index.db"), LOG_INDEX_RETENTION_DAYS)
+    if LOG_INDEX_RETENTION_DAYS > 0
+    else None
 )
 
+
+# Настраивает логи loguru с добавлением цветов. Вызывается при запуске бота,
+# а не при импорте; файлы создаются при первой записи в них. Консоль и файлы
+# подключены к фоновому потоку: обработчики только ставят сообщения в очередь.
+def setup_logging() -> LogPipeline:
+    os.makedirs(log_dir, exist_ok=True)
+    logger.remove()  # Стандартный вывод в консоль пишет синхронно
+    log_pipeline = LogPipeline()
+    log_pipeline.add(sys.stderr, level=LOG_LEVEL)
+    log_pipeline.add(
+        os.path.join(log_dir, "debug.log"),
+        delay=True,
+        rotation="10 MB",
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
+        level=LOG_LEVEL,
+    )
+    log_pipeline.add(
+        os.path.join(log_dir, "error.log"),
+        delay=True,
+        rotation="1 week",
+        format="<red>{time:YYYY-MM-DD HH:mm:ss}</red> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
+        level="WARNING",
+        backtrace=True,
+        diagnose=LOG_DIAGNOSE,
+    )
+    log_pipeline.add(
+        os.path.join(log_dir, "startup_shutdown.log"),
+        delay=True,
+        rotation="100 MB",
+        format="<blue>{time:YYYY-MM-DD HH:mm:ss}</blue> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
+        level="INFO",
+        filter=lambda record: "tags" in record["extra"]
+        and "startup_shutdown" in record["extra"]["tags"],
+    )
+    log_pipeline.add(
+        os.path.join(log_dir, "backup_operations.log"),
+        delay=True,
+        rotation="1 week",
+        format="<yellow>{time:YYYY-MM-DD HH:mm:ss}</yellow> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
+        level="INFO",
+        filter=lambda record: "tags" in record["extra"]
+        and "backup_operations" in record["extra"]["tags"],
+    )
+    if LOG_JSON:
+        # Структурированные записи (JSON в строке) для сбора и анализа логов
+        log_pipeline.add(
+            os.path.join(log_dir, "events.jsonl"),
+            delay=True,
+            rotation="50 MB",
+            level=LOG_LEVEL,
+            serialize=True,
+        )
+    if log_index is not None:
+        # Записи от INFO и выше индексируются в фоновом потоке логов
+        log_index.open()
+        log_pipeline.add(log_index.write, level="INFO", format="{message}")
+    # В очередь попадают записи, нужные хотя бы одному приемнику: startup_shutdown
+    # и backup_operations пишут INFO независимо от LOG_LEVEL
+    log_pipeline.start(min(logger.level(LOG_LEVEL).no, logger.level("INFO").no))
+    return log_pipeline
+
+
+# Сообщения о навигации по меню: частые и малоинформативные, поэтому выборочные
+navigation_log = SampledLogger(LOG_SAMPLE_EVERY)
+
 # Инициализация бота и диспетчера
 bot = Bot(token=BOT_TOKEN)
 dp = Dispatcher()
+# Все нажатия на inline-кнопки разбирает один обработчик с таблицей действий
+callback_router = CallbackRouter()
+dp.callback_query.register(callback_router.dispatch)
+# Отчет о времени запуска: этапы, готовность к приему обновлений, первое обновление
+startup_timer = StartupTimer(STARTUP_TARGET_MS, started=IMPORT_STARTED)
+dp.startup.register(startup_timer.ready)
+dp.update.outer_middleware(startup_timer.first_update)
+# Ник отправителя каждого обновления попадает в кэш профилей; в базу — пачкой
+user_profiles = UserProfileCache("tickets.db", PROFILE_FLUSH_INTERVAL)
+dp.update.outer_middleware(user_profiles.track)
+dp.shutdown.register(user_profiles.flush)
+
+# Группы антифлуда для действий inline-кнопок; остальные действия — default
+THROTTLE_CALLBACK_GROUPS = {
+    "subscribe_all": "subscription",
+    "subscribe_updates": "subscription",
+    "unsubscribe": "subscription",
+    "send_ticket": "ticket",
+    "thread_reply": "ticket",
+}
+SUBSCRIBE_BUTTON_TEXTS = button_texts("btn_subscribe")
+
+
+# Группа антифлуда и ID пользователя для обновления; администратор и
+# сообщения не из личного чата (публикации группы) не ограничиваются
+def throttle_key(event):
+    user = event.from_user
+    if user is None or user.id == ADMIN_ID:
+        return None
+    if isinstance(event, types.CallbackQuery):
+        action = (event.data or "").split(SEPARATOR, 1)[0]
+        return THROTTLE_CALLBACK_GROUPS.get(action, "default"), user.id
+    if event.chat.type != "private":
+        return None
+    text = event.text or ""
+    if text.startswith("/start"):
+        return "start", user.id
+    if text in SUBSCRIBE_BUTTON_TEXTS:
+        return "subscription", user.id
+    return "default", user.id
+
+
+# Отклоненное нажатие только получает ответ (без обращения к базам), чтобы
+# у пользователя не висели часы на кнопке; отклоненные сообщения отбрасываются
+async def reject_throttled(event, wait: float):
+    if isinstance(event, types.CallbackQuery):
+        await event.answer(get_locale(event.from_user).throttled(seconds=math.ceil(wait)))
+
+
+if THROTTLE_RULES:
+    # Внешний middleware срабатывает до фильтров и обработчиков
+    throttle_middleware = ThrottleMiddleware(UserThrottle(THROTTLE_RULES), throttle_key, reject_throttled)
+    dp.message.outer_middleware(throttle_middleware)
+    dp.callback_query.outer_middleware(throttle_middleware)
 bot_start_time = datetime.now()  # Время запуска бота для отслеживания времени работы
 
 
+# Сегменты аудитории для каждого типа рассылки
+BROADCAST_SEGMENTS = {
+    "updates": Segment.parse("updates"),
+    "fixes": Segment.parse("fixes"),
+}
+
+# Темы публикаций из группы по их первой строке ('Update', 'Fixes' или 'Update, Fixes')
+GROUP_POST_TOPICS = {
+    "Update": "updates",
+    "Fixes": "fixes",
+}
+
+
 # Состояния для отправки рассылки
 class BroadcastFSM(StatesGroup):
     select_type = State()
@@ -85,81 +299,68 @@ class TicketStatusFSM(StatesGroup):
     response = State()
 
 
-# Состояния для выбора БД для сброса
-class ResetDBFSM(StatesGroup):
-    select_db = State()
+# Состояния для массовой смены статуса заявок
+class TicketBulkFSM(StatesGroup):
+    response = State()
 
 
-# Состояния для создания бэкапа
-class CreateBackupFSM(StatesGroup):
-    confirmation = State()
+# Состояния для сообщения в переписке по заявке
+class TicketThreadFSM(StatesGroup):
+    message = State()
 
 
-db_connections = {}  # Словарь для хранения соединений
+# Состояния для поиска заявок
+class TicketSearchFSM(StatesGroup):
+    query = State()
 
 
-# Возвращает соединение с базой данных
-async def get_db_connection(db_name: str) -> aiosqlite.Connection:
-    """
-    Если соединение уже существует, возвращает его.
-    Если нет, создает новое соединение.
-    """
-    if db_name not in db_connections:
-        try:
-            db_connections[db_name] = await aiosqlite.connect(db_name)
-        except aiosqlite.OperationalError as e:
-            logger.error(f"Не удалось подключиться к базе данных {db_name}: {e}")
-            return None
-    return db_connections[db_name]
+# Состояния для поиска по логам
+class LogSearchFSM(StatesGroup):
+    query = State()
 
 
-# Закрывает соединение с базой данных
-async def close_db_connection(db_name: str):
-    if db_name in db_connections:
-        await db_connections[db_name].close()
-        del db_connections[db_name]
+# Состояния для выбора БД для сброса
+class ResetDBFSM(StatesGroup):
+    select_db = State()
+
 
+# Состояния для создания бэкапа
+class CreateBackupFSM(StatesGroup):
+    confirmation = State()
 
-# Перезагружает соединение с базой данных
-async def reload_db_connection(db_name: str):
-    await close_db_connection(db_name)
-    await get_db_connection(db_name)
 
+# Отправляет уведомление администратору
+async def send_to_admin(text: str):
+    await bot.send_message(ADMIN_ID, text)
 
-# Инициализирует базу данных для заявок (tickets.db)
-async def init_ticket_db():
-    db = await get_db_connection("tickets.db")
-    if db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                username TEXT,
-                problem TEXT,
-                description TEXT,
-                status TEXT,
-                response TEXT
-            );
-            """
-        )
-        await db.commit()
 
+# Сводные уведомления администратору о заявках; остаток отправляется при остановке
+admin_notifier = AdminNotifier(
+    send_to_admin,
+    lambda count: ADMIN_LOCALE.admin_notifications_summary(count=count),
+    ADMIN_NOTIFY_INTERVAL,
+    ADMIN_NOTIFY_MAX_BATCH,
+)
+dp.shutdown.register(admin_notifier.close)
+ticket_priority = TicketPriority(TICKET_URGENT_KEYWORDS)
+
+# Архив решенных заявок; поиск заявки по ID и заявок пользователя идет через него
+ticket_archive = TicketArchive("tickets_archive.db", TICKET_ARCHIVE_DAYS, TICKET_ARCHIVE_BATCH)
+
+# Индекс открытых заявок без родителя для поиска дубликатов
+duplicate_index = DuplicateIndex(TICKET_DUPLICATE_DISTANCE) if TICKET_DEDUP else None
+
+# Хранилище подписчиков (шардированное по chat_id)
+subscriber_store = SubscriberStore(
+    "subscribers.db",
+    SUBSCRIBER_SHARDS,
+    SUBSCRIBER_BATCH_SIZE,
+    index=SubscriberIndex() if SUBSCRIBER_INDEX else None,
+    cache_size=SUBSCRIBER_CACHE_SIZE,
+)
 
-# Инициализирует базу данных для подписчиков (subscribers.db)
-async def init_subscriber_db():
-    db = await get_db_connection("subscribers.db")
-    if db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS subscribers (
-                chat_id INTEGER PRIMARY KEY,
-                username TEXT,
-                subscription_type TEXT
-            );
-            """
-        )
-        await db.commit()
+# Очередь рассылок: обработчики ставят задания и сразу возвращаются
+broadcaster = Broadcaster(subscriber_store, BROADCAST_CONCURRENCY, BROADCAST_RATE)
 
 
 # Создает резервные копии баз данных вручную
@@ -176,13 +377,15 @@ async def create_backup():
     ) as destination:
         await source.backup(destination)
 
-    # Создание резервной копии subscribers.db
-    backup_subscribers_path = os.path.join(backup_dir, "subscribers.db")
-    async with aiosqlite.connect("subscribers.db") as source, aiosqlite.connect(
-        backup_subscribers_path
+    # Создание резервной копии архива заявок
+    async with aiosqlite.connect(ticket_archive.path) as source, aiosqlite.connect(
+        os.path.join(backup_dir, os.path.basename(ticket_archive.path))
     ) as destination:
         await source.backup(destination)
 
+    # Создание резервной копии всех шардов subscribers.db
+    await subscriber_store.backup(backup_dir)
+
     logger.bind(tags="backup_operations").info(
         f"Созданы резервные копии баз данных вручную в {now.strftime('%Y-%m-%d %H:%M:%S')} (папка: {backup_folder_name})"
     )
@@ -192,11 +395,29 @@ async def create_backup():
     return backup_dir
 
 
-# Возвращает информацию о последних резервных копиях
+# Возвращает время создания последней резервной копии (None, если копий нет)
+def get_latest_backup_time():
+    backup_dir = os.path.join(os.path.dirname(__file__), "backups")
+    if not os.path.isdir(backup_dir):
+        return None
+    latest = None
+    for folder in os.listdir(backup_dir):
+        try:
+            folder_date = datetime.strptime(folder, "%Y%m%d_%H%M%S")
+        except ValueError:
+            continue
+        if latest is None or folder_date > latest:
+            latest = folder_date
+    return latest
+
+
+# Возвращает дату последних резервных копий (None, если копия не найдена)
 async def get_backup_info():
     backup_dir = os.path.join(os.path.dirname(__file__), "backups")
-    tickets_backup_info = "Не найдено"
-    subscribers_backup_info = "Не найдено"
+    tickets_backup_info = None
+    subscribers_backup_info = None
+    if not os.path.isdir(backup_dir):
+        return tickets_backup_info, subscribers_backup_info
 
     # Получаем список папок в директории backups
     folders = [
@@ -214,11 +435,14 @@ async def get_backup_info():
             backup_datetime = datetime.strptime(latest_backup_folder, "%Y%m%d_%H%M%S")
             backup_datetime_str = backup_datetime.strftime("%Y-%m-%d %H:%M:%S")
 
-            # Проверяем наличие файлов tickets.db и subscribers.db
+            # Проверяем наличие файлов tickets.db и всех шардов subscribers.db
             if os.path.exists(os.path.join(backup_dir, latest_backup_folder, "tickets.db")):
                 tickets_backup_info = backup_datetime_str
-            if os.path.exists(
-                os.path.join(backup_dir, latest_backup_folder, "subscribers.db")
+            if all(
+                os.path.exists(
+                    os.path.join(backup_dir, latest_backup_folder, os.path.basename(path))
+                )
+                for path in subscriber_store.paths
             ):
                 subscribers_backup_info = backup_datetime_str
 
@@ -232,10 +456,18 @@ async def get_backup_info():
 
 # Создает резервные копии баз данных tickets.db и subscribers.db еженедельно и при старте бота
 async def backup_databases():
-    logger.bind(tags="backup_operations").info(
-        "Создание резервной копии при запуске бота..."
-    )
-    await create_backup()
+    latest_backup = get_latest_backup_time()
+    if latest_backup and datetime.now() - latest_backup < timedelta(hours=BACKUP_STARTUP_MAX_AGE_HOURS):
+        logger.bind(tags="backup_operations").info(
+            f"Резервная копия при запуске пропущена: последняя создана {latest_backup.strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+    else:
+        # Копия откладывается, чтобы не конкурировать с обновлениями, накопившимися за время простоя
+        await asyncio.sleep(BACKUP_STARTUP_DELAY)
+        logger.bind(tags="backup_operations").info(
+            "Создание резервной копии при запуске бота..."
+        )
+        await create_backup()
 
     while True:
         now = datetime.now()
@@ -298,193 +530,139 @@ async def cleanup_old_backups():
                 logger.error(f"Ошибка при удалении папки резервной копии: {folder}, ошибка: {e}")
 
 
+# Возвращает возраст заявки: 'X д Y ч' или 'Y ч Z мин'
+def format_age(tr: Locale, seconds: float) -> str:
+    minutes = max(0, int(seconds)) // 60
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    return tr.age_days(days=days, hours=hours) if days else tr.age_hours(hours=hours, minutes=minutes)
+
+
 # Возвращает время работы бота в формате 'X дней - ЧЧ:ММ:СС'
-def get_uptime():
+def get_uptime(tr: Locale):
     uptime = datetime.now() - bot_start_time
     days, seconds = uptime.days, uptime.seconds
     hours = seconds // 3600
     minutes = (seconds % 3600) // 60
     seconds = seconds % 60
-    return f"{days} дней - {hours:02}:{minutes:02}:{seconds:02}"
+    return tr.uptime(days=days, hours=hours, minutes=minutes, seconds=seconds)
 
 
-# Возвращает главное меню бота
-async def get_main_menu(user_id):
-    keyboard = [
-        [KeyboardButton(text="Подписка на уведомления")],
-        [KeyboardButton(text="Поддержка")],
-        [KeyboardButton(text="О боте")],
-    ]
-    if user_id == ADMIN_ID:
-        keyboard.append([KeyboardButton(text="Администрирование")])
-    return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
+# Форматирует длительность в секундах как 'М:СС' или 'Ч:ММ:СС'
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
 
 
 # Обработчик команды /start
 @dp.message(Command("start"))
 async def start(message: types.Message):
-    main_menu = await get_main_menu(message.from_user.id)
-    await message.answer(
-        "Добро пожаловать! Выберите интересующую вас опцию ниже:",
-        reply_markup=main_menu,
-    )
-    logger.info(
-        f"Пользователь {message.from_user.id} ({message.from_user.username}) запустил бота."
+    tr = get_locale(message.from_user)
+    main_menu = get_main_menu(tr, message.from_user.id == ADMIN_ID)
+    await message.answer(tr.welcome, reply_markup=main_menu)
+    navigation_log.info(
+        f"Пользователь {message.from_user.id} ({message.from_user.username}) запустил бота (язык: {tr.code})."
     )
 
 
 # Обработчик нажатия на кнопку 'Подписка на уведомления'
-@dp.message(F.text == "Подписка на уведомления")
+@dp.message(F.text.in_(button_texts("btn_subscribe")))
 async def subscribe(message: types.Message):
-    db = await get_db_connection("subscribers.db")
-    if db:
-        async with db.execute(
-            "SELECT subscription_type FROM subscribers WHERE chat_id = ?",
-            (message.from_user.id,),
-        ) as cursor:
-            result = await cursor.fetchone()
-
-        if result:
-            subscription_type = result[0]
-            if subscription_type == "all":
-                current_subscription = "Все уведомления"
-            elif subscription_type == "updates":
-                current_subscription = "Обновления"
-            else:
-                current_subscription = "Неизвестная подписка"
-        else:
-            current_subscription = "Нет подписки"
+    tr = get_locale(message.from_user)
+    topics = await subscriber_store.get_topics(message.from_user.id)
+    subscription_type = preset_for_topics(topics)
+    if subscription_type == "all":
+        current_subscription = tr.subscription_all
+    elif subscription_type == "updates":
+        current_subscription = tr.subscription_updates
+    elif not topics:
+        # Нет записи или подписчик отключен после блокировки бота
+        current_subscription = tr.subscription_none
+    else:
+        current_subscription = tr.subscription_unknown
+
+    await message.answer(
+        tr.subscription_menu(current=current_subscription),
+        reply_markup=get_menu(tr, "subscription"),
+    )
+    navigation_log.info(
+        f"Пользователь {message.from_user.id} ({message.from_user.username}) запросил меню подписки."
+    )
 
-        await message.answer(
-            f"Настройте свою подписку:\n\nТекущая подписка: {current_subscription}",
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="Подписка на все уведомления",
-                            callback_data="subscribe_all",
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="Подписка на обновления контента",
-                            callback_data="subscribe_updates",
-                        )
-                    ],
-                    [InlineKeyboardButton(text="Отписаться", callback_data="unsubscribe")],
-                    [InlineKeyboardButton(text="Назад", callback_data="back_main")],
-                ]
-            ),
-        )
-        logger.info(
-            f"Пользователь {message.from_user.id} ({message.from_user.username}) запросил меню подписки."
-        )
+
+# Показывает в меню подписки текущую подписку. Сообщение, в котором она уже
+# показана (повторное нажатие), не редактируется: Telegram отклонил бы такую
+# правку ошибкой 'message is not modified'.
+async def show_subscription(callback_query: types.CallbackQuery, text: str):
+    if callback_query.message.text != text:
+        await callback_query.message.edit_text(text, reply_markup=callback_query.message.reply_markup)
 
 
 # Обработчик нажатия на кнопку 'Подписка на все уведомления'
-@dp.callback_query(F.data == "subscribe_all")
+@callback_router.route("subscribe_all")
 async def subscribe_all(callback_query: types.CallbackQuery):
-    db = await get_db_connection("subscribers.db")
-    if db:
-        await db.execute(
-            "INSERT OR REPLACE INTO subscribers (chat_id, username, subscription_type) VALUES (?, ?, ?)",
-            (callback_query.from_user.id, callback_query.from_user.username, "all"),
-        )
-        await db.commit()
-        await callback_query.answer("Вы подписаны на все уведомления.")
-        await callback_query.message.edit_text(
-            "Настройте свою подписку:\n\nТекущая подписка: Все уведомления",
-            reply_markup=callback_query.message.reply_markup,
-        )
+    tr = get_locale(callback_query.from_user)
+    changed = await subscriber_store.subscribe(callback_query.from_user.id, SUBSCRIPTION_PRESETS["all"])
+    await callback_query.answer(tr.subscribed_all)
+    await show_subscription(callback_query, tr.subscription_menu(current=tr.subscription_all))
+    if changed:
         logger.info(
             f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) подписался на все уведомления."
         )
+    else:
+        navigation_log.info(
+            f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) уже подписан на все уведомления."
+        )
 
 
 # Обработчик нажатия на кнопку 'Подписка на обновления контента'
-@dp.callback_query(F.data == "subscribe_updates")
+@callback_router.route("subscribe_updates")
 async def subscribe_updates(callback_query: types.CallbackQuery):
-    db = await get_db_connection("subscribers.db")
-    if db:
-        await db.execute(
-            "INSERT OR REPLACE INTO subscribers (chat_id, username, subscription_type) VALUES (?, ?, ?)",
-            (callback_query.from_user.id, callback_query.from_user.username, "updates"),
-        )
-        await db.commit()
-        await callback_query.answer("Вы подписаны на обновления.")
-        await callback_query.message.edit_text(
-            "Настройте свою подписку:\n\nТекущая подписка: Обновления",
-            reply_markup=callback_query.message.reply_markup,
-        )
+    tr = get_locale(callback_query.from_user)
+    changed = await subscriber_store.subscribe(callback_query.from_user.id, SUBSCRIPTION_PRESETS["updates"])
+    await callback_query.answer(tr.subscribed_updates)
+    await show_subscription(callback_query, tr.subscription_menu(current=tr.subscription_updates))
+    if changed:
         logger.info(
             f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) подписался на обновления."
         )
+    else:
+        navigation_log.info(
+            f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) уже подписан на обновления."
+        )
 
 
 # Обработчик нажатия на кнопку 'Отписаться'
-@dp.callback_query(F.data == "unsubscribe")
+@callback_router.route("unsubscribe")
 async def unsubscribe(callback_query: types.CallbackQuery):
-    db = await get_db_connection("subscribers.db")
-    if db:
-        # Получаем ник пользователя перед удалением записи
-        async with db.execute(
-            "SELECT username FROM subscribers WHERE chat_id = ?",
-            (callback_query.from_user.id,),
-        ) as cursor:
-            result = await cursor.fetchone()
-            username = result[0] if result else None
-
-        await db.execute(
-            "DELETE FROM subscribers WHERE chat_id = ?", (callback_query.from_user.id,)
-        )
-        await db.commit()
-        await callback_query.answer("Вы отписались от всех уведомлений.")
-        # Редактируем сообщение, обновляя статус подписки
-        await callback_query.message.edit_text(
-            "Настройте свою подписку:\n\nТекущая подписка: Нет подписки",
-            reply_markup=callback_query.message.reply_markup,
-        )
-        logger.info(
-            f"Пользователь {callback_query.from_user.id} ({username if username else 'Неизвестный'}) отписался от уведомлений."
-        )
+    tr = get_locale(callback_query.from_user)
+    await subscriber_store.unsubscribe(callback_query.from_user.id)
+    await callback_query.answer(tr.unsubscribed)
+    # Редактируем сообщение, обновляя статус подписки
+    await show_subscription(callback_query, tr.subscription_menu(current=tr.subscription_none))
+    logger.info(
+        f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) отписался от уведомлений."
+    )
 
 
 # Обработчик нажатия на кнопку 'Поддержка'
-@dp.message(F.text == "Поддержка")
+@dp.message(F.text.in_(button_texts("btn_support")))
 async def support(message: types.Message):
-    await message.answer(
-        "Чем мы можем вам помочь?",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="Отправить заявку", callback_data="send_ticket"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="Просмотр заявок", callback_data="view_tickets"
-                    )
-                ],
-                [InlineKeyboardButton(text="Назад", callback_data="back_main")],
-            ]
-        ),
-    )
-    logger.info(
+    tr = get_locale(message.from_user)
+    await message.answer(tr.support_menu, reply_markup=get_menu(tr, "support"))
+    navigation_log.info(
         f"Пользователь {message.from_user.id} ({message.from_user.username}) запросил меню поддержки."
     )
 
 
 # Обработчик нажатия на кнопку 'Отправить заявку'
-@dp.callback_query(F.data == "send_ticket")
+@callback_router.route("send_ticket")
 async def send_ticket(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
     await callback_query.message.edit_text(
-        "Опишите кратко вашу проблему:",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="Назад", callback_data="support_menu")]
-            ]
-        ),
+        tr.ticket_enter_problem,
+        reply_markup=get_back_menu(tr, "support_menu"),
     )
     await state.set_state(TicketFSM.problem)
     logger.info(
@@ -495,8 +673,9 @@ async def send_ticket(callback_query: types.CallbackQuery, state: FSMContext):
 # Обработчик ввода краткого описания проблемы
 @dp.message(TicketFSM.problem)
 async def enter_problem(message: types.Message, state: FSMContext):
+    tr = get_locale(message.from_user)
     await state.update_data(problem=message.text)
-    await message.answer("Дайте более подробное описание проблемы:")
+    await message.answer(tr.ticket_enter_description)
     await state.set_state(TicketFSM.description)
     logger.info(
         f"Пользователь {message.from_user.id} ({message.from_user.username}) ввел краткое описание проблемы: {message.text}"
@@ -506,147 +685,191 @@ async def enter_problem(message: types.Message, state: FSMContext):
 # Обработчик ввода подробного описания проблемы
 @dp.message(TicketFSM.description)
 async def enter_description(message: types.Message, state: FSMContext):
+    tr = get_locale(message.from_user)
     data = await state.get_data()
     problem = data.get("problem")
     description = message.text
 
     db = await get_db_connection("tickets.db")
     if db:
-        await db.execute(
-            "INSERT INTO tickets (user_id, username, problem, description, status) VALUES (?, ?, ?, ?, ?)",
-            (message.from_user.id, message.from_user.username, problem, description, "Unresolved"),
+        signature = simhash(f"{problem}\n{description}") if duplicate_index is not None else None
+        duplicate = duplicate_index.find(signature) if signature is not None else None
+        parent_id = duplicate[0] if duplicate else None
+        # Язык заявки сохраняется, чтобы уведомлять автора на его языке
+        ticket_id, duplicates, parent_problem = await insert_ticket(
+            message.from_user.id,
+            problem,
+            description,
+            tr.code,
+            parent_id,
+            to_signed(signature) if signature is not None else None,
         )
-        await db.commit()
-        async with db.execute("SELECT last_insert_rowid()") as cursor:
-            ticket_id = (await cursor.fetchone())[0]
 
-        await message.answer("Ваша заявка отправлена.")
+        await message.answer(tr.ticket_submitted)
         await state.clear()
         logger.info(
             f"Пользователь {message.from_user.id} ({message.from_user.username}) отправил заявку. ID заявки: {ticket_id}"
         )
 
-        await bot.send_message(
-            ADMIN_ID,
-            f"Новая заявка:\nПроблема: {problem}\nОписание: {description}\nID заявки: {ticket_id}",
+        if parent_id is None:
+            if signature is not None:
+                duplicate_index.add(ticket_id, signature)
+            if ticket_priority.is_urgent(problem, description):
+                if await admin_notifier.notify(
+                    ADMIN_LOCALE.admin_urgent_ticket(problem=problem, description=description, ticket_id=ticket_id),
+                    urgent=True,
+                ):
+                    logger.info(f"Отправлено уведомление администратору о срочной заявке (ID: {ticket_id}).")
+            else:
+                await admin_notifier.notify(
+                    ADMIN_LOCALE.admin_new_ticket(problem=problem, description=description, ticket_id=ticket_id)
+                )
+                logger.info(f"Уведомление администратору о новой заявке (ID: {ticket_id}) добавлено в сводку.")
+        else:
+            await notify_admin_about_duplicate(ticket_id, parent_id, parent_problem, duplicates, duplicate[1])
+
+
+# Сообщает администратору о дубликатах не на каждую заявку, а на 1-й, 10-й, 100-й...
+async def notify_admin_about_duplicate(ticket_id: int, parent_id: int, problem: str, count: int, distance: int):
+    logger.info(
+        f"Заявка {ticket_id} связана с похожей заявкой {parent_id} (расстояние {distance}, всего похожих: {count})."
+    )
+    milestone = count
+    while milestone % 10 == 0:
+        milestone //= 10
+    if milestone == 1:
+        await admin_notifier.notify(
+            ADMIN_LOCALE.admin_duplicate_tickets(ticket_id=parent_id, problem=problem, count=count)
         )
-        logger.info(f"Отправлено уведомление администратору о новой заявке (ID: {ticket_id}).")
+
+
+# Загружает в индекс дубликатов открытые заявки без родителя
+async def load_duplicate_index():
+    db = await get_db_connection("tickets.db")
+    if duplicate_index is None or not db:
+        return
+    duplicate_index.clear()
+    async with db.execute(
+        "SELECT id, simhash, problem, description FROM tickets "
+        "WHERE parent_id IS NULL AND status IN ('Unresolved', 'In Progress')"
+    ) as cursor:
+        async for ticket_id, signature, problem, description in cursor:
+            # Заявки, созданные до поиска дубликатов, не имеют сохраненной сигнатуры
+            signature = from_signed(signature) if signature is not None else simhash(f"{problem}\n{description}")
+            if signature is not None:
+                duplicate_index.add(ticket_id, signature)
+    logger.info(f"Загружено открытых заявок в индекс дубликатов: {len(duplicate_index)}")
+
+
+# Меняет статус заявок и их дубликатов и обновляет индекс дубликатов.
+# Возвращает измененные заявки: (ID, ID автора, проблема, язык заявки).
+async def set_tickets_status(ticket_ids, status: str, response: str = None) -> list:
+    changed = await update_tickets_status(ticket_ids, status, response)
+    # Похожие на решенные заявки новые заявки снова считаются новыми
+    if status == "Resolved" and duplicate_index is not None:
+        for ticket_id in ticket_ids:
+            duplicate_index.remove(ticket_id)
+    return changed
+
+
+# Отклоняет нажатие кнопки администратора другим пользователем: отвечает на
+# нажатие и пишет предупреждение. Возвращает True, если нажатие отклонено.
+async def deny_non_admin(callback_query: types.CallbackQuery, action: str) -> bool:
+    if callback_query.from_user.id == ADMIN_ID:
+        return False
+    await callback_query.answer(get_locale(callback_query.from_user).action_denied)
+    logger.warning(
+        f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) пытался {action}."
+    )
+    return True
+
+
+# Ник автора заявки для экранов администратора: актуальный из кэша профилей,
+# иначе сохраненный в заявке до появления кэша
+def display_username(tr: Locale, user_id: int, stored: str = None) -> str:
+    return user_profiles.username(user_id) or stored or tr.unknown_user
 
 
 # Обработчик нажатия на кнопку 'Просмотр заявок'
-@dp.callback_query(F.data == "view_tickets")
+@callback_router.route("view_tickets")
 async def view_tickets(callback_query: types.CallbackQuery):
+    tr = get_locale(callback_query.from_user)
     db = await get_db_connection("tickets.db")
     if db:
-        async with db.execute(
-            "SELECT * FROM tickets WHERE user_id = ?", (callback_query.from_user.id,)
-        ) as cursor:
-            user_tickets = await cursor.fetchall()
+        # Старые решенные заявки читаются из архива
+        user_tickets = await ticket_archive.user_tickets(callback_query.from_user.id)
 
         if user_tickets:
             tickets_text = ""
-            for row in user_tickets:
-                ticket_info = (
-                    f"Проблема: {row[3]}\nОписание: {row[4]}\nСтатус: {row[5]}"  # Изменены индексы
+            for _, _, _, problem, description, status, response, *_ in user_tickets:
+                ticket_info = tr.user_ticket(
+                    problem=problem, description=description, status=tr.status(status)
                 )
-                if row[5] == "Решено" and row[6]:  # Изменены индексы
-                    ticket_info += f"\nОтвет: {row[6]}"  # Изменены индексы
+                if status == "Resolved" and response:
+                    ticket_info += tr.user_ticket_response(response=response)
                 tickets_text += f"{ticket_info}\n\n"
 
+            # Кнопки переписки для последних заявок пользователя
+            keyboard = [
+                [
+                    InlineKeyboardButton(
+                        text=tr.btn_ticket(ticket_id=ticket_id, problem=problem),
+                        callback_data=callback_router.pack("open_thread", ticket_id),
+                    )
+                ]
+                for ticket_id, _, _, problem, *_ in reversed(user_tickets[-USER_THREAD_TICKETS:])
+            ]
+            keyboard.append([InlineKeyboardButton(text=tr.btn_back, callback_data="support_menu")])
             await callback_query.message.edit_text(
-                f"Ваши заявки:\n\n{tickets_text}",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [InlineKeyboardButton(text="Назад", callback_data="support_menu")]
-                    ]
-                ),
+                tr.user_tickets(tickets=tickets_text),
+                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard),
             )
-            logger.info(
+            navigation_log.info(
                 f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) просмотрел свои заявки."
             )
         else:
             await callback_query.message.edit_text(
-                "У вас нет отправленных заявок.",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [InlineKeyboardButton(text="Назад", callback_data="support_menu")]
-                    ]
-                ),
+                tr.user_no_tickets,
+                reply_markup=get_back_menu(tr, "support_menu"),
             )
-            logger.info(
+            navigation_log.info(
                 f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) не имеет отправленных заявок."
             )
 
 
 # Обработчик нажатия на кнопку 'О боте'
-@dp.message(F.text == "О боте")
+@dp.message(F.text.in_(button_texts("btn_about")))
 async def about_bot(message: types.Message):
-    await message.answer(
-        f"Бот по отправке уведомлений о новом контенте и/или его исправлении на https://docs.basted.ru/.\n\n"
-        f"Версия бота: {BOT_VERSION}"
-    )
-    logger.info(
+    tr = get_locale(message.from_user)
+    await message.answer(tr.about(version=BOT_VERSION))
+    navigation_log.info(
         f"Пользователь {message.from_user.id} ({message.from_user.username}) запросил информацию о боте."
     )
 
 
 # Обработчик нажатия на кнопку 'Администрирование'
-@dp.message(F.text == "Администрирование")
+@dp.message(F.text.in_(button_texts("btn_admin")))
 async def admin(message: types.Message):
+    tr = get_locale(message.from_user)
     if message.from_user.id == ADMIN_ID:
-        await message.answer(
-            "Панель администратора:",
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="Отправить сообщение", callback_data="admin_broadcast"
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="Управление заявками", callback_data="admin_tickets"
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="Дополнительно", callback_data="admin_additional"
-                        )
-                    ],
-                    [InlineKeyboardButton(text="Назад", callback_data="back_main")],
-                ]
-            ),
-        )
+        await message.answer(tr.admin_panel, reply_markup=get_menu(tr, "admin"))
         logger.info(
             f"Администратор {message.from_user.id} ({message.from_user.username}) вошел в панель администратора."
         )
     else:
-        await message.answer("У вас нет доступа к этому разделу.")
+        await message.answer(tr.admin_denied)
         logger.warning(
             f"Пользователь {message.from_user.id} ({message.from_user.username}) пытался получить доступ к панели администратора."
         )
 
 
 # Обработчик нажатия на кнопку 'Отправить сообщение'
-@dp.callback_query(F.data == "admin_broadcast")
+@callback_router.route("admin_broadcast")
 async def admin_broadcast_menu(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
     await callback_query.message.edit_text(
-        "Выберите, кому будет отправлено сообщение:",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="Обновление (всем)", callback_data="broadcast_updates"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="Исправления", callback_data="broadcast_fixes"
-                    )
-                ],
-                [InlineKeyboardButton(text="Назад", callback_data="admin_menu")],
-            ]
-        ),
+        tr.broadcast_select,
+        reply_markup=get_menu(tr, "broadcast"),
     )
     await state.set_state(BroadcastFSM.select_type)
     logger.info(
@@ -655,17 +878,13 @@ async def admin_broadcast_menu(callback_query: types.CallbackQuery, state: FSMCo
 
 
 # Обработчик выбора типа рассылки
-@dp.callback_query(F.data.startswith("broadcast_"))
-async def enter_broadcast_content(callback_query: types.CallbackQuery, state: FSMContext):
-    broadcast_type = callback_query.data.split("_")[1]
+@callback_router.route("broadcast", str)
+async def enter_broadcast_content(callback_query: types.CallbackQuery, broadcast_type: str, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
     await state.update_data(broadcast_type=broadcast_type)
     await callback_query.message.edit_text(
-        "Отправьте текст сообщения и/или фотографию:",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="Назад", callback_data="admin_broadcast")]
-            ]
-        ),
+        tr.broadcast_enter_content,
+        reply_markup=get_back_menu(tr, "admin_broadcast"),
     )
     await state.set_state(BroadcastFSM.enter_content)
     logger.info(
@@ -676,122 +895,51 @@ async def enter_broadcast_content(callback_query: types.CallbackQuery, state: FS
 # Обработчик отправки сообщения
 @dp.message(BroadcastFSM.enter_content, F.text | F.photo)
 async def send_broadcast(message: types.Message, state: FSMContext):
+    tr = get_locale(message.from_user)
     data = await state.get_data()
     broadcast_type = data["broadcast_type"]
 
     text = message.caption if message.photo else message.text
     photo = message.photo[-1].file_id if message.photo else None
 
-    db = await get_db_connection("subscribers.db")
-    if db:
-        if broadcast_type == "updates":
-            async with db.execute(
-                "SELECT chat_id FROM subscribers WHERE subscription_type IN ('all', 'updates')"
-            ) as cursor:
-                subscribers = await cursor.fetchall()
-        elif broadcast_type == "fixes":
-            async with db.execute(
-                "SELECT chat_id FROM subscribers WHERE subscription_type = 'all'"
-            ) as cursor:
-                subscribers = await cursor.fetchall()
+    segment = BROADCAST_SEGMENTS[broadcast_type]
 
-        success_count = 0
-        error_count = 0
-        for (chat_id,) in subscribers:
-            try:
-                if photo:
-                    msg = await bot.send_photo(chat_id, photo=photo, caption=text)
-                else:
-                    msg = await bot.send_message(chat_id, text)
-                success_count += 1
-                await state.update_data({f"read_{msg.message_id}": []})  # Добавляем список для хранения прочитавших
-            except Exception as e:
-                logger.error(f"Ошибка при отправке сообщения пользователю {chat_id}: {e}")
-                error_count += 1
+    async def send(chat_id):
+        if photo:
+            await bot.send_photo(chat_id, photo=photo, caption=text)
+        else:
+            await bot.send_message(chat_id, text)
 
-        await message.answer(
-            f"Сообщение успешно отправлено {success_count} пользователям. Ошибок при отправке: {error_count}."
-        )
-        await state.clear()
-        logger.info(
-            f"Администратор {message.from_user.id} ({message.from_user.username}) отправил сообщение типа '{broadcast_type}'. Успешно: {success_count}, ошибок: {error_count}."
-        )
+    title = getattr(tr, f"btn_broadcast_{broadcast_type}")
+    job = await start_broadcast(title, segment, send, tr)
 
-        await message.answer(
-            "Панель администратора:",
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="Отправить сообщение", callback_data="admin_broadcast"
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="Управление заявками", callback_data="admin_tickets"
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="Дополнительно", callback_data="admin_additional"
-                        )
-                    ],
-                    [InlineKeyboardButton(text="Назад", callback_data="back_main")],
-                ]
-            ),
-        )
+    await state.clear()
+    logger.info(
+        f"Администратор {message.from_user.id} ({message.from_user.username}) поставил в очередь рассылку #{job.job_id} типа '{broadcast_type}'."
+    )
+
+    await message.answer(tr.admin_panel, reply_markup=get_menu(tr, "admin"))
 
 
 # Обработчик нажатия на кнопку 'Управление заявками'
-@dp.callback_query(F.data == "admin_tickets")
-async def admin_tickets_menu(callback_query: types.CallbackQuery):
-    await callback_query.message.edit_text(
-        "Управление заявками:",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="Просмотр нерешенных заявок",
-                        callback_data="view_unresolved_tickets",
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="Просмотр решенных заявок",
-                        callback_data="view_resolved_tickets",
-                    )
-                ],
-                [InlineKeyboardButton(text="Назад", callback_data="admin_menu")],
-            ]
-        ),
-    )
+@callback_router.route("admin_tickets")
+async def admin_tickets_menu(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
+    await state.clear()
+    await callback_query.message.edit_text(tr.tickets_menu, reply_markup=get_menu(tr, "tickets"))
     logger.info(
         f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) вошел в меню управления заявками."
     )
 
 
 # Обработчик нажатия на кнопку 'Дополнительно'
-@dp.callback_query(F.data == "admin_additional")
+@callback_router.route("admin_additional")
 async def admin_additional_menu(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
     await state.clear()
     await callback_query.message.edit_text(
-        "Дополнительные функции:",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="Статистика", callback_data="view_statistics"
-                    )
-                ],
-                [InlineKeyboardButton(text="Просмотр логов", callback_data="view_logs")],
-                [
-                    InlineKeyboardButton(
-                        text="Управление БД", callback_data="db_actions"
-                    )
-                ],
-                [InlineKeyboardButton(text="Назад", callback_data="admin_menu")],
-            ]
-        ),
+        tr.additional_menu,
+        reply_markup=get_menu(tr, "additional"),
     )
     logger.info(
         f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) вошел в меню 'Дополнительно'."
@@ -799,172 +947,119 @@ async def admin_additional_menu(callback_query: types.CallbackQuery, state: FSMC
 
 
 # Обработчик нажатия на кнопку 'Просмотр нерешенных заявок'
-@dp.callback_query(F.data == "view_unresolved_tickets")
+@callback_router.route("view_unresolved_tickets")
 async def view_unresolved_tickets(callback_query: types.CallbackQuery):
+    tr = get_locale(callback_query.from_user)
     db = await get_db_connection("tickets.db")
     if db:
-        async with db.execute(
-            "SELECT id, problem, description, status, username FROM tickets WHERE status IN ('Unresolved', 'In Progress')"
-        ) as cursor:
-            unresolved_tickets = await cursor.fetchall()
+        # Очередь по возрасту: самые старые заявки читаются по индексу, без перебора всех открытых
+        unresolved_tickets, total = await oldest_open_tickets(TICKET_QUEUE_SIZE)
 
         if unresolved_tickets:
+            now = time.time()
             tickets_text = ""
             for ticket in unresolved_tickets:
-                ticket_id, problem, description, status, username = ticket
-                tickets_text += (
-                    f"Заявка №{ticket_id} от пользователя {username if username else 'Не указан'}\n"
-                    f"Статус: {status}\n"
-                    f"Проблема: {problem}\n"
-                    f"Описание: {description}\n----\n"
+                ticket_id, problem, description, status, user_id, created_at, duplicates = ticket
+                tickets_text += tr.admin_ticket_open(
+                    ticket_id=ticket_id,
+                    username=display_username(tr, user_id),
+                    status=tr.status(status),
+                    age=format_age(tr, now - created_at),
+                    problem=problem,
+                    description=description,
+                    duplicates=tr.ticket_duplicates(count=duplicates) if duplicates else "",
                 )
 
             await callback_query.message.edit_text(
-                f"Нерешенные заявки:\n\n{tickets_text}",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="Решено (выбрать заявку)",
-                                callback_data="select_resolved_ticket",
-                            )
-                        ],
-                        [
-                            InlineKeyboardButton(
-                                text="В процессе (выбрать заявку)",
-                                callback_data="select_in_progress_ticket",
-                            )
-                        ],
-                        [InlineKeyboardButton(text="Назад", callback_data="admin_tickets")],
-                    ]
-                ),
+                tr.unresolved_tickets(total=total, shown=len(unresolved_tickets), tickets=tickets_text),
+                reply_markup=get_menu(tr, "unresolved_tickets"),
             )
             logger.info(
                 f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) просмотрел нерешенные заявки."
             )
         else:
             await callback_query.message.edit_text(
-                "Нерешенных заявок не найдено.",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [InlineKeyboardButton(text="Назад", callback_data="admin_tickets")]
-                    ]
-                ),
+                tr.no_unresolved_tickets,
+                reply_markup=get_back_menu(tr, "admin_tickets"),
             )
             logger.info(
                 f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) не нашел нерешенных заявок."
             )
 
 
-# Обработчик нажатия на кнопку 'Решено (выбрать заявку)'
-@dp.callback_query(F.data == "select_resolved_ticket")
-async def select_resolved_ticket(callback_query: types.CallbackQuery):
+# Показывает список открытых заявок для выбора нового статуса
+async def select_ticket_for_status(callback_query: types.CallbackQuery, action: str, prompt: str):
+    tr = get_locale(callback_query.from_user)
     db = await get_db_connection("tickets.db")
-    if db:
-        async with db.execute(
-            "SELECT id, problem FROM tickets WHERE status IN ('Unresolved', 'In Progress')"
-        ) as cursor:
-            tickets = await cursor.fetchall()
-
-        if tickets:
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text=f"Заявка {ticket[0]}: {ticket[1]}",
-                            callback_data=f"mark_resolved_{ticket[0]}",
-                        )
-                    ]
-                    for ticket in tickets
+    if not db:
+        return False
+    async with db.execute(
+        "SELECT id, problem FROM tickets WHERE status IN ('Unresolved', 'In Progress') AND parent_id IS NULL"
+    ) as cursor:
+        tickets = await cursor.fetchall()
+
+    if tickets:
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text=tr.btn_ticket(ticket_id=ticket_id, problem=problem),
+                        callback_data=callback_router.pack(action, ticket_id),
+                    )
                 ]
-                + [[InlineKeyboardButton(text="Назад", callback_data="view_unresolved_tickets")]]
-            )
-            await callback_query.message.edit_text(
-                "Выберите заявку для установки статуса 'Решено':", reply_markup=keyboard
-            )
-            logger.info(
-                f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) выбрал заявку для установки статуса 'Решено'."
-            )
-        else:
-            await callback_query.message.edit_text(
-                "Нет заявок для выбора.",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="Назад", callback_data="view_unresolved_tickets"
-                            )
-                        ]
-                    ]
-                ),
-            )
-            logger.info(
-                f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) не нашел заявок для выбора (установка статуса 'Решено')."
-            )
-
+                for ticket_id, problem in tickets
+            ]
+            + [[InlineKeyboardButton(text=tr.btn_back, callback_data="view_unresolved_tickets")]]
+        )
+        await callback_query.message.edit_text(prompt, reply_markup=keyboard)
+    else:
+        await callback_query.message.edit_text(
+            tr.no_tickets_to_select,
+            reply_markup=get_back_menu(tr, "view_unresolved_tickets"),
+        )
+    return bool(tickets)
+
+
+# Обработчик нажатия на кнопку 'Решено (выбрать заявку)'
+@callback_router.route("select_resolved_ticket")
+async def select_resolved_ticket(callback_query: types.CallbackQuery):
+    tr = get_locale(callback_query.from_user)
+    if await select_ticket_for_status(callback_query, "mark_resolved", tr.select_resolved_ticket):
+        logger.info(
+            f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) выбрал заявку для установки статуса 'Решено'."
+        )
+    else:
+        logger.info(
+            f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) не нашел заявок для выбора (установка статуса 'Решено')."
+        )
+
 
 # Обработчик нажатия на кнопку 'В процессе (выбрать заявку)'
-@dp.callback_query(F.data == "select_in_progress_ticket")
+@callback_router.route("select_in_progress_ticket")
 async def select_in_progress_ticket(callback_query: types.CallbackQuery):
-    db = await get_db_connection("tickets.db")
-    if db:
-        async with db.execute(
-            "SELECT id, problem FROM tickets WHERE status IN ('Unresolved', 'In Progress')"
-        ) as cursor:
-            tickets = await cursor.fetchall()
-
-        if tickets:
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text=f"Заявка {ticket[0]}: {ticket[1]}",
-                            callback_data=f"mark_in_progress_{ticket[0]}",
-                        )
-                    ]
-                    for ticket in tickets
-                ]
-                + [[InlineKeyboardButton(text="Назад", callback_data="view_unresolved_tickets")]]
-            )
-            await callback_query.message.edit_text(
-                "Выберите заявку для установки статуса 'В процессе':", reply_markup=keyboard
-            )
-            logger.info(
-                f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) выбрал заявку для установки статуса 'В процессе'."
-            )
-        else:
-            await callback_query.message.edit_text(
-                "Нет заявок для выбора.",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="Назад", callback_data="view_unresolved_tickets"
-                            )
-                        ]
-                    ]
-                ),
-            )
-            logger.info(
-                f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) не нашел заявок для выбора (установка статуса 'В процессе')."
-            )
+    tr = get_locale(callback_query.from_user)
+    if await select_ticket_for_status(callback_query, "mark_in_progress", tr.select_in_progress_ticket):
+        logger.info(
+            f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) выбрал заявку для установки статуса 'В процессе'."
+        )
+    else:
+        logger.info(
+            f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) не нашел заявок для выбора (установка статуса 'В процессе')."
+        )
 
 
 # Обработчик установки статуса 'В процессе'
-@dp.callback_query(F.data.startswith("mark_in_progress_"))
-async def set_status_in_progress(callback_query: types.CallbackQuery):
-    ticket_id = int(callback_query.data.split("_")[-1])
+@callback_router.route("mark_in_progress", int)
+async def set_status_in_progress(callback_query: types.CallbackQuery, ticket_id: int):
+    tr = get_locale(callback_query.from_user)
     db = await get_db_connection("tickets.db")
     if db:
-        await db.execute(
-            "UPDATE tickets SET status = 'In Progress' WHERE id = ?", (ticket_id,)
-        )
-        await db.commit()
+        tickets = await set_tickets_status([ticket_id], "In Progress")
 
-        await callback_query.answer("Статус изменён на 'В процессе'.")
-        await notify_user_about_status_change(ticket_id, "В процессе")
+        await callback_query.answer(tr.status_set_in_progress)
+        await notify_users_about_status_change(tickets, "In Progress")
         logger.info(
-            f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) установил статус 'В процессе' для заявки {ticket_id}."
+            f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) установил статус 'В процессе' для заявки {ticket_id} (изменено заявок: {len(tickets)})."
         )
 
         # Возвращаемся в меню просмотра нерешенных заявок
@@ -972,15 +1067,13 @@ async def set_status_in_progress(callback_query: types.CallbackQuery):
 
 
 # Обработчик установки статуса 'Решено'
-@dp.callback_query(F.data.startswith("mark_resolved_"))
-async def set_status_resolved(callback_query: types.CallbackQuery, state: FSMContext):
-    ticket_id = int(callback_query.data.split("_")[-1])
+@callback_router.route("mark_resolved", int)
+async def set_status_resolved(callback_query: types.CallbackQuery, ticket_id: int, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
     await state.update_data(ticket_id=ticket_id)
     # Сохраняем message_id сообщения, которое будем редактировать
     await state.update_data(message_id_to_edit=callback_query.message.message_id)
-    await callback_query.message.answer(
-        "Пожалуйста, напишите ответ для этой закрытой заявки:"
-    )
+    await callback_query.message.answer(tr.enter_resolution)
     await state.set_state(TicketStatusFSM.response)
     logger.info(
         f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) начал ввод ответа для заявки {ticket_id}."
@@ -990,6 +1083,7 @@ async def set_status_resolved(callback_query: types.CallbackQuery, state: FSMCon
 # Обработчик сохранения ответа для заявки со статусом 'Решено'
 @dp.message(TicketStatusFSM.response)
 async def save_resolved_response(message: types.Message, state: FSMContext):
+    tr = get_locale(message.from_user)
     data = await state.get_data()
     ticket_id = data["ticket_id"]
     response = message.text
@@ -997,193 +1091,697 @@ async def save_resolved_response(message: types.Message, state: FSMContext):
 
     db = await get_db_connection("tickets.db")
     if db:
-        await db.execute(
-            "UPDATE tickets SET status = 'Resolved', response = ? WHERE id = ?",
-            (response, ticket_id),
-        )
-        await db.commit()
+        tickets = await set_tickets_status([ticket_id], "Resolved", response)
 
-        await message.answer("Заявка отмечена как решенная с вашим ответом.")
+        await message.answer(tr.ticket_resolved)
         await state.clear()
-        await notify_user_about_status_change(ticket_id, "Решено", response)
+        await notify_users_about_status_change(tickets, "Resolved", response)
         logger.info(
-            f"Администратор {message.from_user.id} ({message.from_user.username}) установил статус 'Решено' для заявки {ticket_id} и ввел ответ."
+            f"Администратор {message.from_user.id} ({message.from_user.username}) установил статус 'Решено' для заявки {ticket_id} и ввел ответ (изменено заявок: {len(tickets)})."
         )
 
         # Редактируем сохраненное сообщение бота
         await bot.edit_message_text(
             chat_id=message.chat.id,
             message_id=message_id_to_edit,
-            text="Выберите действие:",
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="Просмотр нерешенных заявок",
-                            callback_data="view_unresolved_tickets",
-                        )
-                    ],
-                    [
-                        InlineKeyboardButton(
-                            text="Просмотр решенных заявок",
-                            callback_data="view_resolved_tickets",
-                        )
-                    ],
-                    [InlineKeyboardButton(text="Назад", callback_data="admin_menu")],
+            text=tr.choose_action,
+            reply_markup=get_menu(tr, "tickets"),
+        )
+
+
+# Собирает страницу множественного выбора открытых заявок: текст и кнопки
+async def render_bulk_selection(tr: Locale, selected: set, page: int):
+    db = await get_db_connection("tickets.db")
+    if not db:
+        return None, None
+    # Лишняя заявка показывает, есть ли следующая страница
+    async with db.execute(
+        "SELECT id, problem FROM tickets WHERE status IN ('Unresolved', 'In Progress') AND parent_id IS NULL "
+        "ORDER BY id LIMIT ? OFFSET ?",
+        (BULK_TICKETS_PAGE_SIZE + 1, page * BULK_TICKETS_PAGE_SIZE),
+    ) as cursor:
+        tickets = await cursor.fetchall()
+    if not tickets and page > 0:
+        # Заявки со страницы могли быть закрыты: показываем первую
+        return await render_bulk_selection(tr, selected, 0)
+    if not tickets:
+        return tr.no_tickets_to_select, get_back_menu(tr, "view_unresolved_tickets")
+
+    keyboard = [
+        [
+            InlineKeyboardButton(
+                text=(tr.bulk_checked if ticket_id in selected else tr.bulk_unchecked)
+                + tr.btn_ticket(ticket_id=ticket_id, problem=problem),
+                callback_data=callback_router.pack("bulk_toggle", ticket_id, page),
+            )
+        ]
+        for ticket_id, problem in tickets[:BULK_TICKETS_PAGE_SIZE]
+    ]
+    keyboard.append(
+        [
+            InlineKeyboardButton(text=tr.btn_bulk_select_all, callback_data=callback_router.pack("bulk_select_all", page)),
+            InlineKeyboardButton(text=tr.btn_bulk_clear, callback_data=callback_router.pack("bulk_clear", page)),
+        ]
+    )
+    navigation = []
+    if page > 0:
+        navigation.append(
+            InlineKeyboardButton(text=tr.btn_prev_page, callback_data=callback_router.pack("bulk_page", page - 1))
+        )
+    if len(tickets) > BULK_TICKETS_PAGE_SIZE:
+        navigation.append(
+            InlineKeyboardButton(text=tr.btn_next_page, callback_data=callback_router.pack("bulk_page", page + 1))
+        )
+    if navigation:
+        keyboard.append(navigation)
+    keyboard.append(
+        [
+            InlineKeyboardButton(text=tr.btn_bulk_in_progress, callback_data="bulk_in_progress"),
+            InlineKeyboardButton(text=tr.btn_bulk_resolved, callback_data="bulk_resolved"),
+        ]
+    )
+    keyboard.append([InlineKeyboardButton(text=tr.btn_back, callback_data="view_unresolved_tickets")])
+    return tr.bulk_tickets(selected=len(selected), page=page + 1), InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+# Перерисовывает страницу выбора с текущим набором выбранных заявок
+async def show_bulk_selection(callback_query: types.CallbackQuery, state: FSMContext, page: int):
+    tr = get_locale(callback_query.from_user)
+    selected = set((await state.get_data()).get("bulk_selected", ()))
+    text, markup = await render_bulk_selection(tr, selected, page)
+    if text is not None:
+        await callback_query.message.edit_text(text, reply_markup=markup)
+
+
+# Обработчик нажатия на кнопку 'Выбрать несколько заявок'
+@callback_router.route("bulk_tickets")
+async def bulk_tickets(callback_query: types.CallbackQuery, state: FSMContext):
+    if await deny_non_admin(callback_query, "открыть множественный выбор заявок"):
+        return
+    await state.clear()
+    await state.update_data(bulk_selected=[])
+    await show_bulk_selection(callback_query, state, 0)
+    logger.info(
+        f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) открыл множественный выбор заявок."
+    )
+
+
+# Обработчик кнопок перехода по страницам множественного выбора
+@callback_router.route("bulk_page", int)
+async def bulk_tickets_page(callback_query: types.CallbackQuery, page: int, state: FSMContext):
+    if await deny_non_admin(callback_query, "открыть множественный выбор заявок"):
+        return
+    await show_bulk_selection(callback_query, state, page)
+
+
+# Обработчик нажатия на заявку: добавляет ее в выбор или убирает из него
+@callback_router.route("bulk_toggle", int, int)
+async def bulk_toggle_ticket(callback_query: types.CallbackQuery, ticket_id: int, page: int, state: FSMContext):
+    if await deny_non_admin(callback_query, f"выбрать заявку {ticket_id}"):
+        return
+    selected = set((await state.get_data()).get("bulk_selected", ()))
+    selected ^= {ticket_id}
+    await state.update_data(bulk_selected=sorted(selected))
+    await show_bulk_selection(callback_query, state, page)
+
+
+# Обработчик кнопки 'Выбрать все': выбираются все открытые заявки, а не только страница
+@callback_router.route("bulk_select_all", int)
+async def bulk_select_all(callback_query: types.CallbackQuery, page: int, state: FSMContext):
+    if await deny_non_admin(callback_query, "выбрать все заявки"):
+        return
+    db = await get_db_connection("tickets.db")
+    if db:
+        async with db.execute(
+            "SELECT id FROM tickets WHERE status IN ('Unresolved', 'In Progress') AND parent_id IS NULL"
+        ) as cursor:
+            selected = [row[0] for row in await cursor.fetchall()]
+        await state.update_data(bulk_selected=selected)
+        await show_bulk_selection(callback_query, state, page)
+
+
+# Обработчик кнопки 'Снять выбор'
+@callback_router.route("bulk_clear", int)
+async def bulk_clear(callback_query: types.CallbackQuery, page: int, state: FSMContext):
+    if await deny_non_admin(callback_query, "снять выбор заявок"):
+        return
+    await state.update_data(bulk_selected=[])
+    await show_bulk_selection(callback_query, state, page)
+
+
+# Меняет статус выбранных заявок одной транзакцией и уведомляет их авторов.
+# Итог показывается в сообщении с выбором (chat_id, message_id).
+async def apply_bulk_status(tr: Locale, ticket_ids, status: str, chat_id: int, message_id: int, response=None):
+    db = await get_db_connection("tickets.db")
+    if not db:
+        return
+    started = time.perf_counter()
+    # Заявки, получившие этот статус за время выбора, не меняются и не уведомляются
+    tickets = await set_tickets_status(ticket_ids, status, response)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    changed = len(set(ticket_ids).intersection(ticket[0] for ticket in tickets))
+    applied = tr.bulk_status_applied(
+        selected=len(ticket_ids), changed=changed, total=len(tickets), status=tr.status(status)
+    )
+    await bot.edit_message_text(
+        chat_id=chat_id, message_id=message_id, text=tr.bulk_notifying(applied=applied)
+    )
+    report = await notify_users_about_status_change(tickets, status, response)
+    await bot.edit_message_text(
+        chat_id=chat_id,
+        message_id=message_id,
+        text=tr.bulk_done(applied=applied, summary=report.summary(tr)),
+        reply_markup=get_back_menu(tr, "view_unresolved_tickets"),
+    )
+    logger.info(
+        f"Статус '{status}' установлен для {changed} из {len(ticket_ids)} выбранных заявок (изменено заявок с дубликатами: {len(tickets)}) за {elapsed_ms:.1f} мс."
+    )
+
+
+# Обработчик кнопки 'В процессе' для выбранных заявок
+@callback_router.route("bulk_in_progress")
+async def bulk_set_in_progress(callback_query: types.CallbackQuery, state: FSMContext):
+    if await deny_non_admin(callback_query, "установить статус 'В процессе' для выбранных заявок"):
+        return
+    tr = get_locale(callback_query.from_user)
+    ticket_ids = (await state.get_data()).get("bulk_selected")
+    if not ticket_ids:
+        await callback_query.answer(tr.bulk_nothing_selected, show_alert=True)
+        return
+    await state.clear()
+    await callback_query.answer(tr.status_set_in_progress)
+    logger.info(
+        f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) устанавливает статус 'В процессе' для {len(ticket_ids)} заявок."
+    )
+    await apply_bulk_status(
+        tr, ticket_ids, "In Progress", callback_query.message.chat.id, callback_query.message.message_id
+    )
+
+
+# Обработчик кнопки 'Решено' для выбранных заявок: запрашивает общий ответ
+@callback_router.route("bulk_resolved")
+async def bulk_set_resolved(callback_query: types.CallbackQuery, state: FSMContext):
+    if await deny_non_admin(callback_query, "установить статус 'Решено' для выбранных заявок"):
+        return
+    tr = get_locale(callback_query.from_user)
+    ticket_ids = (await state.get_data()).get("bulk_selected")
+    if not ticket_ids:
+        await callback_query.answer(tr.bulk_nothing_selected, show_alert=True)
+        return
+    await state.update_data(message_id_to_edit=callback_query.message.message_id)
+    await state.set_state(TicketBulkFSM.response)
+    await callback_query.message.answer(tr.bulk_enter_resolution(count=len(ticket_ids)))
+    logger.info(
+        f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) начал ввод ответа для {len(ticket_ids)} заявок."
+    )
+
+
+# Обработчик общего ответа: выбранные заявки отмечаются как решенные
+@dp.message(TicketBulkFSM.response, F.text)
+async def bulk_save_resolved_response(message: types.Message, state: FSMContext):
+    tr = get_locale(message.from_user)
+    data = await state.get_data()
+    await state.clear()
+    if message.from_user.id != ADMIN_ID:
+        logger.warning(
+            f"Пользователь {message.from_user.id} ({message.from_user.username}) пытался решить выбранные заявки."
+        )
+        return
+    logger.info(
+        f"Администратор {message.from_user.id} ({message.from_user.username}) устанавливает статус 'Решено' для {len(data['bulk_selected'])} заявок."
+    )
+    await apply_bulk_status(
+        tr, data["bulk_selected"], "Resolved", message.chat.id, data["message_id_to_edit"], message.text
+    )
+
+
+# Собирает страницу переписки по заявке: текст и кнопки. page < 0 — последняя страница.
+async def render_thread(tr: Locale, ticket, page: int, is_admin: bool):
+    ticket_id, problem, status = ticket[0], ticket[3], ticket[5]
+    messages, total = await ticket_archive.thread_page(ticket_id, page, THREAD_PAGE_SIZE)
+    keyboard = []
+    if messages:
+        page = (messages[0][0] - 1) // THREAD_PAGE_SIZE
+        messages_text = ""
+        for _, author, text, created_at in messages:
+            if len(text) > THREAD_MESSAGE_PREVIEW:
+                text = text[:THREAD_MESSAGE_PREVIEW] + "…"
+            messages_text += tr.thread_message(
+                time=datetime.fromtimestamp(created_at).strftime("%d.%m.%Y %H:%M"),
+                author=tr.thread_author_admin if author == AUTHOR_ADMIN else tr.thread_author_user,
+                text=text,
+            )
+        text = tr.thread(
+            ticket_id=ticket_id,
+            problem=problem,
+            status=tr.status(status),
+            first=messages[0][0],
+            last=messages[-1][0],
+            total=total,
+            messages=messages_text,
+        )
+        navigation = []
+        if page > 0:
+            navigation.append(
+                InlineKeyboardButton(
+                    text=tr.btn_prev_page, callback_data=callback_router.pack("thread", ticket_id, page - 1)
+                )
+            )
+        if messages[-1][0] < total:
+            navigation.append(
+                InlineKeyboardButton(
+                    text=tr.btn_next_page, callback_data=callback_router.pack("thread", ticket_id, page + 1)
+                )
+            )
+        if navigation:
+            keyboard.append(navigation)
+    else:
+        text = tr.thread_empty(ticket_id=ticket_id, problem=problem, status=tr.status(status))
+    if status != "Resolved":
+        keyboard.append(
+            [
+                InlineKeyboardButton(
+                    text=tr.btn_thread_reply, callback_data=callback_router.pack("thread_reply", ticket_id)
+                )
+            ]
+        )
+    keyboard.append(
+        [
+            InlineKeyboardButton(
+                text=tr.btn_back, callback_data="view_unresolved_tickets" if is_admin else "view_tickets"
+            )
+        ]
+    )
+    return text, InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+# Заявка, доступная пользователю (администратору — любая), или None с ответом об ошибке.
+# Через нее проходят просмотр переписки и ответ в ней, так что ответ от имени
+# администратора (AUTHOR_ADMIN) возможен только с ADMIN_ID.
+async def get_thread_ticket(callback_query: types.CallbackQuery, ticket_id: int):
+    tr = get_locale(callback_query.from_user)
+    ticket = await ticket_archive.get_ticket(ticket_id)
+    if ticket is None:
+        await callback_query.answer(tr.thread_not_found)
+        return None
+    if callback_query.from_user.id != ADMIN_ID and ticket[1] != callback_query.from_user.id:
+        await callback_query.answer(tr.action_denied)
+        logger.warning(
+            f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) пытался открыть чужую заявку {ticket_id}."
+        )
+        return None
+    return ticket
+
+
+# Обработчик нажатия на кнопку 'Переписка по заявке'
+@callback_router.route("select_thread_ticket")
+async def select_thread_ticket(callback_query: types.CallbackQuery):
+    # Список открытых заявок содержит чужие данные: только для администратора
+    if await deny_non_admin(callback_query, "открыть список заявок для переписки"):
+        return
+    tr = get_locale(callback_query.from_user)
+    if await select_ticket_for_status(callback_query, "open_thread", tr.select_thread_ticket):
+        logger.info(
+            f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) выбирает заявку для просмотра переписки."
+        )
+
+
+# Обработчик открытия переписки: показывается последняя страница
+@callback_router.route("open_thread", int)
+async def open_thread(callback_query: types.CallbackQuery, ticket_id: int, state: FSMContext):
+    await show_thread_page(callback_query, ticket_id, -1, state)
+
+
+# Обработчик кнопок перехода по страницам переписки
+@callback_router.route("thread", int, int)
+async def show_thread_page(callback_query: types.CallbackQuery, ticket_id: int, page: int, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
+    await state.clear()
+    ticket = await get_thread_ticket(callback_query, ticket_id)
+    if ticket is None:
+        return
+    text, markup = await render_thread(tr, ticket, page, callback_query.from_user.id == ADMIN_ID)
+    await callback_query.message.edit_text(text, reply_markup=markup)
+    navigation_log.info(
+        f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) открыл переписку по заявке {ticket_id}."
+    )
+
+
+# Обработчик нажатия на кнопку 'Написать сообщение'
+@callback_router.route("thread_reply", int)
+async def thread_reply(callback_query: types.CallbackQuery, ticket_id: int, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
+    ticket = await get_thread_ticket(callback_query, ticket_id)
+    if ticket is None:
+        return
+    if ticket[5] == "Resolved":
+        await callback_query.answer(tr.thread_closed)
+        return
+    await state.set_state(TicketThreadFSM.message)
+    await state.update_data(thread_ticket_id=ticket_id)
+    await callback_query.message.edit_text(
+        tr.thread_reply_prompt(ticket_id=ticket_id),
+        reply_markup=InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text=tr.btn_back, callback_data=callback_router.pack("open_thread", ticket_id)
+                    )
                 ]
-            ),
+            ]
+        ),
+    )
+
+
+# Обработчик сообщения в переписке: сообщение добавляется в конец и
+# пересылается другой стороне
+@dp.message(TicketThreadFSM.message, F.text)
+async def save_thread_message(message: types.Message, state: FSMContext):
+    tr = get_locale(message.from_user)
+    ticket_id = (await state.get_data())["thread_ticket_id"]
+    await state.clear()
+    is_admin = message.from_user.id == ADMIN_ID
+    ticket = await ticket_archive.get_ticket(ticket_id)
+    if ticket is None or (not is_admin and ticket[1] != message.from_user.id):
+        await message.answer(tr.thread_not_found)
+        return
+    if ticket[5] == "Resolved":
+        await message.answer(tr.thread_closed)
+        return
+
+    seq = await append_ticket_message(ticket_id, AUTHOR_ADMIN if is_admin else AUTHOR_USER, message.text)
+    await message.answer(tr.thread_reply_sent(ticket_id=ticket_id))
+    logger.info(
+        f"Пользователь {message.from_user.id} ({message.from_user.username}) добавил сообщение {seq} в переписку по заявке {ticket_id}."
+    )
+
+    user_id, problem, locale = ticket[1], ticket[3], ticket[7]
+    if is_admin:
+        user_tr = get_locale_by_code(locale)
+        try:
+            await bot.send_message(
+                user_id,
+                user_tr.thread_new_message(ticket_id=ticket_id, problem=problem, text=message.text),
+                reply_markup=InlineKeyboardMarkup(
+                    inline_keyboard=[
+                        [
+                            InlineKeyboardButton(
+                                text=user_tr.btn_open_thread,
+                                callback_data=callback_router.pack("open_thread", ticket_id),
+                            )
+                        ]
+                    ]
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось уведомить пользователя {user_id} о сообщении по заявке {ticket_id}: {e}")
+    else:
+        await admin_notifier.notify(
+            ADMIN_LOCALE.admin_thread_message(
+                ticket_id=ticket_id, username=display_username(ADMIN_LOCALE, user_id, ticket[2]), text=message.text
+            )
         )
 
+    text, markup = await render_thread(tr, ticket, -1, is_admin)
+    await message.answer(text, reply_markup=markup)
+
 
 # Обработчик нажатия на кнопку 'Просмотр решенных заявок'
-@dp.callback_query(F.data == "view_resolved_tickets")
+@callback_router.route("view_resolved_tickets")
 async def view_resolved_tickets(callback_query: types.CallbackQuery):
+    tr = get_locale(callback_query.from_user)
     db = await get_db_connection("tickets.db")
     if db:
         async with db.execute(
-            "SELECT id, problem, description, status, response, username FROM tickets WHERE status = 'Resolved'"  # Добавил username в запрос
+            "SELECT id, problem, description, status, response, user_id, username, "
+            "(SELECT COUNT(*) FROM tickets AS duplicates WHERE duplicates.parent_id = tickets.id) "
+            "FROM tickets WHERE status = 'Resolved' AND parent_id IS NULL"
         ) as cursor:
             resolved_tickets = await cursor.fetchall()
 
         if resolved_tickets:
             tickets_text = ""
-            for ticket in resolved_tickets:
-                ticket_info = (
-                    f"Заявка №{ticket[0]} от пользователя {ticket[5] if ticket[5] else 'Не указан'}\n"
-                    f"Проблема: {ticket[1]}\n"
-                    f"Описание: {ticket[2]}\n"
-                    f"Статус: {ticket[3]}\n"
-                    f"Ответ: {ticket[4]}\n----\n"
+            for ticket_id, problem, description, status, response, user_id, username, duplicates in resolved_tickets:
+                tickets_text += tr.admin_ticket_resolved(
+                    ticket_id=ticket_id,
+                    username=display_username(tr, user_id, username),
+                    problem=problem,
+                    description=description,
+                    status=tr.status(status),
+                    response=response,
+                    duplicates=tr.ticket_duplicates(count=duplicates) if duplicates else "",
                 )
-                tickets_text += ticket_info
 
             await callback_query.message.edit_text(
-                f"Решенные заявки:\n\n{tickets_text}",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [InlineKeyboardButton(text="Назад", callback_data="admin_tickets")]
-                    ]
-                ),
+                tr.resolved_tickets(tickets=tickets_text),
+                reply_markup=get_back_menu(tr, "admin_tickets"),
             )
             logger.info(
                 f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) просмотрел решенные заявки."
             )
         else:
             await callback_query.message.edit_text(
-                "Решенные заявки отсутствуют.",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [InlineKeyboardButton(text="Назад", callback_data="admin_tickets")]
-                    ]
-                ),
+                tr.no_resolved_tickets,
+                reply_markup=get_back_menu(tr, "admin_tickets"),
             )
             logger.info(
                 f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) не нашел решенных заявок."
             )
 
 
-# Обработчик нажатия на кнопку 'Назад' в меню 'Поддержка'
-@dp.callback_query(F.data == "support_menu")
-async def support_menu(callback_query: types.CallbackQuery, state: FSMContext):
-    await state.clear()
+# Обработчик нажатия на кнопку 'Поиск заявок'
+@callback_router.route("search_tickets")
+async def search_tickets_prompt(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
+    if callback_query.from_user.id != ADMIN_ID:
+        await callback_query.answer(tr.logs_denied)
+        logger.warning(
+            f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) пытался искать заявки."
+        )
+        return
+    await state.set_state(TicketSearchFSM.query)
     await callback_query.message.edit_text(
-        "Чем мы можем вам помочь?",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="Отправить заявку", callback_data="send_ticket"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="Просмотр заявок", callback_data="view_tickets"
-                    )
-                ],
-                [InlineKeyboardButton(text="Назад", callback_data="back_main")],
-            ]
-        ),
+        tr.tickets_search_prompt,
+        reply_markup=get_back_menu(tr, "admin_tickets"),
     )
+
+
+# Собирает страницу результатов поиска заявок: текст и кнопки перехода по страницам
+async def render_ticket_search(tr: Locale, query: str, page: int):
+    if query.startswith("#") and query[1:].isdigit():
+        # Поиск по ID находит и заявки, перенесенные в архив
+        ticket = await ticket_archive.get_ticket(int(query[1:]))
+        rows = [(ticket[0], ticket[5], ticket[1], ticket[3], ticket[4])] if ticket and page == 0 else []
+        # Ник из старой заявки — на случай, если автора нет в кэше профилей
+        stored_usernames = {ticket[0]: ticket[2]} if ticket else {}
+    else:
+        stored_usernames = {}
+        # Лишняя заявка показывает, есть ли следующая страница
+        rows = await search_tickets(
+            query.split(), TICKET_SEARCH_PAGE_SIZE + 1, page * TICKET_SEARCH_PAGE_SIZE
+        )
+    if not rows:
+        return tr.tickets_search_empty(query=html.escape(query)), get_back_menu(tr, "admin_tickets")
+
+    tickets_text = ""
+    for ticket_id, status, user_id, problem, snippet in rows[:TICKET_SEARCH_PAGE_SIZE]:
+        tickets_text += tr.ticket_search_item(
+            ticket_id=ticket_id,
+            status=tr.status(status),
+            username=html.escape(display_username(tr, user_id, stored_usernames.get(ticket_id))),
+            problem=html.escape(problem or ""),
+            snippet=html.escape(snippet or "").replace(SNIPPET_START, "<b>").replace(SNIPPET_END, "</b>"),
+        )
+
+    navigation = []
+    if page > 0:
+        navigation.append(
+            InlineKeyboardButton(
+                text=tr.btn_prev_page, callback_data=callback_router.pack("ticket_search_page", page - 1)
+            )
+        )
+    if len(rows) > TICKET_SEARCH_PAGE_SIZE:
+        navigation.append(
+            InlineKeyboardButton(
+                text=tr.btn_next_page, callback_data=callback_router.pack("ticket_search_page", page + 1)
+            )
+        )
+    back_button = [InlineKeyboardButton(text=tr.btn_back, callback_data="admin_tickets")]
+    keyboard = [navigation, back_button] if navigation else [back_button]
+    text = tr.tickets_search_results(query=html.escape(query), page=page + 1, tickets=tickets_text)
+    return text, InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+
+# Обработчик поискового запроса по заявкам; запрос сохраняется для перехода по страницам
+@dp.message(TicketSearchFSM.query, F.text)
+async def search_tickets_query(message: types.Message, state: FSMContext):
+    tr = get_locale(message.from_user)
+    await state.update_data(ticket_query=message.text)
+    started = time.perf_counter()
+    text, markup = await render_ticket_search(tr, message.text, 0)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    await message.answer(text, parse_mode="HTML", reply_markup=markup)
     logger.info(
+        f"Администратор {message.from_user.id} ({message.from_user.username}) искал заявки: '{message.text}' ({elapsed_ms:.1f} мс)."
+    )
+
+
+# Обработчик кнопок перехода по страницам результатов поиска заявок
+@callback_router.route("ticket_search_page", int)
+async def search_tickets_page(callback_query: types.CallbackQuery, page: int, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
+    query = (await state.get_data()).get("ticket_query")
+    if query is None:
+        await callback_query.answer(tr.tickets_search_expired, show_alert=True)
+        return
+    text, markup = await render_ticket_search(tr, query, page)
+    await callback_query.message.edit_text(text, parse_mode="HTML", reply_markup=markup)
+
+
+# Обработчик нажатия на кнопку 'Назад' в меню 'Поддержка'
+@callback_router.route("support_menu")
+async def support_menu(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
+    await state.clear()
+    await callback_query.message.edit_text(tr.support_menu, reply_markup=get_menu(tr, "support"))
+    navigation_log.info(
         f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) вернулся в меню поддержки."
     )
 
 
 # Обработчик нажатия на кнопку 'Назад' в главном меню администратора
-@dp.callback_query(F.data == "admin_menu")
+@callback_router.route("admin_menu")
 async def admin_menu_back(callback_query: types.CallbackQuery):
-    await callback_query.message.edit_text(
-        "Панель администратора:",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="Отправить сообщение", callback_data="admin_broadcast"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="Управление заявками", callback_data="admin_tickets"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="Дополнительно", callback_data="admin_additional"
-                    )
-                ],
-                [InlineKeyboardButton(text="Назад", callback_data="back_main")],
-            ]
-        ),
-    )
+    tr = get_locale(callback_query.from_user)
+    await callback_query.message.edit_text(tr.admin_panel, reply_markup=get_menu(tr, "admin"))
     logger.info(
         f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) вернулся в главное меню администратора."
     )
 
 
 # Обработчик нажатия на кнопку 'Назад' в главном меню
-@dp.callback_query(F.data == "back_main")
+@callback_router.route("back_main")
 async def back_to_main(callback_query: types.CallbackQuery):
     await callback_query.message.delete()
     # main_menu = await get_main_menu(callback_query.from_user.id)  - убрано по требованию
-    logger.info(
+    navigation_log.info(
         f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) вернулся в главное меню."
     )
 
 
-# Уведомляет подписчиков с указанным типом подписки
-async def notify_subscribers(subscription_type, text):
-    db = await get_db_connection("subscribers.db")
-    if db:
-        async with db.execute(
-            "SELECT chat_id FROM subscribers WHERE subscription_type=?",
-            (subscription_type,),
-        ) as cursor:
-            subscribers = await cursor.fetchall()
+# Ставит рассылку в очередь; прогресс и итог показываются администратору в одном сообщении
+async def start_broadcast(title, segment: Segment, send, tr: Locale):
+    progress_message = await bot.send_message(ADMIN_ID, tr.broadcast_queued(title=title))
 
-        for (chat_id,) in subscribers:
-            await bot.send_message(chat_id, text)
+    async def show(text):
+        await bot.edit_message_text(
+            chat_id=ADMIN_ID, message_id=progress_message.message_id, text=text
+        )
+
+    async def on_progress(job):
+        eta = job.eta
+        await show(
+            tr.broadcast_progress(
+                title=title,
+                processed=job.report.processed,
+                total=job.total,
+                percent=job.percent,
+                eta=format_duration(eta) if eta is not None else tr.eta_unknown,
+            )
+        )
+
+    async def on_done(job):
+        if job.interrupted:
+            await show(
+                tr.broadcast_interrupted(
+                    title=title, processed=job.report.processed, total=job.total, summary=job.report.summary(tr)
+                )
+            )
+            return
+        await show(
+            tr.broadcast_done(
+                title=title,
+                elapsed=format_duration(job.finished_at - job.started_at),
+                summary=job.report.summary(tr),
+            )
+        )
+
+    return await broadcaster.submit(title, segment, send, on_progress, on_done)
+
+
+# Уведомляет подписчиков, входящих в сегмент (например, "updates & !fixes")
+async def notify_subscribers(segment: Segment, text, title):
+    return await start_broadcast(
+        title, segment, lambda chat_id: bot.send_message(chat_id, text), ADMIN_LOCALE
+    )
+
+
+# Отправляет накопленные публикации из группы дайджестами
+async def flush_group_digest(posts):
+    digests = build_digests(posts)
+    for digest in digests:
+        titles = {}
+        for post in digest.posts:
+            titles[post.title] = titles.get(post.title, 0) + 1
+        title = ", ".join(f"{name} ×{count}" if count > 1 else name for name, count in titles.items())
+        # Части дайджеста идут отдельными заданиями, которые выполняются по порядку
+        for number, text in enumerate(digest.messages, start=1):
+            part_title = f"{title} ({number}/{len(digest.messages)})" if len(digest.messages) > 1 else title
+            await notify_subscribers(digest.segment, text, part_title)
+        logger.info(
+            f"Дайджест '{title}' для сегмента '{digest.segment.expression}': "
+            f"{len(digest.messages)} сообщений на получателя вместо {len(digest.posts)}."
+        )
+
+
+# Накопитель публикаций для режима дайджеста
+digest_buffer = (
+    DigestBuffer(DIGEST_WINDOW, flush_group_digest, DIGEST_MAX_DELAY, DIGEST_MAX_POSTS)
+    if DIGEST_WINDOW > 0
+    else None
+)
+
+
+# Возвращает сегмент для заголовка публикации из группы (None, если тема неизвестна)
+@lru_cache(maxsize=32)
+def group_post_segment(header: str):
+    topics = {GROUP_POST_TOPICS.get(part.strip()) for part in header.replace("+", ",").split(",")}
+    if None in topics:
+        return None
+    # Объединение тем: подписчик нескольких тем получит публикацию один раз
+    return Segment.parse(" | ".join(sorted(topics)))
+
+
+# Обработчик публикаций в группе: первая строка 'Update' и/или 'Fixes' определяет сегмент
+@dp.message(F.chat.id == GROUP_ID, F.text)
+async def parse_group_message(message: types.Message):
+    # Отделяем первую строку (тип публикации) от текста уведомления
+    header, _, remaining_text = message.text.partition("\n")
+    segment = group_post_segment(header.strip())
+    if segment is None or not remaining_text.strip():
+        return
+
+    if digest_buffer is not None:
+        digest_buffer.add(header.strip(), remaining_text, segment)
+        logger.info(
+            f"Публикация '{header.strip()}' из группы {message.chat.id} добавлена в дайджест ({len(digest_buffer)} в очереди)."
+        )
+        return
+
+    # Доставка идет в фоне, обработчик сразу возвращается
+    job = await notify_subscribers(segment, remaining_text, header.strip())
+    logger.info(
+        f"Публикация '{header.strip()}' из группы {message.chat.id} поставлена в очередь рассылки #{job.job_id}."
+    )
 
 
 # Обработчик нажатия на кнопку 'Управление БД'
-@dp.callback_query(F.data == "db_actions")
+@callback_router.route("db_actions")
 async def db_actions(callback_query: types.CallbackQuery):
+    tr = get_locale(callback_query.from_user)
     await callback_query.message.edit_text(
-        "Управление БД (сброс и бэкап):",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [
-                    InlineKeyboardButton(
-                        text="Сброс базы данных", callback_data="reset_database"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        text="Создать бэкап баз данных", callback_data="create_backup"
-                    )
-                ],
-                [InlineKeyboardButton(text="Назад", callback_data="admin_additional")],
-            ]
-        ),
+        tr.db_menu,
+        reply_markup=get_menu(tr, "db"),
     )
     logger.info(
         f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) вошел в меню 'Управление БД'."
@@ -1191,160 +1789,116 @@ async def db_actions(callback_query: types.CallbackQuery):
 
 
 # Обработчик нажатия на кнопку 'Создать бэкап'
-@dp.callback_query(F.data == "create_backup")
+@callback_router.route("create_backup")
 async def create_backup_handler(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
     await callback_query.message.edit_text(
-        "Вы уверены, что хотите создать резервную копию?",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="Да", callback_data="confirm_create_backup")],
-                [InlineKeyboardButton(text="Нет", callback_data="admin_additional")],
-            ]
-        ),
+        tr.backup_confirm,
+        reply_markup=get_menu(tr, "backup_confirm"),
     )
     await state.set_state(CreateBackupFSM.confirmation)
 
 
 # Обработчик подтверждения создания бэкапа
-@dp.callback_query(F.data == "confirm_create_backup")
+@callback_router.route("confirm_create_backup")
 async def confirm_create_backup_handler(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
     await state.clear()
     try:
         backup_folder_path = await create_backup()
         backup_folder_name = os.path.basename(backup_folder_path)
         await callback_query.message.edit_text(
-            f"Резервные копии успешно созданы в папке: {backup_folder_name}",
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="Назад", callback_data="admin_additional"
-                        )
-                    ]
-                ]
-            ),
+            tr.backup_created(folder=backup_folder_name),
+            reply_markup=get_back_menu(tr, "admin_additional"),
         )
     except Exception as e:
         logger.error(f"Ошибка при создании резервной копии: {e}")
         await callback_query.message.edit_text(
-            f"Произошла ошибка при создании резервной копии: {e}",
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text="Назад", callback_data="admin_additional"
-                        )
-                    ]
-                ]
-            ),
+            tr.backup_failed(error=e),
+            reply_markup=get_back_menu(tr, "admin_additional"),
         )
 
 
 # Обработчик нажатия на кнопку 'Сброс базы данных'
-@dp.callback_query(F.data == "reset_database")
+@callback_router.route("reset_database")
 async def reset_database_select(callback_query: types.CallbackQuery):
+    tr = get_locale(callback_query.from_user)
     if callback_query.from_user.id == ADMIN_ID:
         await callback_query.message.edit_text(
-            "Выберите базу данных для сброса:",
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [InlineKeyboardButton(text="Заявки", callback_data="reset_tickets")],
-                    [
-                        InlineKeyboardButton(
-                            text="Подписчики", callback_data="reset_subscribers"
-                        )
-                    ],
-                    [InlineKeyboardButton(text="Назад", callback_data="admin_additional")],
-                ]
-            ),
+            tr.reset_select,
+            reply_markup=get_menu(tr, "reset"),
         )
         logger.info(
             f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) вошел в меню сброса базы данных."
         )
     else:
-        await callback_query.answer("У вас нет прав для выполнения этого действия.")
+        await callback_query.answer(tr.action_denied)
         logger.warning(
             f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) пытался сбросить базу данных."
         )
 
 
 # Обработчик сброса выбранной базы данных
-@dp.callback_query(F.data.startswith("reset_"))
-async def reset_database(callback_query: types.CallbackQuery):
-    db_to_reset = callback_query.data.split("_")[1]
+@callback_router.route("reset", str)
+async def reset_database(callback_query: types.CallbackQuery, db_to_reset: str):
+    tr = get_locale(callback_query.from_user)
     if callback_query.from_user.id == ADMIN_ID:
         if db_to_reset == "tickets":
             db = await get_db_connection("tickets.db")
             if db:
                 await db.execute("DELETE FROM tickets")
                 await db.execute("UPDATE sqlite_sequence SET seq = 0 WHERE name = 'tickets'")
+                await db.execute("DELETE FROM sla_buckets")
+                await db.execute("DELETE FROM ticket_messages")
                 await db.commit()
+                await ticket_archive.reset()
+                if duplicate_index is not None:
+                    duplicate_index.clear()
                 await callback_query.message.edit_text(
-                    "База данных заявок сброшена.",
-                    reply_markup=InlineKeyboardMarkup(
-                        inline_keyboard=[
-                            [
-                                InlineKeyboardButton(
-                                    text="Назад", callback_data="admin_additional"
-                                )
-                            ]
-                        ]
-                    ),
+                    tr.tickets_reset,
+                    reply_markup=get_back_menu(tr, "admin_additional"),
                 )
                 logger.info(
                     f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) сбросил базу данных заявок."
                 )
         elif db_to_reset == "subscribers":
-            db = await get_db_connection("subscribers.db")
-            if db:
-                await db.execute("DELETE FROM subscribers")
-                await db.commit()
-                await callback_query.message.edit_text(
-                    "База данных подписчиков сброшена.",
-                    reply_markup=InlineKeyboardMarkup(
-                        inline_keyboard=[
-                            [
-                                InlineKeyboardButton(
-                                    text="Назад", callback_data="admin_additional"
-                                )
-                            ]
-                        ]
-                    ),
-                )
-                logger.info(
-                    f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) сбросил базу данных подписчиков."
-                )
+            await subscriber_store.reset()
+            await callback_query.message.edit_text(
+                tr.subscribers_reset,
+                reply_markup=get_back_menu(tr, "admin_additional"),
+            )
+            logger.info(
+                f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) сбросил базу данных подписчиков."
+            )
         else:
-            await callback_query.answer("Неизвестная база данных.")
+            await callback_query.answer(tr.unknown_database)
             logger.warning(
                 f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) пытался сбросить неизвестную базу данных: {db_to_reset}"
             )
     else:
-        await callback_query.answer("У вас нет прав для выполнения этого действия.")
+        await callback_query.answer(tr.action_denied)
         logger.warning(
             f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) пытался сбросить базу данных."
         )
 
 
 # Обработчик нажатия на кнопку 'Статистика'
-@dp.callback_query(F.data == "view_statistics")
+@callback_router.route("view_statistics")
 async def view_statistics(callback_query: types.CallbackQuery):
+    tr = get_locale(callback_query.from_user)
     if callback_query.from_user.id == ADMIN_ID:
-        db_sub = await get_db_connection("subscribers.db")
         db_tic = await get_db_connection("tickets.db")
 
-        if db_sub and db_tic:
-            # Получение общего числа подписчиков
-            async with db_sub.execute("SELECT COUNT(*) FROM subscribers") as cursor:
-                total_subscribers = (await cursor.fetchone())[0]
-
-            # Получение числа подписчиков по типам
-            async with db_sub.execute(
-                "SELECT subscription_type, COUNT(*) FROM subscribers GROUP BY subscription_type"
-            ) as cursor:
-                subscription_counts = await cursor.fetchall()
+        if db_tic:
+            # Получение общего числа подписчиков и числа подписчиков по темам
+            total_subscribers = await subscriber_store.count()
+            topics_counts = await subscriber_store.count_by_topics()
+            deactivated_subscribers = topics_counts.get(0, 0)
+            subscription_counts = [
+                (getattr(tr, f"topic_{name}"), sum(count for topics, count in topics_counts.items() if topics & bit))
+                for name, bit in TOPICS.items()
+            ]
 
-            
             # Получение общего числа заявок
             async with db_tic.execute("SELECT COUNT(*) FROM tickets") as cursor:
                 total_tickets = (await cursor.fetchone())[0]
@@ -1355,14 +1909,31 @@ async def view_statistics(callback_query: types.CallbackQuery):
             ) as cursor:
                 resolved_tickets = (await cursor.fetchone())[0]
 
+            # Архивированные заявки — решенные заявки, перенесенные из tickets.db
+            archived_tickets = await ticket_archive.count()
+            total_tickets += archived_tickets
+            resolved_tickets += archived_tickets
+
             # Получение числа нерешенных заявок
             async with db_tic.execute(
                 "SELECT COUNT(*) FROM tickets WHERE status IN ('Unresolved', 'In Progress')"
             ) as cursor:
                 unresolved_tickets = (await cursor.fetchone())[0]
 
-            # Форматирование времени работы бота
-            uptime = get_uptime()
+            # SLA: возраст самой старой открытой заявки и перцентили времени решения по гистограмме
+            oldest_tickets, _ = await oldest_open_tickets(1)
+            oldest_open = format_age(tr, time.time() - oldest_tickets[0][5]) if oldest_tickets else tr.sla_no_data
+            resolved_count, percentiles = await resolution_percentiles()
+            resolution_time = (
+                tr.sla_percentiles(
+                    p50=format_age(tr, percentiles[50]),
+                    p90=format_age(tr, percentiles[90]),
+                    p99=format_age(tr, percentiles[99]),
+                    count=resolved_count,
+                )
+                if resolved_count
+                else tr.sla_no_data
+            )
 
             # Форматирование данных о подписках
             subscription_details = "\n".join(
@@ -1373,39 +1944,40 @@ async def view_statistics(callback_query: types.CallbackQuery):
             tickets_backup_info, subscribers_backup_info = await get_backup_info()
 
             # Текст статистики
-            stats_text = (
-                f"Время работы бота: {uptime}\n"
-                f"Версия бота: {BOT_VERSION}\n\n"
-                f"Всего подписчиков: {total_subscribers}\n"
-                f"Подписчики по типам:\n{subscription_details}\n\n"
-                f"Всего заявок: {total_tickets}\n"
-                f"Решенных заявок: {resolved_tickets}\n"
-                f"Нерешенных заявок: {unresolved_tickets}\n\n"
-                f"Последний бэкап заявок: {tickets_backup_info}\n"
-                f"Последний бэкап подписчиков: {subscribers_backup_info}"
+            stats_text = tr.statistics(
+                uptime=get_uptime(tr),
+                version=BOT_VERSION,
+                total_subscribers=total_subscribers,
+                subscription_details=subscription_details,
+                deactivated_subscribers=deactivated_subscribers,
+                total_tickets=total_tickets,
+                resolved_tickets=resolved_tickets,
+                archived_tickets=archived_tickets,
+                unresolved_tickets=unresolved_tickets,
+                oldest_open=oldest_open,
+                resolution_time=resolution_time,
+                tickets_backup=tickets_backup_info or tr.backup_not_found,
+                subscribers_backup=subscribers_backup_info or tr.backup_not_found,
             )
 
             await callback_query.message.edit_text(
                 stats_text,
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [InlineKeyboardButton(text="Назад", callback_data="admin_additional")]
-                    ]
-                ),
+                reply_markup=get_back_menu(tr, "admin_additional"),
             )
             logger.info(
                 f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) просмотрел статистику."
             )
     else:
-        await callback_query.answer("У вас нет прав для выполнения этого действия.")
+        await callback_query.answer(tr.action_denied)
         logger.warning(
             f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) пытался просмотреть статистику."
         )
 
 
 # Обработчик нажатия на кнопку 'Просмотр логов'
-@dp.callback_query(F.data == "view_logs")
+@callback_router.route("view_logs")
 async def view_logs(callback_query: types.CallbackQuery):
+    tr = get_locale(callback_query.from_user)
     if callback_query.from_user.id == ADMIN_ID:
         try:
             log_file_path = os.path.join(log_dir, "error.log")
@@ -1413,46 +1985,42 @@ async def view_logs(callback_query: types.CallbackQuery):
             logs_text = ""
             lines = []
 
-            with open(log_file_path, "rb") as log_file:
-                log_file.seek(0, io.SEEK_END)
-                file_size = log_file.tell()
-                if file_size > 0:
-                    cursor_position = file_size
-
-                    while len(lines) < lines_to_show and cursor_position > 0:
-                        cursor_position -= 1
-                        log_file.seek(cursor_position, io.SEEK_SET)
-                        char = log_file.read(1)
-                        if char == b"\n":
-                            line = log_file.readline().decode(
-                                "utf-8", errors="replace"
-                            ).strip()
-                            if line:
-                                lines.append(line)
-                        elif cursor_position == 0:
-                            log_file.seek(0, io.SEEK_SET)
-                            line = log_file.readline().decode(
-                                "utf-8", errors="replace"
-                            ).strip()
-                            if line:
-                                lines.append(line)
-
-                    logs_text = "\n".join(reversed(lines))
-                else:
-                    logs_text = "Лог файл пуст."
+            # Файл лога создается при первой записи в него
+            if not os.path.exists(log_file_path):
+                logs_text = tr.logs_empty
+            else:
+                with open(log_file_path, "rb") as log_file:
+                    log_file.seek(0, io.SEEK_END)
+                    file_size = log_file.tell()
+                    if file_size > 0:
+                        cursor_position = file_size
+
+                        while len(lines) < lines_to_show and cursor_position > 0:
+                            cursor_position -= 1
+                            log_file.seek(cursor_position, io.SEEK_SET)
+                            char = log_file.read(1)
+                            if char == b"\n":
+                                line = log_file.readline().decode(
+                                    "utf-8", errors="replace"
+                                ).strip()
+                                if line:
+                                    lines.append(line)
+                            elif cursor_position == 0:
+                                log_file.seek(0, io.SEEK_SET)
+                                line = log_file.readline().decode(
+                                    "utf-8", errors="replace"
+                                ).strip()
+                                if line:
+                                    lines.append(line)
+
+                        logs_text = "\n".join(reversed(lines))
+                    else:
+                        logs_text = tr.logs_empty
 
             await callback_query.message.edit_text(
-                f"<b>Последние {len(lines)} строк логов:</b>\n<pre>{logs_text}</pre>",
+                tr.logs_tail(count=len(lines), logs=logs_text),
                 parse_mode="HTML",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="Назад", callback_data="admin_additional"
-                            )
-                        ]
-                    ]
-                ),
+                reply_markup=get_back_menu(tr, "admin_additional"),
             )
             logger.info(
                 f"Администратор {callback_query.from_user.id} ({callback_query.from_user.username}) просмотрел логи."
@@ -1462,64 +2030,161 @@ async def view_logs(callback_query: types.CallbackQuery):
                 f"Ошибка при чтении логов администратором {callback_query.from_user.id} ({callback_query.from_user.username})"
             )
             await callback_query.message.edit_text(
-                f"Не удалось прочитать файл логов: {e}",
-                reply_markup=InlineKeyboardMarkup(
-                    inline_keyboard=[
-                        [
-                            InlineKeyboardButton(
-                                text="Назад", callback_data="admin_additional"
-                            )
-                        ]
-                    ]
-                ),
+                tr.logs_failed(error=e),
+                reply_markup=get_back_menu(tr, "admin_additional"),
             )
 
     else:
-        await callback_query.answer("У вас нет доступа к этой функции.")
+        await callback_query.answer(tr.logs_denied)
         logger.warning(
             f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) пытался просмотреть логи."
         )
 
 
-# Уведомляет пользователя об изменении статуса заявки
-async def notify_user_about_status_change(ticket_id, new_status, response=None):
-    db = await get_db_connection("tickets.db")
-    if db:
-        async with db.execute(
-            "SELECT user_id, problem FROM tickets WHERE id = ?", (ticket_id,)
-        ) as cursor:
-            result = await cursor.fetchone()
-            if result:
-                user_id, problem = result
+# Обработчик нажатия на кнопку 'Поиск по логам'
+@callback_router.route("search_logs")
+async def search_logs_prompt(callback_query: types.CallbackQuery, state: FSMContext):
+    tr = get_locale(callback_query.from_user)
+    if callback_query.from_user.id != ADMIN_ID:
+        await callback_query.answer(tr.logs_denied)
+        logger.warning(
+            f"Пользователь {callback_query.from_user.id} ({callback_query.from_user.username}) пытался искать по логам."
+        )
+        return
+    if log_index is None:
+        await callback_query.answer(tr.logs_search_disabled, show_alert=True)
+        return
+    await state.set_state(LogSearchFSM.query)
+    await callback_query.message.edit_text(
+        tr.logs_search_prompt,
+        reply_markup=get_back_menu(tr, "admin_additional"),
+    )
 
-                notification_message = (
-                    f"Статус вашей заявки (ID: {ticket_id}, Проблема: {problem}) изменен на '{new_status}'."
-                )
-                if new_status == "Решено" and response:
-                    notification_message += f"\nОтвет администратора: {response}"
 
-                await bot.send_message(user_id, notification_message)
-                logger.info(
-                    f"Пользователю {user_id} отправлено уведомление об изменении статуса заявки {ticket_id} на '{new_status}'."
-                )
-            else:
-                logger.warning(f"Не удалось найти заявку с ID {ticket_id} для уведомления пользователя.")
+# Форматирует найденные записи логов, пока они помещаются в одно сообщение
+def format_log_records(records, max_chars: int = 3500) -> str:
+    lines = []
+    total = 0
+    for ts, level, location, message in records:
+        line = html.escape(
+            f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')} | {level} | {location} | {message}"
+        )
+        total += len(line) + 1
+        if total > max_chars:
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+# Обработчик поискового запроса по логам; состояние сохраняется для следующих запросов
+@dp.message(LogSearchFSM.query, F.text)
+async def search_logs(message: types.Message):
+    tr = get_locale(message.from_user)
+    back_menu = get_back_menu(tr, "admin_additional")
+    try:
+        query = LogQuery.parse(message.text)
+    except ValueError as e:
+        await message.answer(tr.logs_search_invalid(error=e), reply_markup=back_menu)
+        return
+    started = time.perf_counter()
+    records = await log_index.search(query)
+    elapsed_ms = f"{(time.perf_counter() - started) * 1000:.1f}"
+    if records:
+        await message.answer(
+            tr.logs_search_results(count=len(records), ms=elapsed_ms, logs=format_log_records(records)),
+            parse_mode="HTML",
+            reply_markup=back_menu,
+        )
+    else:
+        await message.answer(tr.logs_search_empty(ms=elapsed_ms), reply_markup=back_menu)
+    logger.info(
+        f"Администратор {message.from_user.id} ({message.from_user.username}) искал по логам: '{message.text}', найдено {len(records)} за {elapsed_ms} мс."
+    )
+
+
+# Доставки уведомлений об изменении статуса, идущие сейчас: задача -> число сообщений.
+# Обработчики aiogram при остановке не ждут, поэтому их дожидается main.
+status_notifications = {}
+
+
+# Уведомляет авторов заявок об изменении статуса на языке, на котором заявка была подана.
+# Сообщения отправляются параллельно с общим для рассылок ограничением частоты.
+async def notify_users_about_status_change(tickets, new_status, response=None) -> DeliveryReport:
+    messages = []
+    for ticket_id, user_id, problem, locale in tickets:
+        tr = get_locale_by_code(locale)
+        notification_message = tr.ticket_status_changed(
+            ticket_id=ticket_id, problem=problem, status=tr.status(new_status)
+        )
+        if new_status == "Resolved" and response:
+            notification_message += tr.ticket_admin_response(response=response)
+        messages.append((user_id, notification_message))
+
+    delivery = asyncio.ensure_future(
+        deliver_messages(messages, bot.send_message, BROADCAST_CONCURRENCY, broadcaster.limiter)
+    )
+    status_notifications[delivery] = len(messages)
+    delivery.add_done_callback(lambda task: status_notifications.pop(task, None))
+    # Отмена обработчика при остановке опроса не обрывает доставку
+    report = await asyncio.shield(delivery)
+    logger.info(
+        f"Уведомления об изменении статуса {len(tickets)} заявок на '{new_status}': отправлено {report.sent}, ошибок {report.failed}."
+    )
+    return report
+
+
+# Дожидается уведомлений об изменении статуса (не дольше timeout секунд), остальные прерывает
+async def wait_status_notifications(timeout: float):
+    if not status_notifications:
+        return
+    _, pending = await asyncio.wait(list(status_notifications), timeout=timeout)
+    if pending:
+        logger.warning(
+            f"Уведомления об изменении статуса прерваны остановкой бота: "
+            f"{len(pending)} пачек на {sum(status_notifications.get(task, 0) for task in pending)} сообщений."
+        )
+        for delivery in pending:
+            delivery.cancel()
 
 
 # Запускает бота
 async def main():
-    await init_ticket_db()
-    await init_subscriber_db()
+    log_pipeline = setup_logging()
+    startup_timer.mark("импорт и настройка логов")
+    # Базы заявок и подписчиков независимы, поэтому открываются одновременно
+    await asyncio.gather(init_ticket_db(), ticket_archive.open(), subscriber_store.open())
+    # Профили заполняются из заявок при первом запуске, поэтому открываются после них
+    await asyncio.gather(load_duplicate_index(), user_profiles.open())
+    startup_timer.mark("базы данных")
+    broadcaster.start()
     asyncio.create_task(backup_databases())
-    logger.bind(tags="startup_shutdown").info(f"Бот начал работу. Версия: {BOT_VERSION}")
+    if TICKET_ARCHIVE_DAYS > 0:
+        asyncio.create_task(ticket_archive.run(TICKET_ARCHIVE_INTERVAL))
+    asyncio.create_task(user_profiles.run())
+    logger.bind(tags="startup_shutdown").info(
+        f"Бот начал работу. Версия: {BOT_VERSION}, язык по умолчанию: {DEFAULT_LOCALE}"
+    )
     try:
         await dp.start_polling(bot)
     except Exception:
         logger.opt(exception=True).error(f"Произошла ошибка при запуске бота.")
     finally:
+        if digest_buffer is not None:
+            await digest_buffer.close()
+        await asyncio.gather(
+            broadcaster.stop(BROADCAST_SHUTDOWN_TIMEOUT), wait_status_notifications(BROADCAST_SHUTDOWN_TIMEOUT)
+        )
+        # Итоги рассылок отправлены после остановки опроса: закрываем сессию еще раз
+        await bot.session.close()
         await close_db_connection("tickets.db")
-        await close_db_connection("subscribers.db")
+        await close_db_connection(ticket_archive.path)
+        await subscriber_store.close()
         logger.bind(tags="startup_shutdown").info("Бот завершил работу.")
+        # Дожидаемся записи сообщений, оставшихся в очереди логов
+        log_pipeline.stop()
+        if log_index is not None:
+            await close_db_connection(log_index.path)
+            log_index.close()
 
 
 if __name__ == "__main__":
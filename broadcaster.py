@@ -0,0 +1,178 @@
+import asyncio
+import itertools
+
+from loguru import logger
+
+from delivery import DeliveryReport, RateLimiter, deliver
+
+
+# Задание на рассылку: сегмент, функция отправки и прогресс доставки
+class BroadcastJob:
+    __slots__ = (
+        "job_id",
+        "title",
+        "segment",
+        "send",
+        "total",
+        "report",
+        "on_progress",
+        "on_done",
+        "started_at",
+        "finished_at",
+        "interrupted",
+    )
+
+    def __init__(self, job_id, title, segment, send, total, on_progress=None, on_done=None):
+        self.job_id = job_id
+        self.title = title
+        self.segment = segment
+        self.send = send
+        self.total = total  # Оценка числа получателей на момент постановки в очередь
+        self.report = DeliveryReport()
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.started_at = None
+        self.finished_at = None
+        self.interrupted = False  # Рассылка не завершена из-за остановки бота
+
+    # Доля обработанных получателей, в процентах
+    @property
+    def percent(self) -> int:
+        if not self.total:
+            return 100 if self.finished_at is not None else 0
+        return min(100, self.report.processed * 100 // self.total)
+
+    # Оценка оставшегося времени в секундах по наблюдаемой скорости отправки
+    @property
+    def eta(self):
+        if self.started_at is None or not self.report.processed:
+            return None
+        elapsed = asyncio.get_running_loop().time() - self.started_at
+        remaining = max(0, self.total - self.report.processed)
+        return remaining * elapsed / self.report.processed
+
+
+# Очередь рассылок с одновременной отправкой и общим ограничением частоты
+class Broadcaster:
+    """
+    Обработчики ставят задание в очередь и сразу возвращаются. Задания
+    выполняются по одному: лимит Telegram общий для бота, поэтому
+    параллельные рассылки не ускорили бы доставку, а только перемешали бы
+    сообщения. Внутри задания получателей обслуживают concurrency
+    отправителей с общим RateLimiter; раз в progress_interval секунд
+    вызывается on_progress(job), по завершении — on_done(job). При остановке
+    очередь дорабатывает до timeout секунд; не доставленные к этому
+    моменту задания получают on_done с job.interrupted = True.
+    """
+
+    def __init__(self, store, concurrency: int = 10, rate: float = 25.0, progress_interval: float = 5.0):
+        self.store = store
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate)
+        self.progress_interval = progress_interval
+        self._queue = asyncio.Queue()
+        self._job_ids = itertools.count(1)
+        self._worker = None
+        self.current = None  # Выполняемое задание
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    # Дожидается выполнения очереди (не дольше timeout секунд), затем прерывает
+    # текущую рассылку и сообщает о недоставленных заданиях
+    async def stop(self, timeout: float = 30):
+        if self._worker is None:
+            return
+        if self.current is not None or self.pending:
+            logger.info(
+                f"Ожидание рассылок при остановке (до {timeout:.0f} с): "
+                f"выполняется {'1' if self.current is not None else '0'}, в очереди {self.pending}."
+            )
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        unfinished = [self.current] if self.current is not None else []
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        while not self._queue.empty():
+            unfinished.append(self._queue.get_nowait())
+            self._queue.task_done()
+        for job in unfinished:
+            job.interrupted = True
+            logger.warning(
+                f"Рассылка #{job.job_id} '{job.title}' прервана остановкой бота: "
+                f"обработано {job.report.processed} из {job.total} получателей, успешно {job.report.sent}."
+            )
+            await self._notify(job.on_done, job)
+
+    # Число заданий, ожидающих выполнения
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    # Ставит рассылку в очередь и возвращает задание без ожидания доставки
+    async def submit(self, title, segment, send, on_progress=None, on_done=None) -> BroadcastJob:
+        counts = await self.store.count_by_topics()
+        total = sum(counts.get(mask, 0) for mask in segment.masks())
+        job = BroadcastJob(next(self._job_ids), title, segment, send, total, on_progress, on_done)
+        self._queue.put_nowait(job)
+        logger.info(
+            f"Рассылка #{job.job_id} '{title}' поставлена в очередь: получателей {total}, заданий в очереди {self.pending}."
+        )
+        return job
+
+    async def _run(self):
+        while True:
+            job = await self._queue.get()
+            self.current = job
+            try:
+                await self._execute(job)
+            except Exception:
+                logger.opt(exception=True).error(f"Ошибка при выполнении рассылки #{job.job_id} '{job.title}'")
+            finally:
+                self.current = None
+                self._queue.task_done()
+
+    async def _execute(self, job: BroadcastJob):
+        loop = asyncio.get_running_loop()
+        job.started_at = loop.time()
+        ticker = asyncio.create_task(self._report_progress(job))
+        try:
+            await deliver(
+                self.store,
+                job.segment,
+                job.send,
+                concurrency=self.concurrency,
+                limiter=self.limiter,
+                report=job.report,
+            )
+        finally:
+            job.finished_at = loop.time()
+            ticker.cancel()
+
+        report = job.report
+        logger.info(
+            f"Рассылка #{job.job_id} '{job.title}' завершена за {job.finished_at - job.started_at:.1f} с. "
+            f"Успешно: {report.sent}, ошибок: {report.failed}, отключено подписчиков: {report.deactivated}."
+        )
+        await self._notify(job.on_done, job)
+
+    async def _report_progress(self, job: BroadcastJob):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            await self._notify(job.on_progress, job)
+
+    # Вызывает обработчик прогресса; его ошибки не должны прерывать рассылку
+    async def _notify(self, callback, job: BroadcastJob):
+        if callback is None:
+            return
+        try:
+            await callback(job)
+        except Exception as e:
+            logger.warning(f"Не удалось обновить прогресс рассылки #{job.job_id}: {e}")
@@ -0,0 +1,77 @@
+import inspect
+
+from loguru import logger
+
+# Ограничение Telegram на длину callback_data в байтах
+MAX_CALLBACK_DATA_BYTES = 64
+
+# Разделитель действия и аргументов в callback_data
+SEPARATOR = ":"
+
+
+# Упаковывает действие и аргументы в callback_data: "mark_resolved:42"
+def pack_callback(action: str, *args) -> str:
+    data = SEPARATOR.join((action, *map(str, args)))
+    if len(data.encode()) > MAX_CALLBACK_DATA_BYTES:
+        raise ValueError(f"callback_data длиннее {MAX_CALLBACK_DATA_BYTES} байт: {data}")
+    return data
+
+
+# Маршрутизатор нажатий на inline-кнопки
+class CallbackRouter:
+    """
+    Вместо цепочки фильтров F.data == ... / F.data.startswith(...), которые
+    aiogram проверяет по очереди для каждого нажатия, в диспетчере
+    регистрируется один обработчик dispatch. Он отделяет действие от
+    аргументов и находит обработчик в словаре за O(1); аргументы
+    приводятся к типам, указанным при регистрации маршрута.
+    """
+
+    def __init__(self):
+        self._routes = {}
+
+    # Регистрирует обработчик действия: @router.route("mark_resolved", int)
+    def route(self, action: str, *arg_types):
+        if SEPARATOR in action:
+            raise ValueError(f"Имя действия не может содержать '{SEPARATOR}': {action}")
+
+        def decorator(handler):
+            if action in self._routes:
+                raise ValueError(f"Действие '{action}' уже зарегистрировано")
+            wants_state = "state" in inspect.signature(handler).parameters
+            self._routes[action] = (handler, arg_types, wants_state)
+            return handler
+
+        return decorator
+
+    # Упаковывает callback_data для зарегистрированного действия
+    def pack(self, action: str, *args) -> str:
+        if action not in self._routes:
+            raise KeyError(f"Неизвестное действие: {action}")
+        return pack_callback(action, *args)
+
+    # Единый обработчик callback_query для диспетчера aiogram
+    async def dispatch(self, callback_query, state):
+        action, *raw_args = (callback_query.data or "").split(SEPARATOR)
+        route = self._routes.get(action)
+        if route is None or len(raw_args) != len(route[1]):
+            # Например, кнопки из старых сообщений с прежним форматом данных
+            logger.warning(
+                f"Неизвестные данные кнопки от пользователя {callback_query.from_user.id}: {callback_query.data}"
+            )
+            await callback_query.answer()
+            return
+
+        handler, arg_types, wants_state = route
+        try:
+            args = [arg_type(raw) for arg_type, raw in zip(arg_types, raw_args)]
+        except ValueError:
+            logger.warning(
+                f"Некорректные аргументы кнопки от пользователя {callback_query.from_user.id}: {callback_query.data}"
+            )
+            await callback_query.answer()
+            return
+
+        if wants_state:
+            return await handler(callback_query, *args, state=state)
+        return await handler(callback_query, *args)
@@ -0,0 +1,420 @@
+import asyncio
+import time
+
+import aiosqlite
+from loguru import logger
+
+from sla import RESOLUTION, SLA_SCHEMA, duration_percentiles, record_durations
+
+# Полнотекстовый индекс заявок: внешнее содержимое из таблицы tickets,
+# синхронизация триггерами при вставке, изменении и удалении
+TICKET_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+    problem, description, response, content='tickets', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS tickets_fts_ai AFTER INSERT ON tickets BEGIN
+    INSERT INTO tickets_fts(rowid, problem, description, response)
+    VALUES (new.id, new.problem, new.description, new.response);
+END;
+CREATE TRIGGER IF NOT EXISTS tickets_fts_ad AFTER DELETE ON tickets BEGIN
+    INSERT INTO tickets_fts(tickets_fts, rowid, problem, description, response)
+    VALUES ('delete', old.id, old.problem, old.description, old.response);
+END;
+CREATE TRIGGER IF NOT EXISTS tickets_fts_au AFTER UPDATE OF problem, description, response ON tickets BEGIN
+    INSERT INTO tickets_fts(tickets_fts, rowid, problem, description, response)
+    VALUES ('delete', old.id, old.problem, old.description, old.response);
+    INSERT INTO tickets_fts(rowid, problem, description, response)
+    VALUES (new.id, new.problem, new.description, new.response);
+END;
+"""
+
+# Переписка по заявкам: сообщения только добавляются, seq — номер сообщения
+# в заявке (1, 2, 3...). Страница переписки — диапазон индекса (ticket_id,
+# seq), поэтому ее чтение не зависит от длины переписки и от того, сколько
+# сообщений других заявок пришло между сообщениями этой. Таблица обычная,
+# с rowid: тексты сообщений длинные, и в таблице без rowid они раздували бы
+# страницы B-дерева ключа.
+TICKET_MESSAGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticket_messages (
+    id INTEGER PRIMARY KEY,
+    ticket_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    author TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ticket_messages_thread ON ticket_messages(ticket_id, seq);
+"""
+
+# Авторы сообщений в переписке
+AUTHOR_USER, AUTHOR_ADMIN = "user", "admin"
+
+# Вес совпадений в bm25: проблема, описание, ответ
+TICKET_FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Число самых новых совпадений, среди которых ранжируются результаты поиска
+TICKET_SEARCH_CANDIDATES = 2000
+
+# Число ID в одном запросе IN (...): меньше лимита параметров SQLite
+TICKET_ID_CHUNK = 500
+
+# Маркеры совпадений во фрагментах: заменяются на разметку после экранирования текста
+SNIPPET_START, SNIPPET_END = "\x02", "\x03"
+
+
+# Выражение FTS5 из слов пользователя: все слова обязательны, кавычки и
+# операторы FTS5 в словах не действуют. Слово со звездочкой в конце ищется
+# как префикс; при all_prefix=True префиксами считаются все слова.
+def fts_prefix_query(words, all_prefix: bool = True) -> str:
+    terms = []
+    for word in words:
+        prefix = all_prefix or word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+# Пул долгоживущих соединений: одно соединение aiosqlite на файл базы.
+# Каждое соединение работает в своем потоке, поэтому открытие файла, запросы
+# и fsync не блокируют цикл событий, а обработчики не переоткрывают базу.
+db_connections = {}  # Словарь для хранения соединений
+_connection_locks = {}
+
+
+# Возвращает соединение с базой данных
+async def get_db_connection(db_name: str) -> aiosqlite.Connection:
+    """
+    Если соединение уже существует, возвращает его.
+    Если нет, создает новое соединение (одно на базу даже при
+    одновременных вызовах из нескольких обработчиков).
+    """
+    if db_name in db_connections:
+        return db_connections[db_name]
+    lock = _connection_locks.setdefault(db_name, asyncio.Lock())
+    async with lock:
+        if db_name not in db_connections:
+            try:
+                db = await aiosqlite.connect(db_name)
+                # WAL позволяет читать во время записи, NORMAL убирает fsync на каждый commit
+                await db.execute("PRAGMA journal_mode=WAL")
+                await db.execute("PRAGMA synchronous=NORMAL")
+                db_connections[db_name] = db
+            except aiosqlite.OperationalError as e:
+                logger.error(f"Не удалось подключиться к базе данных {db_name}: {e}")
+                return None
+    return db_connections[db_name]
+
+
+# Закрывает соединение с базой данных
+async def close_db_connection(db_name: str):
+    if db_name in db_connections:
+        await db_connections.pop(db_name).close()
+
+
+# Закрывает все открытые соединения
+async def close_all_db_connections():
+    await asyncio.gather(*(close_db_connection(db_name) for db_name in list(db_connections)))
+
+
+# Перезагружает соединение с базой данных
+async def reload_db_connection(db_name: str):
+    await close_db_connection(db_name)
+    await get_db_connection(db_name)
+
+
+# Инициализирует базу данных для заявок (tickets.db)
+async def init_ticket_db():
+    db = await get_db_connection("tickets.db")
+    if db:
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tickets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                username TEXT,
+                problem TEXT,
+                description TEXT,
+                status TEXT,
+                response TEXT,
+                locale TEXT,
+                parent_id INTEGER,
+                simhash INTEGER,
+                resolved_at REAL,
+                created_at REAL,
+                updated_at REAL
+            );
+            """
+        )
+        # Базы, созданные eng_bot.py до общего слоя хранения, не имели столбца username
+        async with db.execute("PRAGMA table_info(tickets)") as cursor:
+            columns = [column[1] for column in await cursor.fetchall()]
+        if "username" not in columns:
+            await db.execute("ALTER TABLE tickets ADD COLUMN username TEXT")
+            logger.info("Добавлен столбец username в таблицу tickets")
+        # Язык автора заявки для уведомлений о смене статуса
+        if "locale" not in columns:
+            await db.execute("ALTER TABLE tickets ADD COLUMN locale TEXT")
+            logger.info("Добавлен столбец locale в таблицу tickets")
+        # Связь дубликата с исходной заявкой и сигнатура текста для поиска дубликатов
+        for column in ("parent_id", "simhash"):
+            if column not in columns:
+                await db.execute(f"ALTER TABLE tickets ADD COLUMN {column} INTEGER")
+                logger.info(f"Добавлен столбец {column} в таблицу tickets")
+        # Время решения (Unix) для переноса старых решенных заявок в архив. Заявкам,
+        # решенным до появления столбца, срок отсчитывается от обновления бота.
+        if "resolved_at" not in columns:
+            await db.execute("ALTER TABLE tickets ADD COLUMN resolved_at REAL")
+            await db.execute("UPDATE tickets SET resolved_at = ? WHERE status = 'Resolved'", (time.time(),))
+            logger.info("Добавлен столбец resolved_at в таблицу tickets")
+        # Время подачи и последнего изменения (Unix) для SLA и очереди по возрасту.
+        # Заявкам, поданным до появления столбцов, проставляется время обновления бота.
+        for column in ("created_at", "updated_at"):
+            if column not in columns:
+                await db.execute(f"ALTER TABLE tickets ADD COLUMN {column} REAL")
+                await db.execute(f"UPDATE tickets SET {column} = ?", (time.time(),))
+                logger.info(f"Добавлен столбец {column} в таблицу tickets")
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tickets_parent ON tickets(parent_id) WHERE parent_id IS NOT NULL"
+        )
+        # Очередь открытых заявок по возрасту: самые старые k читаются за O(k)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tickets_aging ON tickets(created_at, id) "
+            "WHERE status IN ('Unresolved', 'In Progress') AND parent_id IS NULL"
+        )
+        # Заявки пользователя (его список заявок) читаются по индексу
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_tickets_user ON tickets(user_id)")
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tickets_resolved ON tickets(resolved_at) WHERE status = 'Resolved'"
+        )
+        async with db.execute("SELECT 1 FROM sqlite_master WHERE name = 'tickets_fts'") as cursor:
+            fts_exists = await cursor.fetchone() is not None
+        async with db.execute("SELECT 1 FROM sqlite_master WHERE name = 'ticket_messages'") as cursor:
+            messages_exist = await cursor.fetchone() is not None
+        await db.executescript(TICKET_FTS_SCHEMA)
+        await db.executescript(SLA_SCHEMA)
+        await db.executescript(TICKET_MESSAGES_SCHEMA)
+        if not fts_exists:
+            # Заявки, созданные до появления индекса, индексируются один раз
+            await db.execute("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')")
+            logger.info("Создан полнотекстовый индекс заявок tickets_fts")
+        if not messages_exist:
+            # Ответы, данные до появления переписки, становятся ее первым сообщением
+            await db.execute(
+                "INSERT INTO ticket_messages (ticket_id, seq, author, text, created_at) "
+                "SELECT id, 1, ?, response, COALESCE(resolved_at, updated_at) FROM tickets WHERE response IS NOT NULL",
+                (AUTHOR_ADMIN,),
+            )
+            logger.info("Создана таблица переписки ticket_messages")
+        await db.commit()
+
+
+# Ищет заявки по словам из problem, description и response
+async def search_tickets(words, limit: int, offset: int = 0) -> list:
+    """
+    Возвращает страницу результатов, самые релевантные (bm25) первыми:
+    (id, status, user_id, problem, snippet). snippet — фрагмент лучше всего
+    совпавшего поля, совпадения обрамлены SNIPPET_START и SNIPPET_END.
+    Слова ищутся целиком, 'оплат*' — как префикс. Ранжируются только
+    TICKET_SEARCH_CANDIDATES самых новых совпадений: FTS5 перебирает их по
+    убыванию rowid и останавливается, поэтому время ответа по частым словам
+    не растет с числом заявок. Префиксы так не работают: FTS5 сначала
+    собирает все совпадения с префиксом. Фрагменты строятся только для
+    заявок текущей страницы.
+    """
+    match = fts_prefix_query(words, all_prefix=False)
+    db = await get_db_connection("tickets.db")
+    if not db or not match:
+        return []
+    async with db.execute(
+        f"""
+        WITH candidates AS (
+            SELECT rowid, bm25(tickets_fts, {", ".join(map(str, TICKET_FTS_WEIGHTS))}) AS score
+            FROM tickets_fts WHERE tickets_fts MATCH :match
+            ORDER BY rowid DESC LIMIT :candidates
+        ),
+        page AS (
+            SELECT rowid, score FROM candidates ORDER BY score, rowid DESC LIMIT :limit OFFSET :offset
+        )
+        SELECT tickets.id, tickets.status, tickets.user_id, tickets.problem,
+               snippet(tickets_fts, -1, :start, :end, '…', 12)
+        FROM page
+        JOIN tickets_fts ON tickets_fts.rowid = page.rowid AND tickets_fts MATCH :match
+        JOIN tickets ON tickets.id = page.rowid
+        ORDER BY page.score, page.rowid DESC
+        """,
+        {
+            "match": match,
+            "candidates": TICKET_SEARCH_CANDIDATES,
+            "limit": limit,
+            "offset": offset,
+            "start": SNIPPET_START,
+            "end": SNIPPET_END,
+        },
+    ) as cursor:
+        return await cursor.fetchall()
+
+
+# Добавляет заявку одним запросом и сразу возвращает данные для уведомлений
+async def insert_ticket(user_id, problem, description, locale, parent_id=None, signature=None):
+    """
+    Возвращает (id, duplicates, parent_problem): для дубликата — число
+    дубликатов родителя вместе с новой заявкой и проблему родителя, иначе
+    (id, 0, None). ID и данные родителя приходят из RETURNING вставки, без
+    отдельных SELECT после фиксации. Ник автора в заявку не пишется: его
+    ведет кэш профилей (profiles.py).
+    """
+    db = await get_db_connection("tickets.db")
+    if not db:
+        return None
+    now = time.time()
+    async with db.execute(
+        "INSERT INTO tickets "
+        "(user_id, problem, description, status, locale, parent_id, simhash, created_at, updated_at) "
+        "VALUES (?, ?, ?, 'Unresolved', ?, ?, ?, ?, ?) "
+        "RETURNING id, "
+        "(SELECT COUNT(*) FROM tickets AS duplicates WHERE duplicates.parent_id = tickets.parent_id), "
+        "(SELECT problem FROM tickets AS parent WHERE parent.id = tickets.parent_id)",
+        (user_id, problem, description, locale, parent_id, signature, now, now),
+    ) as cursor:
+        row = await cursor.fetchone()
+    await db.commit()
+    return row
+
+
+# Меняет статус нескольких заявок одной транзакцией
+async def update_tickets_status(ticket_ids, status: str, response: str = None) -> list:
+    """
+    Меняет статус заявок и всех их дубликатов (parent_id), response — ответ
+    администратора (None не меняет ответ). Меняются только открытые заявки
+    с другим статусом; остальные не затрагиваются и не возвращаются:
+    повторное нажатие устаревшей кнопки или устаревший выбор заявок не
+    сдвигает время решения, не открывает решенную заявку снова, не
+    дублирует ответ в переписке и уведомления. Для статуса 'Resolved' запоминается время решения, от
+    которого считается срок до архивации, а время от подачи до решения
+    исходной заявки (не дубликатов: одна проблема — одно решение)
+    добавляется в гистограмму SLA в той же транзакции. Ответ также
+    добавляется в переписку каждой измененной заявки. Заявки
+    обновляются пачками по TICKET_ID_CHUNK запросом UPDATE ... RETURNING,
+    который сразу отдает измененные строки (id, user_id, problem, locale),
+    и фиксируются один раз: на пачку приходится один запрос вместо UPDATE
+    и SELECT.
+    """
+    ticket_ids = list(ticket_ids)
+    db = await get_db_connection("tickets.db")
+    if not db or not ticket_ids:
+        return []
+    now = time.time()
+    resolved_at = now if status == "Resolved" else None
+    assignment = "status = ?, updated_at = ?, resolved_at = ?"
+    values = (status, now, resolved_at)
+    if response is not None:
+        assignment += ", response = ?"
+        values += (response,)
+    changed = []
+    for start in range(0, len(ticket_ids), TICKET_ID_CHUNK):
+        chunk = ticket_ids[start:start + TICKET_ID_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        async with db.execute(
+            f"UPDATE tickets SET {assignment} "
+            f"WHERE (id IN ({placeholders}) OR parent_id IN ({placeholders})) "
+            f"AND status IN ('Unresolved', 'In Progress') AND status != ? "
+            f"RETURNING id, user_id, problem, locale, created_at, parent_id",
+            (*values, *chunk, *chunk, status),
+        ) as cursor:
+            changed.extend(await cursor.fetchall())
+    if response is not None:
+        # Ответ администратора остается в response и добавляется в переписку
+        await db.executemany(
+            APPEND_MESSAGE, [(ticket_id, AUTHOR_ADMIN, response, now, ticket_id) for ticket_id, *_ in changed]
+        )
+    if resolved_at is not None:
+        await record_durations(
+            db,
+            RESOLUTION,
+            [
+                resolved_at - created_at
+                for *_, created_at, parent_id in changed
+                if created_at is not None and parent_id is None
+            ],
+        )
+    await db.commit()
+    return [row[:4] for row in changed]
+
+
+# Самые старые открытые заявки (без дубликатов) и число всех открытых заявок
+async def oldest_open_tickets(limit: int):
+    """
+    Заявки читаются по частичному индексу idx_tickets_aging от старых к
+    новым и останавливаются после limit строк: (id, problem, description,
+    status, user_id, created_at, число дубликатов). Число открытых заявок
+    считается по тому же индексу, без чтения таблицы.
+    """
+    db = await get_db_connection("tickets.db")
+    if not db:
+        return [], 0
+    open_tickets = "status IN ('Unresolved', 'In Progress') AND parent_id IS NULL"
+    async with db.execute(
+        f"SELECT id, problem, description, status, user_id, created_at, "
+        f"(SELECT COUNT(*) FROM tickets AS duplicates WHERE duplicates.parent_id = tickets.id) "
+        f"FROM tickets WHERE {open_tickets} ORDER BY created_at, id LIMIT ?",
+        (limit,),
+    ) as cursor:
+        tickets = await cursor.fetchall()
+    async with db.execute(f"SELECT COUNT(*) FROM tickets WHERE {open_tickets}") as cursor:
+        total = (await cursor.fetchone())[0]
+    return tickets, total
+
+
+# Перцентили времени решения заявок по гистограмме SLA: (число заявок, {перцентиль: секунды})
+async def resolution_percentiles(percentiles=(50, 90, 99)):
+    db = await get_db_connection("tickets.db")
+    if not db:
+        return 0, {}
+    return await duration_percentiles(db, RESOLUTION, percentiles)
+
+
+# Добавляет сообщение в конец переписки: номер вычисляется в той же
+# инструкции по индексу, без отдельного SELECT MAX(seq). Уникальный индекс
+# не даст двум сообщениям получить один номер.
+APPEND_MESSAGE = (
+    "INSERT INTO ticket_messages (ticket_id, seq, author, text, created_at) "
+    "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM ticket_messages WHERE ticket_id = ?"
+)
+
+
+# Добавляет сообщение в переписку по заявке, возвращает его номер
+async def append_ticket_message(ticket_id: int, author: str, text: str) -> int:
+    db = await get_db_connection("tickets.db")
+    if not db:
+        return None
+    async with db.execute(
+        f"{APPEND_MESSAGE} RETURNING seq", (ticket_id, author, text, time.time(), ticket_id)
+    ) as cursor:
+        seq = (await cursor.fetchone())[0]
+    await db.commit()
+    return seq
+
+
+# Страница переписки: (сообщения (seq, author, text, created_at), всего сообщений)
+async def ticket_thread_page(ticket_id: int, page: int, page_size: int):
+    """
+    Страница page (с нуля, от первых сообщений к последним) содержит
+    сообщения с номерами page * page_size + 1 ... (page + 1) * page_size:
+    номера идут подряд, поэтому страница — диапазон индекса, а
+    число сообщений — последний номер (без COUNT по всей переписке).
+    page < 0 — последняя страница.
+    """
+    db = await get_db_connection("tickets.db")
+    if not db:
+        return [], 0
+    async with db.execute("SELECT MAX(seq) FROM ticket_messages WHERE ticket_id = ?", (ticket_id,)) as cursor:
+        total = (await cursor.fetchone())[0] or 0
+    if page < 0:
+        page = max(0, (total - 1) // page_size)
+    async with db.execute(
+        "SELECT seq, author, text, created_at FROM ticket_messages "
+        "WHERE ticket_id = ? AND seq BETWEEN ? AND ? ORDER BY seq",
+        (ticket_id, page * page_size + 1, (page + 1) * page_size),
+    ) as cursor:
+        return await cursor.fetchall(), total
@@ -0,0 +1,218 @@
+import asyncio
+from enum import Enum
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramMigrateToChat,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from loguru import logger
+
+
+# Причины, по которым сообщение не было доставлено
+class DeliveryFailure(str, Enum):
+    BLOCKED = "blocked"  # Пользователь заблокировал бота
+    CHAT_NOT_FOUND = "chat_not_found"  # Чат удален или не существует
+    DEACTIVATED = "deactivated"  # Аккаунт пользователя удален
+    TRANSIENT = "transient"  # Временная ошибка (лимиты, сеть, сервер Telegram)
+    OTHER = "other"  # Прочие ошибки (например, некорректное сообщение)
+
+
+# Постоянные ошибки: чат больше недоступен, и подписчика нужно отключить
+PERMANENT_FAILURES = frozenset(
+    {DeliveryFailure.BLOCKED, DeliveryFailure.CHAT_NOT_FOUND, DeliveryFailure.DEACTIVATED}
+)
+
+
+# Определяет причину ошибки отправки по исключению aiogram
+def classify_failure(error: Exception) -> DeliveryFailure:
+    description = str(error).lower()
+    if isinstance(error, TelegramForbiddenError):
+        if "deactivated" in description:
+            return DeliveryFailure.DEACTIVATED
+        # "bot was blocked by the user", "bot was kicked", "bot can't initiate conversation"
+        return DeliveryFailure.BLOCKED
+    if isinstance(error, TelegramMigrateToChat):
+        # Группа стала супергруппой, старый chat_id больше не действует
+        return DeliveryFailure.CHAT_NOT_FOUND
+    if isinstance(error, (TelegramRetryAfter, TelegramNetworkError, TelegramServerError)):
+        return DeliveryFailure.TRANSIENT
+    if isinstance(error, TelegramBadRequest):
+        if "chat not found" in description or "user not found" in description:
+            return DeliveryFailure.CHAT_NOT_FOUND
+        if "deactivated" in description:
+            return DeliveryFailure.DEACTIVATED
+    return DeliveryFailure.OTHER
+
+
+# Итоги доставки рассылки
+class DeliveryReport:
+    __slots__ = ("sent", "failures", "deactivated")
+
+    def __init__(self):
+        self.sent = 0
+        self.failures = {failure: 0 for failure in DeliveryFailure}
+        self.deactivated = 0  # Сколько подписчиков отключено по постоянным ошибкам
+
+    @property
+    def failed(self) -> int:
+        return sum(self.failures.values())
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed
+
+    # Текст отчета для администратора на его языке (tr — набор текстов из locales)
+    def summary(self, tr) -> str:
+        lines = [tr.report_summary(sent=self.sent, failed=self.failed)]
+        for failure, count in self.failures.items():
+            if count:
+                lines.append(tr.report_failure(label=getattr(tr, f"failure_{failure.value}"), count=count))
+        if self.deactivated:
+            lines.append(tr.report_deactivated(count=self.deactivated))
+        return "\n".join(lines)
+
+
+# Ограничивает частоту отправки сообщений (общая для всех одновременных отправителей)
+class RateLimiter:
+    """
+    Каждый вызов acquire() резервирует следующий свободный интервал длиной
+    1 / rate секунд, поэтому сколько бы корутин ни отправляло сообщения
+    одновременно, суммарная частота не превышает rate в секунду.
+    """
+
+    __slots__ = ("interval", "_next_slot")
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    # Приостанавливает все отправки (например, по RetryAfter от Telegram)
+    def pause(self, seconds: float):
+        now = asyncio.get_running_loop().time()
+        self._next_slot = max(self._next_slot, now + seconds)
+
+
+# Отправляет одно сообщение, повторяя попытку при временных ошибках
+async def send_with_retry(send, chat_id: int, attempts: int = 3, limiter: RateLimiter = None):
+    for attempt in range(1, attempts + 1):
+        if limiter:
+            await limiter.acquire()
+        try:
+            return await send(chat_id)
+        except TelegramRetryAfter as e:
+            if attempt == attempts:
+                raise
+            if limiter:
+                # Лимит общий для бота, поэтому паузу соблюдают все отправители
+                limiter.pause(e.retry_after)
+            else:
+                await asyncio.sleep(e.retry_after)
+        except (TelegramNetworkError, TelegramServerError):
+            if attempt == attempts:
+                raise
+            await asyncio.sleep(attempt)
+
+
+# Доставляет сообщение подписчикам сегмента и отключает недоступные чаты
+async def deliver(
+    store,
+    segment,
+    send,
+    prune_batch_size: int = 100,
+    concurrency: int = 1,
+    limiter: RateLimiter = None,
+    report: DeliveryReport = None,
+) -> DeliveryReport:
+    """
+    send(chat_id) — корутина, отправляющая сообщение одному получателю.
+    Получатели читаются пачками и раздаются concurrency отправителям через
+    ограниченную очередь; limiter задает общую частоту отправки. Чаты с
+    постоянными ошибками (бот заблокирован, чат не найден, аккаунт удален)
+    накапливаются и пачками отключаются в хранилище, чтобы следующие рассылки
+    не тратили на них запросы к API и лимиты. Переданный report обновляется
+    по ходу доставки, что позволяет показывать прогресс.
+    """
+    report = report if report is not None else DeliveryReport()
+    unreachable = []
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def sender():
+        while True:
+            chat_id = await queue.get()
+            if chat_id is None:
+                return
+            try:
+                await send_with_retry(send, chat_id, limiter=limiter)
+                report.sent += 1
+            except Exception as e:
+                failure = classify_failure(e)
+                report.failures[failure] += 1
+                if failure in PERMANENT_FAILURES:
+                    unreachable.append((chat_id, failure.value))
+                    logger.info(f"Пользователь {chat_id} недоступен ({failure.value}): {e}")
+                else:
+                    logger.error(f"Ошибка при отправке сообщения пользователю {chat_id}: {e}")
+
+    senders = [asyncio.create_task(sender()) for _ in range(concurrency)]
+    try:
+        async for batch in store.iter_batches(segment):
+            for chat_id in batch:
+                await queue.put(chat_id)
+            if len(unreachable) >= prune_batch_size:
+                pending, unreachable = unreachable, []
+                report.deactivated += await store.deactivate(pending)
+        for _ in senders:
+            await queue.put(None)
+        await asyncio.gather(*senders)
+    finally:
+        for task in senders:
+            task.cancel()
+
+    if unreachable:
+        report.deactivated += await store.deactivate(unreachable)
+    return report
+
+
+# Доставляет персональные сообщения (chat_id, текст) без хранилища подписчиков
+async def deliver_messages(
+    messages,
+    send,
+    concurrency: int = 1,
+    limiter: RateLimiter = None,
+    report: DeliveryReport = None,
+) -> DeliveryReport:
+    """
+    send(chat_id, text) — корутина отправки одного сообщения. Сообщения
+    раздаются concurrency отправителям с общим limiter, как в deliver, но
+    недоступные чаты только учитываются в отчете: получатели — авторы
+    заявок, а не подписчики, и отключать в хранилище нечего.
+    """
+    report = report if report is not None else DeliveryReport()
+    queue = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait(message)
+
+    async def sender():
+        while not queue.empty():
+            chat_id, text = queue.get_nowait()
+            try:
+                await send_with_retry(lambda chat_id: send(chat_id, text), chat_id, limiter=limiter)
+                report.sent += 1
+            except Exception as e:
+                failure = classify_failure(e)
+                report.failures[failure] += 1
+                logger.warning(f"Не удалось отправить сообщение пользователю {chat_id} ({failure.value}): {e}")
+
+    await asyncio.gather(*(sender() for _ in range(max(1, min(concurrency, queue.qsize())))))
+    return report
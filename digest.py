@@ -0,0 +1,151 @@
+import asyncio
+
+from loguru import logger
+
+from topics import MASK_SPACE, Segment
+
+# Максимальная длина сообщения Telegram
+MAX_MESSAGE_CHARS = 4096
+
+# Разделитель публикаций внутри дайджеста
+DIGEST_SEPARATOR = "\n\n———\n\n"
+
+
+# Публикация из группы, ожидающая отправки в составе дайджеста
+class DigestPost:
+    __slots__ = ("title", "text", "segment")
+
+    def __init__(self, title: str, text: str, segment: Segment):
+        self.title = title
+        self.text = text
+        self.segment = segment
+
+
+# Дайджест для одной группы получателей: сегмент и готовые сообщения
+class Digest:
+    __slots__ = ("segment", "posts", "messages")
+
+    def __init__(self, segment: Segment, posts: list, messages: list):
+        self.segment = segment
+        self.posts = posts
+        self.messages = messages
+
+
+# Склеивает тексты в сообщения не длиннее max_chars
+def pack_messages(texts, max_chars: int = MAX_MESSAGE_CHARS, separator: str = DIGEST_SEPARATOR) -> list:
+    """
+    Публикации добавляются в текущее сообщение, пока оно помещается в лимит;
+    следующая начинает новое сообщение. Публикация длиннее лимита режется
+    на части, поэтому ни одно сообщение не будет отклонено Telegram.
+    """
+    messages = []
+    current = ""
+    for text in texts:
+        for start in range(0, len(text), max_chars):
+            piece = text[start : start + max_chars]
+            if current and len(current) + len(separator) + len(piece) <= max_chars:
+                current += separator + piece
+            else:
+                if current:
+                    messages.append(current)
+                current = piece
+    if current:
+        messages.append(current)
+    return messages
+
+
+# Разбивает накопленные публикации на дайджесты по группам получателей
+def build_digests(posts: list, max_chars: int = MAX_MESSAGE_CHARS) -> list:
+    """
+    Для каждой маски тем определяется набор публикаций, который должен
+    получить подписчик с этой маской. Маски с одинаковым набором
+    объединяются в один сегмент, поэтому каждый получатель попадает ровно
+    в один дайджест и получает все адресованные ему публикации одним
+    сообщением (или несколькими, если текст не помещается в лимит).
+    """
+    groups = {}
+    for mask in range(1, MASK_SPACE):
+        selected = tuple(index for index, post in enumerate(posts) if post.segment.matches(mask))
+        if selected:
+            groups[selected] = groups.get(selected, 0) | 1 << mask
+
+    digests = []
+    for selected, table in groups.items():
+        digest_posts = [posts[index] for index in selected]
+        expression = " | ".join(dict.fromkeys(f"({post.segment.expression})" for post in digest_posts))
+        messages = pack_messages([post.text for post in digest_posts], max_chars)
+        digests.append(Digest(Segment(expression, table), digest_posts, messages))
+    return digests
+
+
+# Накопитель публикаций: отправляет их одним дайджестом после паузы в публикациях
+class DigestBuffer:
+    """
+    Каждая новая публикация откладывает отправку на window секунд (debounce),
+    но не дальше чем на max_delay от первой публикации в пачке, чтобы поток
+    публикаций не задерживал уведомления бесконечно. При max_posts
+    публикациях пачка отправляется сразу. flush(posts) — корутина,
+    получающая накопленные публикации. При остановке (close) ожидающие
+    публикации отправляются сразу, не дожидаясь таймера.
+    """
+
+    def __init__(self, window: float, flush, max_delay: float = None, max_posts: int = 20):
+        self.window = window
+        self.max_delay = max_delay if max_delay is not None else window * 4
+        self.max_posts = max_posts
+        self._flush = flush
+        self._posts = []
+        self._first_at = None
+        self._timer = None
+        self._sending = None  # Задача, уже отдающая пачку в flush
+
+    def __len__(self):
+        return len(self._posts)
+
+    # Добавляет публикацию и переносит момент отправки
+    def add(self, title: str, text: str, segment: Segment):
+        now = asyncio.get_running_loop().time()
+        if not self._posts:
+            self._first_at = now
+        self._posts.append(DigestPost(title, text, segment))
+
+        if len(self._posts) >= self.max_posts:
+            delay = 0
+        else:
+            delay = max(0, min(self.window, self._first_at + self.max_delay - now))
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.create_task(self._flush_later(delay))
+
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        # После этой точки таймер не отменяется: новые публикации начнут новую пачку
+        self._timer = None
+        self._sending = asyncio.current_task()
+        try:
+            await self._send(self._take())
+        finally:
+            self._sending = None
+
+    def _take(self) -> list:
+        posts, self._posts = self._posts, []
+        return posts
+
+    async def _send(self, posts: list):
+        try:
+            await self._flush(posts)
+        except Exception:
+            logger.opt(exception=True).error(f"Ошибка при отправке дайджеста из {len(posts)} публикаций")
+
+    # Останавливает таймер и сразу отправляет накопленные публикации.
+    # Вызывается до остановки рассылок, чтобы дайджест успел попасть в их очередь.
+    async def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._sending is not None:
+            await self._sending
+        if self._posts:
+            posts = self._take()
+            logger.info(f"Дайджест отправляется при остановке: {len(posts)} публикаций")
+            await self._send(posts)
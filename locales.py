@@ -0,0 +1,511 @@
+import os
+from string import Formatter
+
+# Язык по умолчанию для пользователей, чей язык не поддерживается
+DEFAULT_LOCALE = os.getenv("DEFAULT_LOCALE", "ru")
+
+# Язык уведомлений администратору, которые отправляются не в ответ на его действия
+ADMIN_LOCALE_CODE = os.getenv("ADMIN_LOCALE", DEFAULT_LOCALE)
+
+# Тексты бота для каждого языка. Ключи и поля подстановки во всех языках
+# должны совпадать — это проверяется при импорте.
+_CATALOG = {
+    "ru": {
+        # Главное меню
+        "btn_subscribe": "Подписка на уведомления",
+        "btn_support": "Поддержка",
+        "btn_about": "О боте",
+        "btn_admin": "Администрирование",
+        "btn_back": "Назад",
+        "btn_yes": "Да",
+        "btn_no": "Нет",
+        "welcome": "Добро пожаловать! Выберите интересующую вас опцию ниже:",
+        "about": (
+            "Бот по отправке уведомлений о новом контенте и/или его исправлении на https://docs.basted.ru/.\n\n"
+            "Версия бота: {version}"
+        ),
+        # Подписка
+        "subscription_menu": "Настройте свою подписку:\n\nТекущая подписка: {current}",
+        "subscription_all": "Все уведомления",
+        "subscription_updates": "Обновления",
+        "subscription_none": "Нет подписки",
+        "subscription_unknown": "Неизвестная подписка",
+        "btn_subscribe_all": "Подписка на все уведомления",
+        "btn_subscribe_updates": "Подписка на обновления контента",
+        "btn_unsubscribe": "Отписаться",
+        "subscribed_all": "Вы подписаны на все уведомления.",
+        "subscribed_updates": "Вы подписаны на обновления.",
+        "unsubscribed": "Вы отписались от всех уведомлений.",
+        "topic_updates": "Обновления",
+        "topic_fixes": "Исправления",
+        # Поддержка
+        "support_menu": "Чем мы можем вам помочь?",
+        "btn_send_ticket": "Отправить заявку",
+        "btn_view_tickets": "Просмотр заявок",
+        "ticket_enter_problem": "Опишите кратко вашу проблему:",
+        "ticket_enter_description": "Дайте более подробное описание проблемы:",
+        "ticket_submitted": "Ваша заявка отправлена.",
+        "user_ticket": "Проблема: {problem}\nОписание: {description}\nСтатус: {status}",
+        "user_ticket_response": "\nОтвет: {response}",
+        "user_tickets": "Ваши заявки:\n\n{tickets}",
+        "user_no_tickets": "У вас нет отправленных заявок.",
+        "ticket_status_changed": "Статус вашей заявки (ID: {ticket_id}, Проблема: {problem}) изменен на '{status}'.",
+        "ticket_admin_response": "\nОтвет администратора: {response}",
+        "status_unresolved": "Не решена",
+        "status_in_progress": "В процессе",
+        "status_resolved": "Решено",
+        # Панель администратора
+        "admin_panel": "Панель администратора:",
+        "admin_denied": "У вас нет доступа к этому разделу.",
+        "action_denied": "У вас нет прав для выполнения этого действия.",
+        "throttled": "Слишком много запросов. Повторите через {seconds} с.",
+        "btn_admin_broadcast": "Отправить сообщение",
+        "btn_admin_tickets": "Управление заявками",
+        "btn_admin_additional": "Дополнительно",
+        "admin_new_ticket": "Новая заявка:\nПроблема: {problem}\nОписание: {description}\nID заявки: {ticket_id}",
+        "admin_duplicate_tickets": (
+            "Похожих заявок на заявку №{ticket_id} ({problem}): {count}.\n"
+            "Они не показываются в списках и получат тот же статус и ответ."
+        ),
+        "ticket_duplicates": "Похожих заявок: {count}\n",
+        "admin_urgent_ticket": "СРОЧНАЯ заявка:\nПроблема: {problem}\nОписание: {description}\nID заявки: {ticket_id}",
+        "admin_notifications_summary": "Сводка по заявкам, уведомлений: {count}",
+        # Рассылка
+        "broadcast_select": "Выберите, кому будет отправлено сообщение:",
+        "btn_broadcast_updates": "Обновление (всем)",
+        "btn_broadcast_fixes": "Исправления",
+        "broadcast_enter_content": "Отправьте текст сообщения и/или фотографию:",
+        "broadcast_queued": "Рассылка «{title}» поставлена в очередь.",
+        "broadcast_progress": "Рассылка «{title}»: {processed} из {total} ({percent}%). Осталось примерно {eta}.",
+        "broadcast_done": "Рассылка «{title}» завершена за {elapsed}.\n{summary}",
+        "broadcast_interrupted": "Рассылка «{title}» прервана остановкой бота: обработано {processed} из {total}.\n{summary}",
+        "eta_unknown": "неизвестно",
+        "report_summary": "Сообщение успешно отправлено {sent} пользователям. Ошибок при отправке: {failed}.",
+        "report_failure": "• {label}: {count}",
+        "report_deactivated": "Отключено недоступных подписчиков: {count}.",
+        "failure_blocked": "заблокировали бота",
+        "failure_chat_not_found": "чат не найден",
+        "failure_deactivated": "аккаунт удален",
+        "failure_transient": "временные ошибки",
+        "failure_other": "прочие ошибки",
+        # Управление заявками
+        "tickets_menu": "Управление заявками:",
+        "btn_unresolved_tickets": "Просмотр нерешенных заявок",
+        "btn_resolved_tickets": "Просмотр решенных заявок",
+        "btn_search_tickets": "Поиск заявок",
+        "tickets_search_prompt": (
+            "Отправьте слова для поиска по проблеме, описанию и ответу заявок.\n"
+            "Слова ищутся целиком; звездочка в конце ищет по началу слова: оплат*\n"
+            "Заявку по номеру, в том числе из архива, найдет запрос вида #123"
+        ),
+        "tickets_search_results": (
+            "<b>Поиск «{query}», страница {page}:</b>\n\n{tickets}"
+            "Отправьте новый запрос или вернитесь назад."
+        ),
+        "ticket_search_item": "№{ticket_id} [{status}] {username}: {problem}\n{snippet}\n\n",
+        "tickets_search_empty": "По запросу «{query}» ничего не найдено. Отправьте новый запрос или вернитесь назад.",
+        "tickets_search_expired": "Поиск устарел, отправьте запрос заново.",
+        "btn_prev_page": "◀ Предыдущая",
+        "btn_next_page": "Следующая ▶",
+        "unknown_user": "Не указан",
+        "admin_ticket_open": (
+            "Заявка №{ticket_id} от пользователя {username}\n"
+            "Статус: {status}, ждет {age}\n"
+            "Проблема: {problem}\n"
+            "Описание: {description}\n{duplicates}----\n"
+        ),
+        "admin_ticket_resolved": (
+            "Заявка №{ticket_id} от пользователя {username}\n"
+            "Проблема: {problem}\n"
+            "Описание: {description}\n"
+            "Статус: {status}\n"
+            "Ответ: {response}\n{duplicates}----\n"
+        ),
+        "unresolved_tickets": "Нерешенные заявки: {total}, самые старые первыми (показано {shown}):\n\n{tickets}",
+        "no_unresolved_tickets": "Нерешенных заявок не найдено.",
+        "resolved_tickets": "Решенные заявки:\n\n{tickets}",
+        "no_resolved_tickets": "Решенные заявки отсутствуют.",
+        "btn_select_resolved": "Решено (выбрать заявку)",
+        "btn_select_in_progress": "В процессе (выбрать заявку)",
+        "btn_ticket": "Заявка {ticket_id}: {problem}",
+        "select_resolved_ticket": "Выберите заявку для установки статуса 'Решено':",
+        "select_in_progress_ticket": "Выберите заявку для установки статуса 'В процессе':",
+        "no_tickets_to_select": "Нет заявок для выбора.",
+        "status_set_in_progress": "Статус изменён на 'В процессе'.",
+        "enter_resolution": "Пожалуйста, напишите ответ для этой закрытой заявки:",
+        "ticket_resolved": "Заявка отмечена как решенная с вашим ответом.",
+        "choose_action": "Выберите действие:",
+        # Массовая смена статуса
+        "btn_bulk_tickets": "Выбрать несколько заявок",
+        "bulk_tickets": "Отметьте заявки для смены статуса (выбрано: {selected}, страница {page}):",
+        "bulk_checked": "✅ ",
+        "bulk_unchecked": "⬜ ",
+        "btn_bulk_select_all": "Выбрать все",
+        "btn_bulk_clear": "Снять выбор",
+        "btn_bulk_in_progress": "В процессе",
+        "btn_bulk_resolved": "Решено",
+        "bulk_nothing_selected": "Сначала выберите заявки.",
+        "bulk_enter_resolution": "Напишите ответ, который получат авторы {count} выбранных заявок и их дубликатов:",
+        "bulk_status_applied": "Статус '{status}' установлен для {changed} из {selected} выбранных заявок (с дубликатами: {total}). Заявки, уже имевшие этот статус, не изменены.",
+        "bulk_notifying": "{applied}\n\nОтправка уведомлений пользователям...",
+        "bulk_done": "{applied}\n\n{summary}",
+        # Переписка по заявкам
+        "btn_ticket_threads": "Переписка по заявке",
+        "select_thread_ticket": "Выберите заявку, чтобы открыть переписку:",
+        "thread": "Заявка №{ticket_id}: {problem}\nСтатус: {status}\nСообщения {first}–{last} из {total}:\n\n{messages}",
+        "thread_empty": "Заявка №{ticket_id}: {problem}\nСтатус: {status}\n\nСообщений пока нет.",
+        "thread_message": "[{time}] {author}:\n{text}\n\n",
+        "thread_author_user": "Пользователь",
+        "thread_author_admin": "Поддержка",
+        "btn_thread_reply": "Написать сообщение",
+        "btn_open_thread": "Открыть переписку",
+        "thread_reply_prompt": "Напишите сообщение по заявке №{ticket_id}:",
+        "thread_reply_sent": "Сообщение добавлено в переписку по заявке №{ticket_id}.",
+        "thread_closed": "Заявка решена, новые сообщения в нее не добавляются.",
+        "thread_not_found": "Заявка не найдена.",
+        "thread_new_message": "Новое сообщение поддержки по заявке №{ticket_id} ({problem}):\n{text}",
+        "admin_thread_message": "Новое сообщение по заявке №{ticket_id} от {username}:\n{text}",
+        # Дополнительно
+        "additional_menu": "Дополнительные функции:",
+        "btn_statistics": "Статистика",
+        "btn_view_logs": "Просмотр логов",
+        "btn_search_logs": "Поиск по логам",
+        "btn_db_actions": "Управление БД",
+        "statistics": (
+            "Время работы бота: {uptime}\n"
+            "Версия бота: {version}\n\n"
+            "Всего подписчиков: {total_subscribers}\n"
+            "Подписчики по темам:\n{subscription_details}\n"
+            "Отключено (недоступны): {deactivated_subscribers}\n\n"
+            "Всего заявок: {total_tickets}\n"
+            "Решенных заявок: {resolved_tickets} (в архиве: {archived_tickets})\n"
+            "Нерешенных заявок: {unresolved_tickets}\n"
+            "Самая старая открытая заявка ждет: {oldest_open}\n"
+            "Время решения (p50 / p90 / p99): {resolution_time}\n\n"
+            "Последний бэкап заявок: {tickets_backup}\n"
+            "Последний бэкап подписчиков: {subscribers_backup}"
+        ),
+        "uptime": "{days} дней - {hours:02}:{minutes:02}:{seconds:02}",
+        "age_days": "{days} д {hours} ч",
+        "age_hours": "{hours} ч {minutes} мин",
+        "sla_percentiles": "{p50} / {p90} / {p99} (заявок: {count})",
+        "sla_no_data": "нет данных",
+        "backup_not_found": "Не найдено",
+        "logs_tail": "<b>Последние {count} строк логов:</b>\n<pre>{logs}</pre>",
+        "logs_empty": "Лог файл пуст.",
+        "logs_failed": "Не удалось прочитать файл логов: {error}",
+        "logs_denied": "У вас нет доступа к этой функции.",
+        "logs_search_prompt": (
+            "Отправьте запрос для поиска по логам. Фильтры:\n"
+            "user:123 — пользователь, ticket:45 — заявка,\n"
+            "level:warning — уровень не ниже указанного,\n"
+            "since:2h / since:2026-10-01, until:... — период (m, h, d или дата).\n"
+            "Остальные слова ищутся в тексте сообщений."
+        ),
+        "logs_search_results": "<b>Найдено записей: {count} ({ms} мс)</b>\n<pre>{logs}</pre>\nОтправьте новый запрос или вернитесь назад.",
+        "logs_search_empty": "Ничего не найдено ({ms} мс). Отправьте новый запрос или вернитесь назад.",
+        "logs_search_invalid": "Неверный запрос: {error}",
+        "logs_search_disabled": "Индекс логов отключен (LOG_INDEX_RETENTION_DAYS=0).",
+        # Управление БД
+        "db_menu": "Управление БД (сброс и бэкап):",
+        "btn_reset_database": "Сброс базы данных",
+        "btn_create_backup": "Создать бэкап баз данных",
+        "backup_confirm": "Вы уверены, что хотите создать резервную копию?",
+        "backup_created": "Резервные копии успешно созданы в папке: {folder}",
+        "backup_failed": "Произошла ошибка при создании резервной копии: {error}",
+        "reset_select": "Выберите базу данных для сброса:",
+        "btn_reset_tickets": "Заявки",
+        "btn_reset_subscribers": "Подписчики",
+        "tickets_reset": "База данных заявок сброшена.",
+        "subscribers_reset": "База данных подписчиков сброшена.",
+        "unknown_database": "Неизвестная база данных.",
+    },
+    "en": {
+        # Main menu
+        "btn_subscribe": "Subscribe",
+        "btn_support": "Support",
+        "btn_about": "About Bot",
+        "btn_admin": "Administration",
+        "btn_back": "Back",
+        "btn_yes": "Yes",
+        "btn_no": "No",
+        "welcome": "Welcome to the bot! Choose an option:",
+        "about": (
+            "This bot sends notifications about new and fixed content on https://docs.basted.ru/.\n\n"
+            "Bot version: {version}"
+        ),
+        # Subscriptions
+        "subscription_menu": "Manage your subscriptions:\n\nCurrent subscription: {current}",
+        "subscription_all": "All notifications",
+        "subscription_updates": "Content updates",
+        "subscription_none": "No subscription",
+        "subscription_unknown": "Unknown subscription",
+        "btn_subscribe_all": "Subscribe to all notifications",
+        "btn_subscribe_updates": "Subscribe to content updates only",
+        "btn_unsubscribe": "Unsubscribe",
+        "subscribed_all": "Subscribed to all notifications.",
+        "subscribed_updates": "Subscribed to content updates only.",
+        "unsubscribed": "Unsubscribed from all notifications.",
+        "topic_updates": "Updates",
+        "topic_fixes": "Fixes",
+        # Support
+        "support_menu": "How can we help you?",
+        "btn_send_ticket": "Send Ticket",
+        "btn_view_tickets": "View Sent Tickets",
+        "ticket_enter_problem": "Please describe the problem (brief title):",
+        "ticket_enter_description": "Please provide a detailed description of the issue:",
+        "ticket_submitted": "Your ticket has been submitted.",
+        "user_ticket": "Problem: {problem}\nDescription: {description}\nStatus: {status}",
+        "user_ticket_response": "\nResponse: {response}",
+        "user_tickets": "Your Tickets:\n\n{tickets}",
+        "user_no_tickets": "You have no submitted tickets.",
+        "ticket_status_changed": "Your ticket (ID: {ticket_id}, Problem: {problem}) has been updated to '{status}'.",
+        "ticket_admin_response": "\nResponse from admin: {response}",
+        "status_unresolved": "Unresolved",
+        "status_in_progress": "In Progress",
+        "status_resolved": "Resolved",
+        # Administration panel
+        "admin_panel": "Administration Panel:",
+        "admin_denied": "Unauthorized access.",
+        "action_denied": "Unauthorized action.",
+        "throttled": "Too many requests. Try again in {seconds} s.",
+        "btn_admin_broadcast": "Send Message",
+        "btn_admin_tickets": "Manage Tickets",
+        "btn_admin_additional": "Additional",
+        "admin_new_ticket": "New ticket submitted:\nProblem: {problem}\nDescription: {description}\nTicket ID: {ticket_id}",
+        "admin_duplicate_tickets": (
+            "Similar tickets to ticket #{ticket_id} ({problem}): {count}.\n"
+            "They are hidden from the lists and will get the same status and response."
+        ),
+        "ticket_duplicates": "Similar tickets: {count}\n",
+        "admin_urgent_ticket": "URGENT ticket:\nProblem: {problem}\nDescription: {description}\nTicket ID: {ticket_id}",
+        "admin_notifications_summary": "Ticket summary, notifications: {count}",
+        # Broadcasts
+        "broadcast_select": "Choose who will receive the message:",
+        "btn_broadcast_updates": "Update (all)",
+        "btn_broadcast_fixes": "Fixes",
+        "broadcast_enter_content": "Send the message text and/or a photo:",
+        "broadcast_queued": "Broadcast “{title}” has been queued.",
+        "broadcast_progress": "Broadcast “{title}”: {processed} of {total} ({percent}%). About {eta} left.",
+        "broadcast_done": "Broadcast “{title}” finished in {elapsed}.\n{summary}",
+        "broadcast_interrupted": "Broadcast “{title}” was interrupted by a bot shutdown: {processed} of {total} processed.\n{summary}",
+        "eta_unknown": "unknown",
+        "report_summary": "Message delivered to {sent} users. Delivery errors: {failed}.",
+        "report_failure": "• {label}: {count}",
+        "report_deactivated": "Unreachable subscribers deactivated: {count}.",
+        "failure_blocked": "blocked the bot",
+        "failure_chat_not_found": "chat not found",
+        "failure_deactivated": "account deleted",
+        "failure_transient": "transient errors",
+        "failure_other": "other errors",
+        # Ticket management
+        "tickets_menu": "Ticket management:",
+        "btn_unresolved_tickets": "View Unresolved Tickets",
+        "btn_resolved_tickets": "View Resolved Tickets",
+        "btn_search_tickets": "Search Tickets",
+        "tickets_search_prompt": (
+            "Send words to search in ticket problems, descriptions and responses.\n"
+            "Whole words are matched; a trailing asterisk matches a word prefix: pay*\n"
+            "Send #123 to look up a ticket by ID, including archived tickets"
+        ),
+        "tickets_search_results": (
+            "<b>Search “{query}”, page {page}:</b>\n\n{tickets}"
+            "Send another query or go back."
+        ),
+        "ticket_search_item": "#{ticket_id} [{status}] {username}: {problem}\n{snippet}\n\n",
+        "tickets_search_empty": "Nothing found for “{query}”. Send another query or go back.",
+        "tickets_search_expired": "This search has expired, please send the query again.",
+        "btn_prev_page": "◀ Previous",
+        "btn_next_page": "Next ▶",
+        "unknown_user": "Not specified",
+        "admin_ticket_open": (
+            "Ticket #{ticket_id} from {username}\n"
+            "Status: {status}, waiting {age}\n"
+            "Problem: {problem}\n"
+            "Description: {description}\n{duplicates}----\n"
+        ),
+        "admin_ticket_resolved": (
+            "Ticket #{ticket_id} from {username}\n"
+            "Problem: {problem}\n"
+            "Description: {description}\n"
+            "Status: {status}\n"
+            "Response: {response}\n{duplicates}----\n"
+        ),
+        "unresolved_tickets": "Unresolved Tickets: {total}, oldest first (showing {shown}):\n\n{tickets}",
+        "no_unresolved_tickets": "No unresolved tickets found.",
+        "resolved_tickets": "Resolved Tickets:\n\n{tickets}",
+        "no_resolved_tickets": "No resolved tickets found.",
+        "btn_select_resolved": "Resolved (select ticket)",
+        "btn_select_in_progress": "In Progress (select ticket)",
+        "btn_ticket": "Ticket {ticket_id}: {problem}",
+        "select_resolved_ticket": "Select a ticket to mark as 'Resolved':",
+        "select_in_progress_ticket": "Select a ticket to mark as 'In Progress':",
+        "no_tickets_to_select": "No tickets to select.",
+        "status_set_in_progress": "Status updated to 'In Progress'.",
+        "enter_resolution": "Please write a response for this resolved ticket:",
+        "ticket_resolved": "The ticket has been marked as resolved with your response.",
+        "choose_action": "Choose an action:",
+        # Bulk status changes
+        "btn_bulk_tickets": "Select Multiple Tickets",
+        "bulk_tickets": "Select tickets to update (selected: {selected}, page {page}):",
+        "bulk_checked": "✅ ",
+        "bulk_unchecked": "⬜ ",
+        "btn_bulk_select_all": "Select All",
+        "btn_bulk_clear": "Clear Selection",
+        "btn_bulk_in_progress": "In Progress",
+        "btn_bulk_resolved": "Resolved",
+        "bulk_nothing_selected": "Select some tickets first.",
+        "bulk_enter_resolution": "Write the response that the authors of {count} selected tickets and their duplicates will receive:",
+        "bulk_status_applied": "Status '{status}' set for {changed} of {selected} selected tickets ({total} including duplicates). Tickets that already had this status were left unchanged.",
+        "bulk_notifying": "{applied}\n\nNotifying users...",
+        "bulk_done": "{applied}\n\n{summary}",
+        # Ticket threads
+        "btn_ticket_threads": "Ticket Conversation",
+        "select_thread_ticket": "Select a ticket to open its conversation:",
+        "thread": "Ticket #{ticket_id}: {problem}\nStatus: {status}\nMessages {first}–{last} of {total}:\n\n{messages}",
+        "thread_empty": "Ticket #{ticket_id}: {problem}\nStatus: {status}\n\nNo messages yet.",
+        "thread_message": "[{time}] {author}:\n{text}\n\n",
+        "thread_author_user": "User",
+        "thread_author_admin": "Support",
+        "btn_thread_reply": "Write a Message",
+        "btn_open_thread": "Open Conversation",
+        "thread_reply_prompt": "Write a message for ticket #{ticket_id}:",
+        "thread_reply_sent": "Message added to the conversation of ticket #{ticket_id}.",
+        "thread_closed": "The ticket is resolved, no new messages can be added.",
+        "thread_not_found": "Ticket not found.",
+        "thread_new_message": "New message from support on ticket #{ticket_id} ({problem}):\n{text}",
+        "admin_thread_message": "New message on ticket #{ticket_id} from {username}:\n{text}",
+        # Additional
+        "additional_menu": "Additional functions:",
+        "btn_statistics": "Statistics",
+        "btn_view_logs": "View Logs",
+        "btn_search_logs": "Search Logs",
+        "btn_db_actions": "Manage DB",
+        "statistics": (
+            "Bot Uptime: {uptime}\n"
+            "Bot Version: {version}\n\n"
+            "Total Subscribers: {total_subscribers}\n"
+            "Subscribers by Topic:\n{subscription_details}\n"
+            "Deactivated (unreachable): {deactivated_subscribers}\n\n"
+            "Total Tickets: {total_tickets}\n"
+            "Resolved Tickets: {resolved_tickets} ({archived_tickets} archived)\n"
+            "Unresolved Tickets: {unresolved_tickets}\n"
+            "Oldest Open Ticket Waiting: {oldest_open}\n"
+            "Resolution Time (p50 / p90 / p99): {resolution_time}\n\n"
+            "Last Tickets Backup: {tickets_backup}\n"
+            "Last Subscribers Backup: {subscribers_backup}"
+        ),
+        "uptime": "{days} days - {hours:02}:{minutes:02}:{seconds:02}",
+        "age_days": "{days}d {hours}h",
+        "age_hours": "{hours}h {minutes}m",
+        "sla_percentiles": "{p50} / {p90} / {p99} ({count} tickets)",
+        "sla_no_data": "no data",
+        "backup_not_found": "Not found",
+        "logs_tail": "<b>Last {count} log lines:</b>\n<pre>{logs}</pre>",
+        "logs_empty": "Log file is empty.",
+        "logs_failed": "Failed to read the log file: {error}",
+        "logs_denied": "You do not have access to this function.",
+        "logs_search_prompt": (
+            "Send a query to search the logs. Filters:\n"
+            "user:123 — user, ticket:45 — ticket,\n"
+            "level:warning — this level and above,\n"
+            "since:2h / since:2026-10-01, until:... — time range (m, h, d or a date).\n"
+            "Other words are searched in the message text."
+        ),
+        "logs_search_results": "<b>Records found: {count} ({ms} ms)</b>\n<pre>{logs}</pre>\nSend another query or go back.",
+        "logs_search_empty": "Nothing found ({ms} ms). Send another query or go back.",
+        "logs_search_invalid": "Invalid query: {error}",
+        "logs_search_disabled": "The log index is disabled (LOG_INDEX_RETENTION_DAYS=0).",
+        # Database management
+        "db_menu": "Database management (reset and backup):",
+        "btn_reset_database": "Reset Database",
+        "btn_create_backup": "Create Database Backup",
+        "backup_confirm": "Are you sure you want to create a backup?",
+        "backup_created": "Backups created in folder: {folder}",
+        "backup_failed": "An error occurred while creating the backup: {error}",
+        "reset_select": "Select the database to reset:",
+        "btn_reset_tickets": "Tickets",
+        "btn_reset_subscribers": "Subscribers",
+        "tickets_reset": "Tickets database has been reset.",
+        "subscribers_reset": "Subscribers database has been reset.",
+        "unknown_database": "Unknown database.",
+    },
+}
+
+# Ключи подписей статусов заявок (в базе статус хранится по-английски)
+_STATUS_KEYS = {
+    "Unresolved": "status_unresolved",
+    "In Progress": "status_in_progress",
+    "Resolved": "status_resolved",
+}
+
+
+# Поля подстановки шаблона
+def _fields(template: str) -> frozenset:
+    return frozenset(
+        field.split(".")[0].split("[")[0]
+        for _, field, _, _ in Formatter().parse(template)
+        if field is not None
+    )
+
+
+# Набор текстов одного языка
+class Locale:
+    """
+    Тексты без подстановок хранятся строками, шаблоны с полями — связанными
+    методами str.format, поэтому обработчик получает готовый текст одним
+    обращением к атрибуту: tr.welcome или tr.subscription_menu(current=...).
+    """
+
+    def __init__(self, code: str, templates: dict):
+        self.code = code
+        for key, template in templates.items():
+            setattr(self, key, template.format if _fields(template) else template)
+
+    # Подпись статуса заявки
+    def status(self, status: str) -> str:
+        key = _STATUS_KEYS.get(status)
+        return getattr(self, key) if key else status
+
+
+# Проверяет, что во всех языках одинаковые ключи и поля подстановки
+def _validate_catalog():
+    reference_code = "ru"
+    reference = _CATALOG[reference_code]
+    for code, templates in _CATALOG.items():
+        if templates.keys() != reference.keys():
+            missing = reference.keys() - templates.keys()
+            extra = templates.keys() - reference.keys()
+            raise ValueError(
+                f"Тексты языка '{code}' не совпадают с '{reference_code}': "
+                f"нет {sorted(missing)}, лишние {sorted(extra)}"
+            )
+        for key, template in templates.items():
+            if _fields(template) != _fields(reference[key]):
+                raise ValueError(f"Поля шаблона '{key}' в языке '{code}' отличаются от '{reference_code}'")
+
+
+_validate_catalog()
+LOCALES = {code: Locale(code, templates) for code, templates in _CATALOG.items()}
+for _code in (DEFAULT_LOCALE, ADMIN_LOCALE_CODE):
+    if _code not in LOCALES:
+        raise ValueError(f"Неизвестный язык: {_code}")
+
+
+# Возвращает набор текстов по коду языка (например, из базы)
+def get_locale_by_code(code) -> Locale:
+    return LOCALES.get(code) or LOCALES[DEFAULT_LOCALE]
+
+
+ADMIN_LOCALE = get_locale_by_code(ADMIN_LOCALE_CODE)
+
+
+# Возвращает набор текстов для пользователя Telegram по его language_code
+def get_locale(user) -> Locale:
+    language_code = getattr(user, "language_code", None) or ""
+    return get_locale_by_code(language_code.split("-")[0].lower())
+
+
+# Все варианты текста кнопки на всех языках (для фильтров обработчиков)
+def button_texts(key: str) -> frozenset:
+    return frozenset(getattr(locale, key) for locale in LOCALES.values())
@@ -0,0 +1,201 @@
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from loguru import logger
+
+from db import fts_prefix_query, get_db_connection
+
+# Номера пользователей и заявок в тексте сообщений, если они не переданы через
+# logger.bind(user_id=..., ticket_id=...): 'Пользователь 123 ...',
+# 'администратором 1', 'для заявки 45', 'заявку с ID 45', 'заявке (ID: 45)'
+USER_ID_PATTERN = re.compile(r"(?:пользовател|администратор)\w*\s+(\d+)", re.IGNORECASE)
+TICKET_ID_PATTERN = re.compile(r"заявк\w*\W+(?:с\s+)?(?:ID:?\s*)?(\d+)", re.IGNORECASE)
+
+# Единицы относительного времени в запросе: since:30m, since:2h, since:7d
+TIME_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+LOG_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_records (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    level TEXT NOT NULL,
+    levelno INTEGER NOT NULL,
+    user_id INTEGER,
+    ticket_id INTEGER,
+    location TEXT,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_log_records_ts ON log_records(ts);
+CREATE INDEX IF NOT EXISTS idx_log_records_user ON log_records(user_id, id) WHERE user_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_log_records_ticket ON log_records(ticket_id, id) WHERE ticket_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_log_records_level ON log_records(levelno, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+    message, content='log_records', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS log_records_ai AFTER INSERT ON log_records BEGIN
+    INSERT INTO log_fts(rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS log_records_ad AFTER DELETE ON log_records BEGIN
+    INSERT INTO log_fts(log_fts, rowid, message) VALUES ('delete', old.id, old.message);
+END;
+"""
+
+
+# Первое число, найденное шаблоном, или None
+def _first_id(pattern: re.Pattern, text: str):
+    match = pattern.search(text)
+    return int(match.group(1)) if match else None
+
+
+# Разбирает время из запроса: относительное (30m, 2h, 7d) или дату 'YYYY-MM-DD[THH:MM]'
+def parse_time(value: str, now: float = None) -> float:
+    if value[:-1].isdigit() and value[-1] in TIME_UNITS:
+        return (now if now is not None else time.time()) - int(value[:-1]) * TIME_UNITS[value[-1]]
+    return datetime.fromisoformat(value).timestamp()
+
+
+# Поисковый запрос администратора
+class LogQuery:
+    """
+    Строка запроса состоит из фильтров и слов для полнотекстового поиска:
+    'user:123 ticket:45 level:warning since:2h until:2026-10-18 ошибка'.
+    level — минимальный уровень (warning находит также ошибки); каждое
+    слово ищется как префикс ('заявк' находит 'заявку' и 'заявки').
+    Неверный фильтр вызывает ValueError.
+    """
+
+    __slots__ = ("words", "user_id", "ticket_id", "min_level", "since", "until")
+
+    def __init__(self, words=(), user_id=None, ticket_id=None, min_level=None, since=None, until=None):
+        self.words = list(words)
+        self.user_id = user_id
+        self.ticket_id = ticket_id
+        self.min_level = min_level
+        self.since = since
+        self.until = until
+
+    @classmethod
+    def parse(cls, text: str, now: float = None) -> "LogQuery":
+        query = cls()
+        for token in text.split():
+            key, _, value = token.partition(":")
+            key = key.lower()
+            if not value or key not in ("user", "ticket", "level", "since", "until"):
+                query.words.append(token)
+            elif key == "user":
+                query.user_id = int(value)
+            elif key == "ticket":
+                query.ticket_id = int(value.lstrip("#"))
+            elif key == "level":
+                query.min_level = logger.level(value.upper()).no
+            elif key == "since":
+                query.since = parse_time(value, now)
+            else:
+                query.until = parse_time(value, now)
+        return query
+
+    # Выражение FTS5: слова в кавычках как префиксы, все обязательны
+    def match_expression(self) -> str:
+        return fts_prefix_query(self.words)
+
+
+# Индекс логов в SQLite FTS5 с ограниченным сроком хранения
+class LogIndex:
+    """
+    write — приемник для LogPipeline: записи добавляются из фонового потока
+    логов через отдельное синхронное соединение sqlite3, цикл событий не
+    ждет индексации. Номера пользователя и заявки берутся из extra или из
+    текста сообщения, текст индексируется FTS5. Записи старше retention_days
+    удаляются при открытии и через каждые purge_every добавленных записей.
+    search выполняется в цикле событий через общий пул aiosqlite (db.py):
+    в режиме WAL чтение не ждет записи.
+    """
+
+    def __init__(self, path: str, retention_days: float = 30, purge_every: int = 1000):
+        self.path = path
+        self.retention = retention_days * 86400
+        self.purge_every = purge_every
+        self._connection = None
+        self._written = 0
+
+    # Создает базу и удаляет устаревшие записи. Вызывается до запуска LogPipeline.
+    def open(self):
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(LOG_INDEX_SCHEMA)
+        self.purge()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    # Удаляет записи старше срока хранения
+    def purge(self):
+        with self._connection:
+            self._connection.execute("DELETE FROM log_records WHERE ts < ?", (time.time() - self.retention,))
+
+    def write(self, message):
+        record = message.record
+        text = record["message"]
+        extra = record["extra"]
+        user_id = extra.get("user_id")
+        if user_id is None:
+            user_id = _first_id(USER_ID_PATTERN, text)
+        ticket_id = extra.get("ticket_id")
+        if ticket_id is None:
+            ticket_id = _first_id(TICKET_ID_PATTERN, text)
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO log_records (ts, level, levelno, user_id, ticket_id, location, message) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record["time"].timestamp(),
+                    record["level"].name,
+                    record["level"].no,
+                    user_id,
+                    ticket_id,
+                    f"{record['module']}:{record['function']}:{record['line']}",
+                    text,
+                ),
+            )
+        self._written += 1
+        if self._written % self.purge_every == 0:
+            self.purge()
+
+    # Последние записи, подходящие под запрос: (ts, level, location, message), новые первыми
+    async def search(self, query: LogQuery, limit: int = 20) -> list:
+        conditions, params = [], []
+        # С текстом записи перебираются из FTS5 от новых к старым до набора limit
+        source, order = "log_records", "log_records.id"
+        match = query.match_expression()
+        if match:
+            source, order = "log_fts JOIN log_records ON log_records.id = log_fts.rowid", "log_fts.rowid"
+            conditions.append("log_fts MATCH ?")
+            params.append(match)
+        if query.user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(query.user_id)
+        if query.ticket_id is not None:
+            conditions.append("ticket_id = ?")
+            params.append(query.ticket_id)
+        if query.min_level is not None:
+            conditions.append("levelno >= ?")
+            params.append(query.min_level)
+        if query.since is not None:
+            conditions.append("ts >= ?")
+            params.append(query.since)
+        if query.until is not None:
+            conditions.append("ts < ?")
+            params.append(query.until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        db = await get_db_connection(self.path)
+        async with db.execute(
+            f"SELECT ts, level, location, log_records.message FROM {source} {where} "
+            f"ORDER BY {order} DESC LIMIT ?",
+            (*params, limit),
+        ) as cursor:
+            return await cursor.fetchall()
@@ -0,0 +1,84 @@
+import copy
+import queue
+import threading
+
+from loguru import logger
+
+
+# Фоновая запись логов: обработчики только ставят записи в очередь
+class LogPipeline:
+    """
+    Приемники (файлы, консоль) добавляются через add() к отдельной копии
+    логгера loguru, а к основному logger подключается один легкий приемник,
+    который кладет запись в очередь. Фоновый поток забирает записи и
+    передает их приемникам: форматирование, JSON, трассировки и запись на
+    диск выполняются вне цикла событий. В отличие от enqueue=True в loguru,
+    записи не сериализуются через pickle для каждого приемника отдельно.
+    Значения переменных в трассировках (diagnose) читаются в момент записи,
+    а не в момент ошибки, поэтому могут отличаться от исходных.
+    Создается после logger.remove(): копируется логгер без приемников.
+    """
+
+    def __init__(self):
+        self.writer = copy.deepcopy(logger)
+        self.writer.remove()
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._handler_id = None
+
+    # Добавляет приемник; параметры те же, что у logger.add
+    def add(self, sink, **kwargs) -> int:
+        return self.writer.add(sink, **kwargs)
+
+    # Подключает очередь к основному логгеру и запускает фоновый поток.
+    # level — наименьший уровень среди приемников: остальное не ставится в очередь.
+    def start(self, level="DEBUG"):
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        self._handler_id = logger.add(self._put, level=level, format="{message}", catch=False)
+
+    # Отключает очередь и ждет записи оставшихся сообщений
+    def stop(self):
+        if self._thread is None:
+            return
+        logger.remove(self._handler_id)
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _put(self, message):
+        self._queue.put(message.record)
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            # Время, место вызова, extra и исключение берутся из исходной записи
+            self.writer.patch(lambda new, record=record: new.update(record)).log(
+                record["level"].name, record["message"]
+            )
+
+
+# Логгер для частых сообщений обработчиков (навигация по меню и т.п.)
+class SampledLogger:
+    """
+    Записывается одно из every сообщений, остальные отбрасываются до
+    форматирования и записи в файлы. Каждая запись помечается полем
+    extra["sampled"] = every, чтобы при анализе логов (например, в JSON)
+    можно было восстановить исходное число событий. Действия, меняющие
+    данные, и все предупреждения должны логироваться обычным logger.
+    """
+
+    __slots__ = ("every", "_counter")
+
+    def __init__(self, every: int = 1):
+        self.every = max(1, every)
+        self._counter = 0
+
+    def info(self, message: str):
+        self._counter += 1
+        if self._counter >= self.every:
+            self._counter = 0
+            # depth=1: в записи указываются функция и строка вызывающего обработчика
+            logger.opt(depth=1).bind(sampled=self.every).info(message)
@@ -0,0 +1,135 @@
+from aiogram.types import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    KeyboardButton,
+    ReplyKeyboardMarkup,
+)
+
+from callbacks import pack_callback
+from locales import LOCALES, Locale
+
+# Статические меню: строки кнопок (ключ текста, callback_data)
+MENU_LAYOUTS = {
+    "subscription": [
+        [("btn_subscribe_all", "subscribe_all")],
+        [("btn_subscribe_updates", "subscribe_updates")],
+        [("btn_unsubscribe", "unsubscribe")],
+        [("btn_back", "back_main")],
+    ],
+    "support": [
+        [("btn_send_ticket", "send_ticket")],
+        [("btn_view_tickets", "view_tickets")],
+        [("btn_back", "back_main")],
+    ],
+    "admin": [
+        [("btn_admin_broadcast", "admin_broadcast")],
+        [("btn_admin_tickets", "admin_tickets")],
+        [("btn_admin_additional", "admin_additional")],
+        [("btn_back", "back_main")],
+    ],
+    "broadcast": [
+        [("btn_broadcast_updates", pack_callback("broadcast", "updates"))],
+        [("btn_broadcast_fixes", pack_callback("broadcast", "fixes"))],
+        [("btn_back", "admin_menu")],
+    ],
+    "tickets": [
+        [("btn_unresolved_tickets", "view_unresolved_tickets")],
+        [("btn_resolved_tickets", "view_resolved_tickets")],
+        [("btn_search_tickets", "search_tickets")],
+        [("btn_back", "admin_menu")],
+    ],
+    "unresolved_tickets": [
+        [("btn_select_resolved", "select_resolved_ticket")],
+        [("btn_select_in_progress", "select_in_progress_ticket")],
+        [("btn_bulk_tickets", "bulk_tickets")],
+        [("btn_ticket_threads", "select_thread_ticket")],
+        [("btn_back", "admin_tickets")],
+    ],
+    "additional": [
+        [("btn_statistics", "view_statistics")],
+        [("btn_view_logs", "view_logs")],
+        [("btn_search_logs", "search_logs")],
+        [("btn_db_actions", "db_actions")],
+        [("btn_back", "admin_menu")],
+    ],
+    "db": [
+        [("btn_reset_database", "reset_database")],
+        [("btn_create_backup", "create_backup")],
+        [("btn_back", "admin_additional")],
+    ],
+    "backup_confirm": [
+        [("btn_yes", "confirm_create_backup")],
+        [("btn_no", "admin_additional")],
+    ],
+    "reset": [
+        [("btn_reset_tickets", pack_callback("reset", "tickets"))],
+        [("btn_reset_subscribers", pack_callback("reset", "subscribers"))],
+        [("btn_back", "admin_additional")],
+    ],
+}
+
+# Экраны, на которые ведет одиночная кнопка 'Назад'
+BACK_TARGETS = (
+    "support_menu",
+    "admin_broadcast",
+    "admin_tickets",
+    "admin_additional",
+    "view_unresolved_tickets",
+)
+
+# Кнопки главного меню; последняя строка видна только администратору
+MAIN_MENU_LAYOUT = ["btn_subscribe", "btn_support", "btn_about"]
+MAIN_MENU_ADMIN_BUTTON = "btn_admin"
+
+
+# Собирает клавиатуру по описанию меню для одного языка
+def build_inline_markup(tr: Locale, layout) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text=getattr(tr, key), callback_data=data) for key, data in row]
+            for row in layout
+        ]
+    )
+
+
+# Собирает главное меню (клавиатура под полем ввода)
+def build_main_menu(tr: Locale, is_admin: bool) -> ReplyKeyboardMarkup:
+    keys = MAIN_MENU_LAYOUT + [MAIN_MENU_ADMIN_BUTTON] if is_admin else MAIN_MENU_LAYOUT
+    return ReplyKeyboardMarkup(
+        keyboard=[[KeyboardButton(text=getattr(tr, key))] for key in keys],
+        resize_keyboard=True,
+    )
+
+
+# Готовые клавиатуры всех статических меню для всех языков.
+# Объекты общие для всех обработчиков, поэтому изменять их нельзя.
+_INLINE_MENUS = {
+    (code, name): build_inline_markup(tr, layout)
+    for code, tr in LOCALES.items()
+    for name, layout in MENU_LAYOUTS.items()
+}
+_BACK_MENUS = {
+    (code, target): build_inline_markup(tr, [[("btn_back", target)]])
+    for code, tr in LOCALES.items()
+    for target in BACK_TARGETS
+}
+_MAIN_MENUS = {
+    (code, is_admin): build_main_menu(tr, is_admin)
+    for code, tr in LOCALES.items()
+    for is_admin in (False, True)
+}
+
+
+# Возвращает готовую клавиатуру статического меню
+def get_menu(tr: Locale, name: str) -> InlineKeyboardMarkup:
+    return _INLINE_MENUS[tr.code, name]
+
+
+# Возвращает клавиатуру с единственной кнопкой 'Назад'
+def get_back_menu(tr: Locale, callback_data: str) -> InlineKeyboardMarkup:
+    return _BACK_MENUS[tr.code, callback_data]
+
+
+# Возвращает главное меню
+def get_main_menu(tr: Locale, is_admin: bool) -> ReplyKeyboardMarkup:
+    return _MAIN_MENUS[tr.code, is_admin]
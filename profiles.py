@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from loguru import logger
+
+from db import get_db_connection
+
+PROFILES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_profiles (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+# Кэш профилей пользователей (ников) с отложенной записью в базу
+class UserProfileCache:
+    """
+    Ник пользователя берется из каждого входящего обновления (middleware
+    track) и сравнивается с кэшем в памяти; изменившиеся ники копятся и
+    раз в flush_interval секунд записываются в таблицу user_profiles одной
+    транзакцией. Обработчики ник не записывают, а экраны администратора
+    читают его из кэша, поэтому после смены ника пользователем там сразу
+    видно новое имя. При запуске кэш загружается из базы целиком, при
+    первом запуске таблица заполняется последними никами из заявок. При
+    аварийной остановке теряются только ники, измененные после последней
+    записи: они снова придут со следующим обновлением пользователя.
+    """
+
+    def __init__(self, path: str = "tickets.db", flush_interval: float = 30):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._usernames = {}  # ID пользователя -> ник (None — ника нет)
+        self._dirty = {}  # ID пользователя -> ник, еще не записанный в базу
+
+    def __len__(self):
+        return len(self._usernames)
+
+    # Создает таблицу (при первом запуске заполняет ее из заявок) и загружает кэш
+    async def open(self):
+        db = await get_db_connection(self.path)
+        async with db.execute("SELECT 1 FROM sqlite_master WHERE name = 'user_profiles'") as cursor:
+            exists = await cursor.fetchone() is not None
+        await db.executescript(PROFILES_SCHEMA)
+        if not exists:
+            await db.execute(
+                "INSERT INTO user_profiles (user_id, username, updated_at) "
+                "SELECT user_id, username, ? FROM tickets WHERE id IN "
+                "(SELECT MAX(id) FROM tickets WHERE username IS NOT NULL GROUP BY user_id)",
+                (time.time(),),
+            )
+            logger.info("Создана таблица профилей user_profiles")
+        await db.commit()
+        async with db.execute("SELECT user_id, username FROM user_profiles") as cursor:
+            self._usernames = dict(await cursor.fetchall())
+        logger.info(f"Загружено профилей пользователей: {len(self._usernames)}")
+
+    # Ник пользователя из кэша или None
+    def username(self, user_id: int):
+        return self._usernames.get(user_id)
+
+    # Запоминает ник; в базу он попадет при следующей записи
+    def observe(self, user_id: int, username):
+        if user_id in self._usernames and self._usernames[user_id] == username:
+            return
+        self._usernames[user_id] = username
+        self._dirty[user_id] = username
+
+    # Внешний middleware диспетчера: отправитель любого обновления
+    # (event_from_user заполняет aiogram) попадает в кэш без обращения к базе
+    async def track(self, handler, event, data):
+        user = data.get("event_from_user")
+        if user is not None:
+            self.observe(user.id, user.username)
+        return await handler(event, data)
+
+    # Записывает изменившиеся ники одной транзакцией
+    async def flush(self) -> int:
+        dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+        db = await get_db_connection(self.path)
+        now = time.time()
+        try:
+            await db.executemany(
+                "INSERT INTO user_profiles (user_id, username, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET username = excluded.username, updated_at = excluded.updated_at",
+                [(user_id, username, now) for user_id, username in dirty.items()],
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # Незаписанные ники возвращаются в очередь, если их не успели изменить снова
+            self._dirty = {**dirty, **self._dirty}
+            raise
+        return len(dirty)
+
+    # Фоновая запись раз в flush_interval секунд
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.opt(exception=True).error("Ошибка при записи профилей пользователей")
@@ -0,0 +1,52 @@
+import argparse
+import os
+
+from loguru import logger
+
+from subscriber_store import SubscriberStore, shard_paths
+
+
+# Переносит подписчиков из текущей раскладки шардов в новую
+async def reshard_subscribers(source_shards: int, target_shards: int, batch_size: int = 5000):
+    source_paths = shard_paths("subscribers.db", source_shards)
+    target_paths = shard_paths("subscribers.db", target_shards)
+    if set(source_paths) & set(target_paths):
+        logger.error(
+            "Исходная и новая раскладка используют одни и те же файлы, перенос невозможен"
+        )
+        return
+    missing = [path for path in source_paths if not os.path.exists(path)]
+    if missing:
+        logger.error(f"Не найдены файлы шардов: {', '.join(missing)}")
+        return
+
+    # Исходное хранилище открывается через SubscriberStore, чтобы старые базы
+    # получили столбец topics до переноса
+    source = SubscriberStore("subscribers.db", source_shards)
+    target = SubscriberStore("subscribers.db", target_shards)
+    await source.open()
+    await target.open()
+    moved = 0
+    try:
+        async for rows in source.iter_records(batch_size):
+            await target.subscribe_many(rows)
+            moved += len(rows)
+        logger.info(
+            f"Перенесено {moved} подписчиков: {source_shards} шард(ов) -> {target_shards} шард(ов). "
+            f"Старые файлы ({', '.join(source_paths)}) можно удалить после проверки."
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при переносе подписчиков: {e}")
+    finally:
+        await source.close()
+        await target.close()
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Перераспределение подписчиков по шардам")
+    parser.add_argument("--from-shards", type=int, default=1, help="текущее число шардов")
+    parser.add_argument("--to-shards", type=int, required=True, help="новое число шардов")
+    args = parser.parse_args()
+    asyncio.run(reshard_subscribers(args.from_shards, args.to_shards))
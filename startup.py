@@ -0,0 +1,54 @@
+import time
+
+from loguru import logger
+
+
+# Замер этапов запуска бота и времени до первого обновления
+class StartupTimer:
+    """
+    mark(phase) фиксирует длительность этапа с предыдущей отметки. ready()
+    вызывается, когда диспетчер начинает получать обновления: время от
+    начала импорта до этого момента сравнивается с целевым target_ms.
+    first_update — внешний middleware диспетчера, который записывает время
+    до обработки первого обновления (после перезапуска это обновления,
+    накопившиеся за время простоя).
+    """
+
+    def __init__(self, target_ms: float, started: float = None):
+        self.target_ms = target_ms
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = []
+        self.first_update_ms = None
+        self._last = self.started
+
+    # Время с начала запуска в миллисекундах
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    # Отмечает завершение этапа запуска
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    # Текст отчета по этапам: 'импорт 410 мс, базы данных 35 мс'
+    def summary(self) -> str:
+        return ", ".join(f"{phase} {ms:.0f} мс" for phase, ms in self.phases)
+
+    # Отмечает готовность к приему обновлений и пишет отчет о запуске
+    async def ready(self):
+        self.mark("запуск polling")
+        ready_ms = self.elapsed_ms()
+        message = f"Бот готов к приему обновлений через {ready_ms:.0f} мс (цель {self.target_ms:.0f} мс). Этапы: {self.summary()}"
+        if ready_ms > self.target_ms:
+            logger.bind(tags="startup_shutdown").warning(message)
+        else:
+            logger.bind(tags="startup_shutdown").info(message)
+
+    async def first_update(self, handler, event, data):
+        if self.first_update_ms is None:
+            self.first_update_ms = self.elapsed_ms()
+            logger.bind(tags="startup_shutdown").info(
+                f"Первое обновление обработано через {self.first_update_ms:.0f} мс после запуска."
+            )
+        return await handler(event, data)
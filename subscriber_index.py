@@ -0,0 +1,82 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+# Компактный индекс подписчиков в памяти
+class SubscriberIndex:
+    """
+    Для каждой маски тем хранится отсортированный массив int64 chat_id
+    (8 байт на подписчика), поэтому выбор получателей сегмента и проверка
+    подписки пользователя не требуют запросов к SQLite.
+    Индекс заполняется один раз при старте и обновляется хранилищем
+    при каждой записи (write-through).
+    """
+
+    __slots__ = ("_buckets",)
+
+    def __init__(self):
+        self._buckets = {}  # Маска тем -> отсортированный array("q") chat_id
+
+    # Добавляет строки (chat_id, topics) без сортировки (при загрузке)
+    def extend(self, rows):
+        for chat_id, topics in rows:
+            self._buckets.setdefault(topics, array("q")).append(chat_id)
+
+    # Сортирует массивы после загрузки через extend()
+    def sort(self):
+        for topics, chat_ids in self._buckets.items():
+            self._buckets[topics] = array("q", sorted(chat_ids))
+
+    def clear(self):
+        self._buckets = {}
+
+    # Возвращает маску тем пользователя или None
+    def get(self, chat_id: int):
+        for topics, chat_ids in self._buckets.items():
+            position = bisect_left(chat_ids, chat_id)
+            if position < len(chat_ids) and chat_ids[position] == chat_id:
+                return topics
+        return None
+
+    # Добавляет подписчика (или меняет его темы)
+    def add(self, chat_id: int, topics: int):
+        self.remove(chat_id)
+        chat_ids = self._buckets.setdefault(topics, array("q"))
+        chat_ids.insert(bisect_left(chat_ids, chat_id), chat_id)
+
+    # Удаляет подписчика, возвращает его прежнюю маску тем
+    def remove(self, chat_id: int):
+        for topics, chat_ids in self._buckets.items():
+            position = bisect_left(chat_ids, chat_id)
+            if position < len(chat_ids) and chat_ids[position] == chat_id:
+                del chat_ids[position]
+                return topics
+        return None
+
+    def count(self) -> int:
+        return sum(len(chat_ids) for chat_ids in self._buckets.values())
+
+    def count_by_topics(self) -> dict:
+        return {topics: len(chat_ids) for topics, chat_ids in self._buckets.items() if chat_ids}
+
+    # Отдает chat_id подписчиков с указанными масками тем пачками
+    def iter_batches(self, masks, batch_size: int):
+        """
+        Внутри массива используется keyset-пагинация по последнему chat_id,
+        поэтому подписки и отписки во время рассылки не сдвигают позицию чтения.
+        """
+        for topics in masks:
+            chat_ids = self._buckets.get(topics)
+            if not chat_ids:
+                continue
+            position = 0
+            while position < len(chat_ids):
+                batch = chat_ids[position : position + batch_size]
+                yield batch
+                position = bisect_right(chat_ids, batch[-1])
+
+    # Приблизительный объем памяти, занимаемый массивами chat_id
+    def memory_bytes(self) -> int:
+        return sum(
+            chat_ids.buffer_info()[1] * chat_ids.itemsize for chat_ids in self._buckets.values()
+        )
@@ -0,0 +1,387 @@
+import asyncio
+import os
+from collections import OrderedDict
+
+import aiosqlite
+from loguru import logger
+
+from subscriber_index import SubscriberIndex
+from topics import SUBSCRIPTION_PRESETS, Segment
+
+
+# Возвращает список файлов шардов для базы подписчиков
+def shard_paths(path: str, shards: int) -> list:
+    """
+    При одном шарде используется исходный файл (subscribers.db),
+    иначе файлы вида subscribers_0.db, subscribers_1.db и т.д.
+    """
+    if shards < 1:
+        raise ValueError(f"Количество шардов должно быть положительным: {shards}")
+    if shards == 1:
+        return [path]
+    root, ext = os.path.splitext(path)
+    return [f"{root}_{index}{ext}" for index in range(shards)]
+
+
+# Хранилище подписчиков, разбитое на N шардов SQLite по хешу chat_id
+class SubscriberStore:
+    """
+    Все обращения к подписчикам идут через этот класс: он сам выбирает шард
+    для операций с конкретным пользователем и параллельно читает все шарды
+    при рассылке. Подписка хранится битовой маской тем (столбец topics),
+    получатели выбираются сегментом — булевым выражением над темами.
+    Если передан индекс в памяти, чтение подписок и выбор получателей
+    обслуживаются из него, а запись идет в SQLite и в индекс. Без индекса
+    подписки последних cache_size пользователей хранятся в кэше LRU
+    (включая отсутствие подписки). Если по индексу или кэшу подписка уже
+    такая, subscribe и unsubscribe пропускают запись и commit: повторные
+    нажатия не открывают транзакций.
+    """
+
+    # Сколько пачек может ждать отправителя в очереди
+    prefetch_batches = 4
+
+    def __init__(
+        self,
+        path: str = "subscribers.db",
+        shards: int = 1,
+        batch_size: int = 500,
+        index: SubscriberIndex = None,
+        cache_size: int = 10000,
+    ):
+        self.path = path
+        self.shards = shards
+        self.batch_size = batch_size  # Размер пачки chat_id при потоковом чтении
+        self.index = index
+        self.cache_size = cache_size
+        self.paths = shard_paths(path, shards)
+        self._connections = []
+        self._cache = OrderedDict()  # chat_id -> маска тем или None (не подписан)
+
+    # Открывает соединения со всеми шардами и создает таблицы
+    async def open(self):
+        self._connections = await asyncio.gather(
+            *(aiosqlite.connect(path) for path in self.paths)
+        )
+        await asyncio.gather(*(self._init_shard(db) for db in self._connections))
+        logger.info(
+            f"Хранилище подписчиков открыто: {self.shards} шард(ов) ({', '.join(self.paths)})"
+        )
+        if self.index is not None:
+            await self.load_index()
+
+    # Заполняет индекс в памяти содержимым всех шардов
+    async def load_index(self, page_size: int = 10000):
+        async def read_shard(db):
+            async with db.execute("SELECT chat_id, topics FROM subscribers") as cursor:
+                while rows := await cursor.fetchmany(page_size):
+                    self.index.extend(rows)
+
+        self.index.clear()
+        await asyncio.gather(*(read_shard(db) for db in self._connections))
+        self.index.sort()
+        logger.info(
+            f"Индекс подписчиков загружен: {self.index.count()} записей, "
+            f"{self.index.memory_bytes() / 1024 / 1024:.1f} МБ"
+        )
+
+    # Закрывает соединения со всеми шардами
+    async def close(self):
+        await asyncio.gather(*(db.close() for db in self._connections))
+        self._connections = []
+
+    @staticmethod
+    async def _init_shard(db: aiosqlite.Connection):
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA synchronous=NORMAL")
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS subscribers (
+                chat_id INTEGER PRIMARY KEY,
+                username TEXT,
+                subscription_type TEXT,
+                topics INTEGER NOT NULL DEFAULT 0,
+                deactivated_reason TEXT
+            );
+            """
+        )
+        # Базы, созданные до появления тем: переносим subscription_type в маску
+        async with db.execute("PRAGMA table_info(subscribers)") as cursor:
+            columns = [column[1] for column in await cursor.fetchall()]
+        if "topics" not in columns:
+            await db.execute(
+                "ALTER TABLE subscribers ADD COLUMN topics INTEGER NOT NULL DEFAULT 0"
+            )
+            await db.executemany(
+                "UPDATE subscribers SET topics = ? WHERE subscription_type = ?",
+                [(mask, name) for name, mask in SUBSCRIPTION_PRESETS.items()],
+            )
+            logger.info("Добавлен столбец topics в таблицу subscribers")
+        if "deactivated_reason" not in columns:
+            await db.execute("ALTER TABLE subscribers ADD COLUMN deactivated_reason TEXT")
+            logger.info("Добавлен столбец deactivated_reason в таблицу subscribers")
+        # Старые клиенты пишут только subscription_type — заполняем маску за них
+        for name, mask in SUBSCRIPTION_PRESETS.items():
+            await db.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS subscribers_legacy_{name}
+                AFTER INSERT ON subscribers
+                WHEN NEW.topics = 0 AND NEW.subscription_type = '{name}'
+                BEGIN
+                    UPDATE subscribers SET topics = {mask} WHERE chat_id = NEW.chat_id;
+                END;
+                """
+            )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_subscribers_topics ON subscribers (topics, chat_id)"
+        )
+        await db.commit()
+
+    # Номер шарда для пользователя
+    def shard_for(self, chat_id: int) -> int:
+        return chat_id % self.shards
+
+    def _db(self, chat_id: int) -> aiosqlite.Connection:
+        return self._connections[self.shard_for(chat_id)]
+
+    # Запоминает подписку пользователя в кэше (без индекса)
+    def _remember(self, chat_id: int, topics):
+        if self.index is not None or self.cache_size <= 0:
+            return
+        self._cache[chat_id] = topics
+        self._cache.move_to_end(chat_id)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # Подписка по индексу или кэшу, без обращения к базе: (известна ли, маска тем или None)
+    def _cached_topics(self, chat_id: int):
+        if self.index is not None:
+            return True, self.index.get(chat_id)
+        if chat_id in self._cache:
+            self._cache.move_to_end(chat_id)
+            return True, self._cache[chat_id]
+        return False, None
+
+    # Возвращает маску тем пользователя или None, если он не подписан
+    async def get_topics(self, chat_id: int):
+        known, topics = self._cached_topics(chat_id)
+        if known:
+            return topics
+        async with self._db(chat_id).execute(
+            "SELECT topics FROM subscribers WHERE chat_id = ?", (chat_id,)
+        ) as cursor:
+            result = await cursor.fetchone()
+        topics = result[0] if result else None
+        self._remember(chat_id, topics)
+        return topics
+
+    # Подписывает пользователя на темы (или меняет набор тем), сохраненный ник не меняется.
+    # Возвращает False, если по кэшу он уже подписан на эти темы и запись
+    # пропущена. Подписка не из кэша не читается заранее: запись дешевле
+    # отдельного SELECT перед ней.
+    async def subscribe(self, chat_id: int, topics: int) -> bool:
+        known, current = self._cached_topics(chat_id)
+        if known and current == topics:
+            return False
+        db = self._db(chat_id)
+        # Как и прежняя замена строки, сбрасывает отключение и старый subscription_type
+        await db.execute(
+            "INSERT INTO subscribers (chat_id, topics) VALUES (?, ?) ON CONFLICT (chat_id) DO UPDATE SET "
+            "topics = excluded.topics, subscription_type = NULL, deactivated_reason = NULL",
+            (chat_id, topics),
+        )
+        await db.commit()
+        if self.index is not None:
+            self.index.add(chat_id, topics)
+        self._remember(chat_id, topics)
+        return True
+
+    # Пакетно добавляет подписчиков: строки (chat_id, username, topics)
+    async def subscribe_many(self, rows):
+        batches = {}
+        for row in rows:
+            batches.setdefault(self.shard_for(row[0]), []).append(row)
+
+        async def write_shard(shard, shard_rows):
+            db = self._connections[shard]
+            await db.executemany(
+                "INSERT OR REPLACE INTO subscribers (chat_id, username, topics) VALUES (?, ?, ?)",
+                shard_rows,
+            )
+            await db.commit()
+
+        await asyncio.gather(
+            *(write_shard(shard, shard_rows) for shard, shard_rows in batches.items())
+        )
+        for shard_rows in batches.values():
+            for chat_id, _, topics in shard_rows:
+                if self.index is not None:
+                    self.index.add(chat_id, topics)
+                self._cache.pop(chat_id, None)
+
+    # Пачкой отключает недоступных подписчиков: строки (chat_id, причина)
+    async def deactivate(self, rows) -> int:
+        """
+        Подписчик остается в базе с маской тем 0 и причиной отключения:
+        маска 0 не входит ни в один сегмент, поэтому рассылки его пропускают,
+        а повторная подписка через меню снова его активирует.
+        Возвращает число отключенных подписчиков.
+        """
+        batches = {}
+        for chat_id, reason in rows:
+            batches.setdefault(self.shard_for(chat_id), []).append((reason, chat_id))
+
+        async def write_shard(shard, shard_rows):
+            db = self._connections[shard]
+            cursor = await db.executemany(
+                "UPDATE subscribers SET topics = 0, deactivated_reason = ? WHERE chat_id = ? AND topics != 0",
+                shard_rows,
+            )
+            await db.commit()
+            deactivated = cursor.rowcount
+            await cursor.close()
+            return deactivated
+
+        deactivated = sum(
+            await asyncio.gather(
+                *(write_shard(shard, shard_rows) for shard, shard_rows in batches.items())
+            )
+        )
+        for shard_rows in batches.values():
+            for _, chat_id in shard_rows:
+                if self.index is not None and self.index.get(chat_id) is not None:
+                    self.index.add(chat_id, 0)
+                self._cache.pop(chat_id, None)
+        logger.info(f"Отключено недоступных подписчиков: {deactivated}")
+        return deactivated
+
+    # Последовательно отдает все записи (chat_id, username, topics) пачками
+    async def iter_records(self, page_size: int = 5000):
+        for db in self._connections:
+            async with db.execute("SELECT chat_id, username, topics FROM subscribers") as cursor:
+                while rows := await cursor.fetchmany(page_size):
+                    yield rows
+
+    # Отписывает пользователя. Если по кэшу пользователь не подписан,
+    # запись пропускается.
+    async def unsubscribe(self, chat_id: int):
+        known, current = self._cached_topics(chat_id)
+        if known and current is None:
+            return
+        db = self._db(chat_id)
+        await db.execute("DELETE FROM subscribers WHERE chat_id = ?", (chat_id,))
+        await db.commit()
+        if self.index is not None:
+            self.index.remove(chat_id)
+        self._remember(chat_id, None)
+
+    # Удаляет всех подписчиков во всех шардах
+    async def reset(self):
+        async def reset_shard(db):
+            await db.execute("DELETE FROM subscribers")
+            await db.commit()
+
+        await asyncio.gather(*(reset_shard(db) for db in self._connections))
+        if self.index is not None:
+            self.index.clear()
+        self._cache.clear()
+
+    # Общее число активных подписчиков (без отключенных)
+    async def count(self) -> int:
+        if self.index is not None:
+            return self.index.count() - self.index.count_by_topics().get(0, 0)
+
+        async def count_shard(db):
+            async with db.execute("SELECT COUNT(*) FROM subscribers WHERE topics != 0") as cursor:
+                return (await cursor.fetchone())[0]
+
+        return sum(await asyncio.gather(*(count_shard(db) for db in self._connections)))
+
+    # Число подписчиков по маскам тем
+    async def count_by_topics(self) -> dict:
+        if self.index is not None:
+            return self.index.count_by_topics()
+
+        async def count_shard(db):
+            async with db.execute(
+                "SELECT topics, COUNT(*) FROM subscribers GROUP BY topics"
+            ) as cursor:
+                return await cursor.fetchall()
+
+        counts = {}
+        for rows in await asyncio.gather(*(count_shard(db) for db in self._connections)):
+            for topics, count in rows:
+                counts[topics] = counts.get(topics, 0) + count
+        return counts
+
+    # Потоково отдает chat_id подписчиков сегмента пачками фиксированного размера
+    async def iter_batches(self, segment: Segment, batch_size: int = None):
+        """
+        Сегмент заранее раскладывается в список подходящих масок тем, и каждая
+        маска читается по индексу (topics, chat_id) без сравнения строк.
+        Каждый шард читается своей задачей параллельно (у каждого соединения
+        aiosqlite свой поток) с keyset-пагинацией по chat_id: каждая пачка —
+        отдельный короткий запрос, поэтому во время долгой рассылки не держится
+        открытая читающая транзакция, блокирующая запись новых подписок.
+        В памяти одновременно находится не больше prefetch_batches пачек.
+        """
+        batch_size = batch_size or self.batch_size
+        masks = segment.masks()
+        if self.index is not None:
+            for batch in self.index.iter_batches(masks, batch_size):
+                yield batch
+            return
+
+        query = (
+            "SELECT chat_id FROM subscribers WHERE topics = ? AND chat_id > ? "
+            "ORDER BY chat_id LIMIT ?"
+        )
+        queue = asyncio.Queue(maxsize=self.prefetch_batches)
+        done = object()
+
+        async def read_shard(db):
+            try:
+                for topics in masks:
+                    last_chat_id = -(2**63)
+                    while True:
+                        async with db.execute(
+                            query, (topics, last_chat_id, batch_size)
+                        ) as cursor:
+                            batch = [chat_id for (chat_id,) in await cursor.fetchall()]
+                        if not batch:
+                            break
+                        await queue.put(batch)
+                        if len(batch) < batch_size:
+                            break
+                        last_chat_id = batch[-1]
+            except Exception as e:
+                # Ошибку чтения шарда передаем отправителю через очередь
+                await queue.put(e)
+            else:
+                await queue.put(done)
+
+        readers = [asyncio.create_task(read_shard(db)) for db in self._connections]
+        try:
+            remaining = len(readers)
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for reader in readers:
+                reader.cancel()
+
+    # Создает резервные копии всех шардов в указанной папке
+    async def backup(self, backup_dir: str):
+        async def backup_shard(path, db):
+            destination_path = os.path.join(backup_dir, os.path.basename(path))
+            async with aiosqlite.connect(destination_path) as destination:
+                await db.backup(destination)
+
+        await asyncio.gather(
+            *(backup_shard(path, db) for path, db in zip(self.paths, self._connections))
+        )
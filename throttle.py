@@ -0,0 +1,111 @@
+import time
+
+from loguru import logger
+
+
+# Разбирает правила антифлуда 'группа=запросов/секунд,...' в {группа: (запросов, секунд)}
+def parse_throttle_rules(text: str) -> dict:
+    rules = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        try:
+            group, limit = item.split("=")
+            count, period = limit.split("/")
+            count, period = int(count), float(period)
+        except ValueError:
+            count = period = 0
+        if count < 1 or period <= 0:
+            raise ValueError(f"Неверное правило ограничения частоты: '{item}' (ожидается 'группа=запросов/секунд')")
+        rules[group.strip()] = (count, period)
+    return rules
+
+
+# Ограничение частоты запросов каждого пользователя по группам обработчиков
+class UserThrottle:
+    """
+    Ведро токенов на пользователя и группу: за period секунд проходит не
+    больше count запросов, из них count подряд, затем по одному раз в
+    period / count секунд. Ведро хранится одним числом — временем, когда
+    оно снова будет полным (алгоритм GCRA): запрос проходит, если это время
+    не дальше чем на period секунд вперед, и сдвигает его на один интервал.
+    Запись с прошедшим временем ничем не отличается от отсутствующей,
+    поэтому раз в sweep_interval секунд такие записи удаляются: в памяти
+    остаются только пользователи, активные за последние period секунд.
+    Отклоненные запросы не сдвигают время и подсчитываются для сводки в
+    логе при очистке.
+    """
+
+    __slots__ = ("sweep_interval", "_rules", "_ready_at", "_rejected", "_next_sweep")
+
+    def __init__(self, rules: dict, sweep_interval: float = 60):
+        self.sweep_interval = sweep_interval
+        # группа -> (интервал между запросами, допустимое опережение)
+        self._rules = {group: (period / count, period - period / count) for group, (count, period) in rules.items()}
+        self._ready_at = {group: {} for group in rules}  # группа -> {ID пользователя: время полного ведра}
+        self._rejected = {group: {} for group in rules}  # группа -> {ID пользователя: отклонено запросов}
+        self._next_sweep = 0.0
+
+    def __len__(self):
+        return sum(len(users) for users in self._ready_at.values())
+
+    # Учитывает запрос: 0, если он проходит, иначе сколько секунд подождать.
+    # Группы без правила не ограничиваются.
+    def hit(self, group: str, user_id: int, now: float = None) -> float:
+        rule = self._rules.get(group)
+        if rule is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        if now >= self._next_sweep:
+            self.sweep(now)
+        interval, tolerance = rule
+        users = self._ready_at[group]
+        ready_at = max(users.get(user_id, now), now)
+        wait = ready_at - tolerance - now
+        if wait > 0:
+            rejected = self._rejected[group]
+            rejected[user_id] = rejected.get(user_id, 0) + 1
+            return wait
+        users[user_id] = ready_at + interval
+        return 0.0
+
+    # Удаляет полные ведра и пишет сводку об отклоненных запросах
+    def sweep(self, now: float = None):
+        now = time.monotonic() if now is None else now
+        self._next_sweep = now + self.sweep_interval
+        for group, users in self._ready_at.items():
+            self._ready_at[group] = {user_id: ready_at for user_id, ready_at in users.items() if ready_at > now}
+        for group, rejected in self._rejected.items():
+            if rejected:
+                user_id, count = max(rejected.items(), key=lambda item: item[1])
+                logger.warning(
+                    f"Ограничение частоты '{group}': отклонено запросов {sum(rejected.values())} "
+                    f"от {len(rejected)} пользователей (больше всего от {user_id}: {count})"
+                )
+                self._rejected[group] = {}
+
+
+# Middleware диспетчера: отклоняет запросы сверх ограничения до фильтров и обработчиков
+class ThrottleMiddleware:
+    """
+    key(event) возвращает (группа, ID пользователя) или None, если событие
+    не ограничивается. Отклоненное событие не доходит до обработчиков и
+    баз данных: вызывается только reject(event, wait), например ответ на
+    нажатие кнопки без обращения к базе.
+    """
+
+    __slots__ = ("throttle", "_key", "_reject")
+
+    def __init__(self, throttle: UserThrottle, key, reject):
+        self.throttle = throttle
+        self._key = key
+        self._reject = reject
+
+    async def __call__(self, handler, event, data):
+        key = self._key(event)
+        if key is not None:
+            wait = self.throttle.hit(*key)
+            if wait:
+                await self._reject(event, wait)
+                return None
+        return await handler(event, data)
@@ -0,0 +1,120 @@
+import hashlib
+import re
+
+# Разрядность сигнатуры SimHash
+SIGNATURE_BITS = 64
+
+# Длина признака (символьной n-граммы): короткие тексты заявок устойчивее
+# сравниваются по триграммам, чем по словам
+SHINGLE_SIZE = 3
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+# Число единичных битов: int.bit_count есть только с Python 3.10
+if hasattr(int, "bit_count"):
+    popcount = int.bit_count
+else:
+    def popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+# 64-битный хеш признака, одинаковый во всех процессах (в отличие от hash())
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+
+
+# Сигнатура SimHash текста заявки: похожие тексты дают близкие сигнатуры
+def simhash(text: str):
+    """
+    Признаки — триграммы символов текста, приведенного к словам в нижнем
+    регистре через пробел. Бит сигнатуры равен 1, если он установлен в
+    хешах большинства признаков, поэтому правка нескольких символов меняет
+    лишь несколько битов. Для текста без слов возвращает None.
+    """
+    normalized = " ".join(WORD_PATTERN.findall(text.lower()))
+    if not normalized:
+        return None
+    hashes = [
+        _feature_hash(normalized[start:start + SHINGLE_SIZE])
+        for start in range(max(1, len(normalized) - SHINGLE_SIZE + 1))
+    ]
+    majority = len(hashes) / 2
+    signature = 0
+    for bit in range(SIGNATURE_BITS):
+        if sum(feature_hash >> bit & 1 for feature_hash in hashes) > majority:
+            signature |= 1 << bit
+    return signature
+
+
+# Сигнатура в диапазоне INTEGER SQLite (знаковое 64-битное число) и обратно
+def to_signed(signature: int) -> int:
+    return signature - (1 << SIGNATURE_BITS) if signature >> (SIGNATURE_BITS - 1) else signature
+
+
+def from_signed(value: int) -> int:
+    return value & ((1 << SIGNATURE_BITS) - 1)
+
+
+# Индекс LSH открытых заявок для поиска дубликатов
+class DuplicateIndex:
+    """
+    Сигнатура делится на max_distance + 1 полос: если сигнатуры отличаются
+    не более чем в max_distance битах, хотя бы одна полоса у них совпадает.
+    Кандидаты — заявки с совпадающей полосой (поиск в словаре), среди них
+    выбирается ближайшая по расстоянию Хэмминга. В индексе хранятся только
+    открытые заявки без родителя, поэтому корзины остаются маленькими даже
+    при сотнях дубликатов и поиск занимает O(1) в среднем.
+    """
+
+    __slots__ = ("max_distance", "_bands", "_buckets", "_signatures")
+
+    def __init__(self, max_distance: int = 6):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = SIGNATURE_BITS // bands
+        # (сдвиг, маска) каждой полосы; последняя забирает оставшиеся биты
+        self._bands = [
+            (band * width, (1 << (width if band < bands - 1 else SIGNATURE_BITS - band * width)) - 1)
+            for band in range(bands)
+        ]
+        self._buckets = {}  # (номер полосы, значение полосы) -> множество ID заявок
+        self._signatures = {}  # ID заявки -> сигнатура
+
+    def _keys(self, signature: int):
+        return [(band, signature >> shift & mask) for band, (shift, mask) in enumerate(self._bands)]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def clear(self):
+        self._buckets = {}
+        self._signatures = {}
+
+    def add(self, ticket_id: int, signature: int):
+        self.remove(ticket_id)
+        self._signatures[ticket_id] = signature
+        for key in self._keys(signature):
+            self._buckets.setdefault(key, set()).add(ticket_id)
+
+    def remove(self, ticket_id: int):
+        signature = self._signatures.pop(ticket_id, None)
+        if signature is None:
+            return
+        for key in self._keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(ticket_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    # Ближайшая заявка не дальше max_distance: (ID, расстояние) или None.
+    # При равном расстоянии выбирается более ранняя заявка.
+    def find(self, signature: int):
+        best = None
+        for key in self._keys(signature):
+            for ticket_id in self._buckets.get(key, ()):
+                distance = popcount(self._signatures[ticket_id] ^ signature)
+                if distance <= self.max_distance and (best is None or (distance, ticket_id) < best[::-1]):
+                    best = (ticket_id, distance)
+        return best
@@ -0,0 +1,135 @@
+import re
+
+# Темы уведомлений: у каждого подписчика хранится битовая маска тем
+TOPICS = {
+    "updates": 1 << 0,  # Новый контент
+    "fixes": 1 << 1,  # Исправления
+}
+ALL_TOPICS = 0
+for _bit in TOPICS.values():
+    ALL_TOPICS |= _bit
+
+# Готовые наборы тем, которые пользователь выбирает кнопками меню подписки
+SUBSCRIPTION_PRESETS = {
+    "all": TOPICS["updates"] | TOPICS["fixes"],
+    "updates": TOPICS["updates"],
+}
+
+# Число различных масок тем (маска 0 означает отсутствие подписки)
+MASK_SPACE = 1 << len(TOPICS)
+_FULL_TABLE = (1 << MASK_SPACE) - 1
+
+_TOKEN_RE = re.compile(r"\s*(?:([A-Za-z_][A-Za-z0-9_]*)|(.))")
+
+
+# Возвращает название готового набора тем для маски или None
+def preset_for_topics(topics):
+    for name, mask in SUBSCRIPTION_PRESETS.items():
+        if mask == topics:
+            return name
+    return None
+
+
+# Таблица истинности темы: бит m установлен, если маска m содержит тему
+def _topic_table(bit: int) -> int:
+    table = 0
+    for mask in range(MASK_SPACE):
+        if mask & bit:
+            table |= 1 << mask
+    return table
+
+
+_TOPIC_TABLES = {name: _topic_table(bit) for name, bit in TOPICS.items()}
+
+
+# Сегмент аудитории: булево выражение над темами
+class Segment:
+    """
+    Выражение вида "updates | fixes", "updates & !fixes" или "(updates)"
+    компилируется в таблицу истинности над всеми масками тем — битовую карту
+    длиной 2^len(TOPICS). Операции &, |, ! выполняются над этими картами,
+    а не над строками подписчиков, поэтому выбор аудитории сводится к списку
+    подходящих масок, каждая из которых читается по индексу (topics, chat_id).
+    """
+
+    __slots__ = ("expression", "table")
+
+    def __init__(self, expression: str, table: int):
+        self.expression = expression
+        self.table = table & ~1  # Маска 0 (нет тем) никогда не получает рассылки
+
+    @classmethod
+    def parse(cls, expression: str) -> "Segment":
+        return cls(expression, _SegmentParser(expression).parse())
+
+    # Маски тем, входящие в сегмент
+    def masks(self) -> tuple:
+        return tuple(mask for mask in range(MASK_SPACE) if self.table >> mask & 1)
+
+    # Проверяет, входит ли маска тем подписчика в сегмент
+    def matches(self, topics: int) -> bool:
+        return bool(self.table >> topics & 1)
+
+    def __repr__(self):
+        return f"Segment({self.expression!r})"
+
+
+# Разбор выражения сегмента рекурсивным спуском: | < & < ! < скобки
+class _SegmentParser:
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = []
+        for name, symbol in _TOKEN_RE.findall(expression):
+            if name or symbol.strip():
+                self.tokens.append(name or symbol)
+        self.position = 0
+
+    def parse(self) -> int:
+        table = self._or()
+        if self.position != len(self.tokens):
+            self._error(f"неожиданный символ '{self.tokens[self.position]}'")
+        return table
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def _or(self) -> int:
+        table = self._and()
+        while self._peek() == "|":
+            self._take()
+            table |= self._and()
+        return table
+
+    def _and(self) -> int:
+        table = self._not()
+        while self._peek() == "&":
+            self._take()
+            table &= self._not()
+        return table
+
+    def _not(self) -> int:
+        if self._peek() == "!":
+            self._take()
+            return ~self._not() & _FULL_TABLE
+        return self._atom()
+
+    def _atom(self) -> int:
+        token = self._take()
+        if token == "(":
+            table = self._or()
+            if self._take() != ")":
+                self._error("ожидалась ')'")
+            return table
+        if token in _TOPIC_TABLES:
+            return _TOPIC_TABLES[token]
+        if token == "*":
+            return _FULL_TABLE
+        self._error(f"неизвестная тема '{token}'" if token else "неожиданный конец выражения")
+
+    def _error(self, reason: str):
+        raise ValueError(f"Некорректное выражение сегмента '{self.expression}': {reason}")